@@ -2,22 +2,45 @@
 File management endpoints.
 """
 
-from typing import List
+from pathlib import Path
+from typing import List, Optional, Dict, Any
 from uuid import UUID
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, BackgroundTasks, status
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, BackgroundTasks, Query, Request, status
 from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
 
 from ....core.storage import file_manager
+from ....core.audio_headers import parse_audio_header, read_audio_header
 from ....core.exceptions import FileError
-from ....schemas.files import FileUploadResponse, FileMetadata, StorageUsage
+from ....schemas.files import (
+    FileUploadResponse, FileMetadata, StorageUsage, HashUploadRequest,
+    ResumableUploadCreate, ResumableUploadStatus, ResumableUploadComplete
+)
 from ....schemas.usage import UsageCheckRequest
 from ....services.usage_service import usage_service
+from ....services.upload_session_service import upload_session_service
 from ...dependencies import get_current_user
 from ....core.logging import get_logger
 
 logger = get_logger(__name__)
 router = APIRouter()
 
+ALLOWED_CONTENT_TYPES = {
+    'audio/mpeg', 'audio/mp3', 'audio/wav', 'audio/m4a', 'audio/aac',
+    'video/mp4', 'video/quicktime', 'video/x-msvideo', 'video/webm'
+}
+
+
+def _estimate_duration(file_type: str, file_size_bytes: int, header_metadata: Optional[Dict[str, Any]]) -> int:
+    """Duration from container headers, else a rough estimate from the file size."""
+    if header_metadata:
+        return int(header_metadata["duration"])
+    # 1MB = 1 minute for audio, 0.5 minute for video
+    elif file_type == "audio":
+        return int((file_size_bytes / (1024 * 1024)) * 60)
+    else:
+        return int((file_size_bytes / (1024 * 1024)) * 30)
+
 
 @router.post("/upload", response_model=FileUploadResponse)
 async def upload_file(
@@ -34,30 +57,18 @@ async def upload_file(
     try:
         user_id = UUID(current_user["sub"])
         
-        # Read file size first
-        file_content = await file.read()
-        file_size_bytes = len(file_content)
-        
-        # Reset file position
-        await file.seek(0)
-        
         # Validate file type
-        allowed_types = {
-            'audio/mpeg', 'audio/mp3', 'audio/wav', 'audio/m4a', 'audio/aac',
-            'video/mp4', 'video/quicktime', 'video/x-msvideo', 'video/webm'
-        }
-        
-        if file.content_type not in allowed_types:
+        if file.content_type not in ALLOWED_CONTENT_TYPES:
             raise FileError(f"Unsupported file type: {file.content_type}")
         
         # Determine file type
         file_type = "audio" if file.content_type.startswith("audio") else "video"
         
-        # Estimate duration (rough estimate: 1MB = 1 minute for audio, 0.5 minute for video)
-        if file_type == "audio":
-            estimated_duration_seconds = int((file_size_bytes / (1024 * 1024)) * 60)
-        else:
-            estimated_duration_seconds = int((file_size_bytes / (1024 * 1024)) * 30)
+        # Read duration from the container headers when the format is known;
+        # only the first and last chunks are read, never the whole body
+        head, tail, file_size_bytes = await file_manager.read_upload_header(file)
+        header_metadata = parse_audio_header(head, file_size_bytes, tail)
+        estimated_duration_seconds = _estimate_duration(file_type, file_size_bytes, header_metadata)
         
         # Check usage limits before proceeding with upload
         usage_check = await usage_service.check_usage_limits(
@@ -87,8 +98,7 @@ async def upload_file(
         if usage_check.warnings:
             logger.info(f"Upload warnings for user {user_id}: {usage_check.warnings}")
         
-        # Save the file (reset to original content)
-        await file.seek(0)
+        # Stream the file to disk
         metadata = await file_manager.save_upload_file(
             file, 
             current_user["user_id"], 
@@ -128,6 +138,264 @@ async def upload_file(
         raise HTTPException(status_code=500, detail="Upload failed")
 
 
+@router.post("/upload/by-hash", response_model=FileUploadResponse)
+async def upload_file_by_hash(
+    upload: HashUploadRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Upload a file the server already stores, by sending only its SHA-256.
+    
+    Returns 404 if the content is not available; the client then uploads
+    the file normally. By default only content the user has uploaded
+    before can be reused this way.
+    """
+    try:
+        user_id = UUID(current_user["sub"])
+        
+        if upload.content_type not in ALLOWED_CONTENT_TYPES:
+            raise FileError(f"Unsupported file type: {upload.content_type}")
+        
+        file_type = "audio" if upload.content_type.startswith("audio") else "video"
+        
+        blob = await file_manager.find_blob(current_user["user_id"], upload.sha256)
+        if blob is None:
+            raise HTTPException(status_code=404, detail="Upload required")
+        
+        file_size_bytes = blob.stat().st_size
+        header_metadata = await run_in_threadpool(read_audio_header, blob)
+        estimated_duration_seconds = _estimate_duration(file_type, file_size_bytes, header_metadata)
+        
+        # Check usage limits as for a regular upload
+        usage_check = await usage_service.check_usage_limits(
+            user_id=user_id,
+            estimated_duration_seconds=estimated_duration_seconds,
+            file_size_bytes=file_size_bytes
+        )
+        
+        if not usage_check.can_process:
+            logger.warning(f"Upload blocked for user {user_id}: {usage_check.blocking_reason}")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail={
+                    "error": "Upload not allowed",
+                    "reason": usage_check.blocking_reason,
+                    "file_size_mb": round(file_size_bytes / (1024 * 1024), 2),
+                    "estimated_duration_minutes": round(estimated_duration_seconds / 60, 1),
+                    "credits_required": usage_check.credits_required,
+                    "credits_available": usage_check.credits_available,
+                    "upgrade_url": "/pricing",
+                    "usage_check": usage_check.dict()
+                }
+            )
+        
+        metadata = await file_manager.adopt_blob(
+            upload.sha256,
+            current_user["user_id"],
+            upload.filename,
+            file_type,
+            upload.content_type
+        )
+        if metadata is None:
+            raise HTTPException(status_code=404, detail="Upload required")
+        
+        logger.info(f"File uploaded by hash: {metadata['file_id']} by user {user_id}")
+        
+        response = FileUploadResponse(
+            file_id=metadata["file_id"],
+            filename=metadata["original_filename"],
+            file_size=metadata["file_size"],
+            file_type=file_type,
+            upload_time=metadata["upload_time"],
+            message="File already stored; upload skipped"
+        )
+        response.usage_info = {
+            "estimated_duration_seconds": estimated_duration_seconds,
+            "estimated_duration_minutes": round(estimated_duration_seconds / 60, 1),
+            "estimated_credits": usage_check.credits_required,
+            "estimated_cost": float(usage_check.estimated_cost),
+            "warnings": usage_check.warnings,
+            "credits_remaining_after": usage_check.credits_after
+        }
+        return response
+        
+    except HTTPException:
+        raise
+    except FileError:
+        raise
+    except Exception as e:
+        logger.error(f"Upload by hash error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Upload failed")
+
+
+@router.post("/uploads", response_model=ResumableUploadStatus)
+async def create_resumable_upload(
+    upload: ResumableUploadCreate,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Start a resumable upload.
+    
+    Send the file with PATCH /uploads/{upload_id}?offset=N, one chunk per
+    request (chunks may be sent in parallel), then POST
+    /uploads/{upload_id}/complete. GET /uploads/{upload_id} reports which
+    byte ranges are still missing after an interruption.
+    """
+    try:
+        user_id = UUID(current_user["sub"])
+        
+        if upload.content_type not in ALLOWED_CONTENT_TYPES:
+            raise FileError(f"Unsupported file type: {upload.content_type}")
+        
+        file_type = "audio" if upload.content_type.startswith("audio") else "video"
+        estimated_duration_seconds = _estimate_duration(file_type, upload.file_size, None)
+        
+        # Check usage limits before accepting any data
+        usage_check = await usage_service.check_usage_limits(
+            user_id=user_id,
+            estimated_duration_seconds=estimated_duration_seconds,
+            file_size_bytes=upload.file_size
+        )
+        
+        if not usage_check.can_process:
+            logger.warning(f"Upload blocked for user {user_id}: {usage_check.blocking_reason}")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail={
+                    "error": "Upload not allowed",
+                    "reason": usage_check.blocking_reason,
+                    "file_size_mb": round(upload.file_size / (1024 * 1024), 2),
+                    "credits_required": usage_check.credits_required,
+                    "credits_available": usage_check.credits_available,
+                    "upgrade_url": "/pricing",
+                    "usage_check": usage_check.dict()
+                }
+            )
+        
+        session = await upload_session_service.create(
+            current_user["user_id"],
+            upload.filename,
+            upload.content_type,
+            file_type,
+            upload.file_size
+        )
+        
+        response = ResumableUploadStatus(**session)
+        response.usage_info = {
+            "estimated_credits": usage_check.credits_required,
+            "warnings": usage_check.warnings
+        }
+        return response
+        
+    except HTTPException:
+        raise
+    except FileError:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating resumable upload: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to create upload")
+
+
+@router.get("/uploads/{upload_id}", response_model=ResumableUploadStatus)
+async def get_resumable_upload(
+    upload_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get the received offset and missing byte ranges of a resumable upload."""
+    session = await upload_session_service.status(upload_id, current_user["user_id"])
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return ResumableUploadStatus(**session)
+
+
+@router.patch("/uploads/{upload_id}", response_model=ResumableUploadStatus)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="Byte offset of this chunk in the file"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Upload one chunk of a resumable upload as the raw request body.
+    
+    The body is streamed straight into place in the file; an interrupted
+    chunk keeps the bytes that arrived.
+    """
+    try:
+        session = await upload_session_service.write_chunk(
+            upload_id,
+            current_user["user_id"],
+            offset,
+            request.stream()
+        )
+        if session is None:
+            raise HTTPException(status_code=404, detail="Upload not found")
+        return ResumableUploadStatus(**session)
+        
+    except HTTPException:
+        raise
+    except FileError:
+        raise
+    except Exception as e:
+        logger.error(f"Error writing chunk of upload {upload_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Chunk upload failed")
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=FileUploadResponse)
+async def complete_resumable_upload(
+    upload_id: str,
+    completion: Optional[ResumableUploadComplete] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Finish a resumable upload once all chunks have arrived."""
+    try:
+        metadata = await upload_session_service.complete(
+            upload_id,
+            current_user["user_id"],
+            sha256=completion.sha256 if completion else None
+        )
+        if metadata is None:
+            raise HTTPException(status_code=404, detail="Upload not found")
+        
+        header_metadata = await run_in_threadpool(read_audio_header, Path(metadata["file_path"]))
+        estimated_duration_seconds = _estimate_duration(metadata["file_type"], metadata["file_size"], header_metadata)
+        
+        logger.info(f"File uploaded: {metadata['file_id']} by user {current_user['sub']}, estimated duration: {estimated_duration_seconds}s")
+        
+        response = FileUploadResponse(
+            file_id=metadata["file_id"],
+            filename=metadata["original_filename"],
+            file_size=metadata["file_size"],
+            file_type=metadata["file_type"],
+            upload_time=metadata["upload_time"],
+            message="File uploaded successfully"
+        )
+        response.usage_info = {
+            "estimated_duration_seconds": estimated_duration_seconds,
+            "estimated_duration_minutes": round(estimated_duration_seconds / 60, 1)
+        }
+        return response
+        
+    except HTTPException:
+        raise
+    except FileError:
+        raise
+    except Exception as e:
+        logger.error(f"Error completing upload {upload_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to complete upload")
+
+
+@router.delete("/uploads/{upload_id}")
+async def abort_resumable_upload(
+    upload_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Cancel a resumable upload and discard its data."""
+    if not await upload_session_service.abort(upload_id, current_user["user_id"]):
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return {"message": "Upload cancelled"}
+
+
 @router.get("/list", response_model=List[FileMetadata])
 async def list_user_files(
     current_user: dict = Depends(get_current_user)
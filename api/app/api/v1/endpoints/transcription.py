@@ -4,13 +4,13 @@ Transcription processing endpoints with integrated usage tracking and limit enfo
 
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import FileResponse
 
 from ...dependencies import get_current_user
 from ....schemas.transcription import (
     TranscriptionRequest, TranscriptionResponse, TranscriptionJob,
-    ExportRequest, ExportResponse
+    TranscriptionOptions, ExportRequest, ExportResponse, JobStatus
 )
 from ....schemas.usage import UsageCheckRequest, UsageType
 from ....services.transcription_service import transcription_service
@@ -72,10 +72,50 @@ async def check_transcription_limits(
         raise HTTPException(status_code=500, detail="Failed to check limits")
 
 
+async def _check_usage_limits(user_id: UUID, file_info: dict):
+    """Check the user's usage limits for a file, raising 429 if it cannot be processed."""
+    usage_check = await usage_service.check_usage_limits(
+        user_id=user_id,
+        estimated_duration_seconds=file_info.get("estimated_duration", 300),  # Default 5 min
+        file_size_bytes=file_info.get("file_size", 10 * 1024 * 1024)  # Default 10MB
+    )
+    
+    # Block if user has exceeded limits
+    if not usage_check.can_process:
+        logger.warning(f"Usage limit exceeded for user {user_id}: {usage_check.blocking_reason}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={
+                "error": "Usage limit exceeded",
+                "reason": usage_check.blocking_reason,
+                "credits_required": usage_check.credits_required,
+                "credits_available": usage_check.credits_available,
+                "upgrade_url": "/pricing",
+                "usage_check": usage_check.dict()
+            }
+        )
+    
+    # Check concurrent processing limits
+    if not usage_check.can_process_concurrent:
+        logger.warning(f"Concurrent processing limit reached for user {user_id}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={
+                "error": "Concurrent processing limit reached",
+                "reason": f"Maximum {usage_check.max_concurrent_jobs} concurrent jobs allowed",
+                "current_jobs": usage_check.current_concurrent_jobs,
+                "max_jobs": usage_check.max_concurrent_jobs,
+                "queue_available": True,  # Could implement queuing
+                "upgrade_url": "/pricing"
+            }
+        )
+    
+    return usage_check
+
+
 @router.post("/start", response_model=TranscriptionResponse)
 async def start_transcription(
     request: TranscriptionRequest,
-    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -93,41 +133,7 @@ async def start_transcription(
         )
         
         # Perform usage limit check before starting transcription
-        usage_check = await usage_service.check_usage_limits(
-            user_id=user_id,
-            estimated_duration_seconds=file_info.get("estimated_duration", 300),  # Default 5 min
-            file_size_bytes=file_info.get("file_size", 10 * 1024 * 1024)  # Default 10MB
-        )
-        
-        # Block if user has exceeded limits
-        if not usage_check.can_process:
-            logger.warning(f"Usage limit exceeded for user {user_id}: {usage_check.blocking_reason}")
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail={
-                    "error": "Usage limit exceeded",
-                    "reason": usage_check.blocking_reason,
-                    "credits_required": usage_check.credits_required,
-                    "credits_available": usage_check.credits_available,
-                    "upgrade_url": "/pricing",
-                    "usage_check": usage_check.dict()
-                }
-            )
-        
-        # Check concurrent processing limits
-        if not usage_check.can_process_concurrent:
-            logger.warning(f"Concurrent processing limit reached for user {user_id}")
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail={
-                    "error": "Concurrent processing limit reached",
-                    "reason": f"Maximum {usage_check.max_concurrent_jobs} concurrent jobs allowed",
-                    "current_jobs": usage_check.current_concurrent_jobs,
-                    "max_jobs": usage_check.max_concurrent_jobs,
-                    "queue_available": True,  # Could implement queuing
-                    "upgrade_url": "/pricing"
-                }
-            )
+        usage_check = await _check_usage_limits(user_id, file_info)
         
         # Show warnings if any (e.g., approaching limit)
         if usage_check.warnings:
@@ -140,7 +146,8 @@ async def start_transcription(
             youtube_url=request.youtube_url,
             options=request.options,
             estimated_credits=usage_check.credits_required,
-            estimated_cost=usage_check.estimated_cost
+            estimated_cost=usage_check.estimated_cost,
+            estimated_duration=file_info.get("estimated_duration")
         )
         
         # Record usage initiation (actual usage will be recorded on completion)
@@ -153,12 +160,8 @@ async def start_transcription(
             transcription_id=UUID(job.job_id)
         )
         
-        # Start processing in background
-        background_tasks.add_task(
-            transcription_service.process_job,
-            job.job_id,
-            user_id  # Pass user_id for additional usage tracking
-        )
+        # Queue for processing by the worker pool
+        await transcription_service.submit_job(job.job_id)
         
         logger.info(f"Transcription job started: {job.job_id} for user {user_id}, credits required: {usage_check.credits_required}")
         
@@ -287,6 +290,48 @@ async def list_transcription_jobs(
         raise HTTPException(status_code=500, detail="Failed to list jobs")
 
 
+@router.post("/jobs/{job_id}/rerun", response_model=TranscriptionResponse)
+async def rerun_transcription_job(
+    job_id: str,
+    options: TranscriptionOptions,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Re-run a completed job with different options.
+    Only stages affected by the changed options are recomputed. The original
+    transcript is reused without charge while it is stored; if it has expired
+    the audio is transcribed again, so the usual usage limits apply.
+    """
+    try:
+        # Transcribing again is charged, so it is subject to the same limits as /start
+        parent = await transcription_service.get_job_status(job_id, current_user["user_id"])
+        if parent and parent.status == JobStatus.COMPLETED and not await transcription_service.has_stored_transcript(parent):
+            user_id = UUID(current_user["sub"])
+            file_info = await transcription_service.get_file_info(
+                file_id=parent.file_id,
+                youtube_url=parent.youtube_url,
+                user_id=user_id
+            )
+            await _check_usage_limits(user_id, file_info)
+        
+        job = await transcription_service.rerun_job(job_id, current_user["user_id"], options)
+        
+        if not job:
+            raise HTTPException(status_code=404, detail="Completed job not found")
+        
+        return TranscriptionResponse(
+            job_id=job.job_id,
+            status="processing",
+            message="Transcription re-run started successfully"
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error re-running job {job_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to re-run job")
+
+
 @router.delete("/jobs/{job_id}")
 async def cancel_transcription_job(
     job_id: str,
@@ -0,0 +1,487 @@
+"""
+Pure-Python audio container header parsing.
+
+Reads duration, sample rate and channel count straight from container headers
+(WAV/RIFF, MP3, FLAC, Ogg Vorbis/Opus and MP4/M4A) so the common formats can
+be measured without spawning ffprobe. Every parser returns None when it does
+not recognise the data, leaving unknown containers to ffprobe.
+"""
+
+import struct
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the start (and end) of a file for header parsing
+HEAD_SIZE = 64 * 1024
+TAIL_SIZE = 64 * 1024
+
+# Upper bound on an MP4 moov box read into memory
+MAX_MOOV_SIZE = 16 * 1024 * 1024
+
+MP4_FORMAT_NAME = "mov,mp4,m4a,3gp,3g2,mj2"
+
+# MPEG audio bitrate tables in kbps, indexed by (version_is_mpeg1, layer)
+_MP3_BITRATES = {
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+# Sample rates indexed by MPEG version bits (0 = 2.5, 2 = 2, 3 = 1)
+_MP3_SAMPLE_RATES = {
+    0: [11025, 12000, 8000],
+    2: [22050, 24000, 16000],
+    3: [44100, 48000, 32000],
+}
+
+
+def read_audio_header(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Read audio metadata from a file's container headers.
+    
+    Only the first and last few KB are read, plus the moov box for MP4 files.
+    
+    Args:
+        path: Path to audio file
+        
+    Returns:
+        Metadata dictionary in the same shape as AudioService.get_audio_metadata,
+        or None if the container is not recognised
+    """
+    try:
+        file_size = path.stat().st_size
+        with open(path, "rb") as f:
+            head = f.read(HEAD_SIZE)
+            
+            if _is_mp4(head):
+                return _finalize(_parse_mp4_file(f, file_size), file_size)
+                
+            tail = b""
+            if head.startswith(b"OggS") and file_size > HEAD_SIZE:
+                f.seek(max(0, file_size - TAIL_SIZE))
+                tail = f.read(TAIL_SIZE)
+                
+        return parse_audio_header(head, file_size, tail)
+        
+    except Exception as e:
+        logger.debug(f"Header parsing failed for {path}: {str(e)}")
+        return None
+
+
+def parse_audio_header(head: bytes, file_size: int, tail: bytes = b"") -> Optional[Dict[str, Any]]:
+    """
+    Parse audio metadata from the leading bytes of a file.
+    
+    Args:
+        head: First bytes of the file (HEAD_SIZE is enough for most formats)
+        file_size: Total file size in bytes
+        tail: Last bytes of the file, needed for Ogg duration
+        
+    Returns:
+        Metadata dictionary, or None if the container is not recognised or the
+        header does not contain enough information
+    """
+    try:
+        if head.startswith(b"RIFF") and head[8:12] == b"WAVE":
+            result = _parse_wav(head, file_size)
+        elif head.startswith(b"fLaC"):
+            result = _parse_flac(head, file_size)
+        elif head.startswith(b"OggS"):
+            result = _parse_ogg(head, tail or head, file_size)
+        elif _is_mp4(head):
+            result = _parse_mp4_bytes(head, file_size)
+        elif head.startswith(b"ID3") or head[:2] >= b"\xff\xe0":
+            result = _parse_mp3(head, file_size)
+        else:
+            return None
+    except (struct.error, IndexError, ValueError, ZeroDivisionError) as e:
+        logger.debug(f"Malformed audio header: {str(e)}")
+        return None
+        
+    return _finalize(result, file_size)
+
+
+def _finalize(result: Optional[Dict[str, Any]], file_size: int) -> Optional[Dict[str, Any]]:
+    """Reject results without a duration and fill in size and bitrate."""
+    if not result or result.get("duration", 0) <= 0:
+        return None
+        
+    result["size"] = file_size
+    if not result.get("bitrate"):
+        result["bitrate"] = int(file_size * 8 / result["duration"])
+    return result
+
+
+def _parse_wav(data: bytes, file_size: int) -> Optional[Dict[str, Any]]:
+    """Parse RIFF/WAVE fmt and data chunks."""
+    offset = 12
+    fmt = None
+    
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        chunk_size = struct.unpack_from("<I", data, offset + 4)[0]
+        body = offset + 8
+        
+        if chunk_id == b"fmt ":
+            audio_format, channels, sample_rate, byte_rate, _, bits = struct.unpack_from("<HHIIHH", data, body)
+            fmt = (audio_format, channels, sample_rate, byte_rate, bits)
+        elif chunk_id == b"data":
+            if fmt is None or not fmt[3]:
+                return None
+            audio_format, channels, sample_rate, byte_rate, bits = fmt
+            # Streamed WAVs may leave the data size unset
+            if chunk_size in (0, 0xFFFFFFFF) or body + chunk_size > file_size:
+                chunk_size = file_size - body
+            codec = f"pcm_s{bits}le" if audio_format in (1, 0xFFFE) else "unknown"
+            if audio_format in (1, 0xFFFE) and bits == 8:
+                codec = "pcm_u8"
+            return {
+                "duration": chunk_size / byte_rate,
+                "format": "wav",
+                "bitrate": byte_rate * 8,
+                "sample_rate": sample_rate,
+                "channels": channels,
+                "codec": codec
+            }
+            
+        offset = body + chunk_size + (chunk_size & 1)
+        
+    return None
+
+
+def _parse_flac(data: bytes, file_size: int) -> Optional[Dict[str, Any]]:
+    """Parse the FLAC STREAMINFO metadata block."""
+    block_type = data[4] & 0x7F
+    if block_type != 0:
+        return None
+        
+    info = data[8:8 + 34]
+    packed = int.from_bytes(info[10:18], "big")
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    total_samples = packed & 0xFFFFFFFFF
+    
+    if not sample_rate or not total_samples:
+        return None
+        
+    return {
+        "duration": total_samples / sample_rate,
+        "format": "flac",
+        "sample_rate": sample_rate,
+        "channels": channels,
+        "codec": "flac"
+    }
+
+
+def _parse_ogg(head: bytes, tail: bytes, file_size: int) -> Optional[Dict[str, Any]]:
+    """Parse an Ogg Vorbis/Opus identification header and the last granule position."""
+    segment_count = head[26]
+    packet = head[27 + segment_count:]
+    serial = head[14:18]
+    
+    if packet.startswith(b"OpusHead"):
+        channels = packet[9]
+        pre_skip = struct.unpack_from("<H", packet, 10)[0]
+        input_rate = struct.unpack_from("<I", packet, 12)[0]
+        codec, granule_rate, skip = "opus", 48000, pre_skip
+        sample_rate = input_rate or 48000
+    elif packet.startswith(b"\x01vorbis"):
+        channels = packet[11]
+        sample_rate = struct.unpack_from("<I", packet, 12)[0]
+        codec, granule_rate, skip = "vorbis", sample_rate, 0
+    else:
+        return None
+        
+    granule = _last_ogg_granule(tail, serial)
+    if granule is None or not granule_rate:
+        return None
+        
+    return {
+        "duration": max(granule - skip, 0) / granule_rate,
+        "format": "ogg",
+        "sample_rate": sample_rate,
+        "channels": channels,
+        "codec": codec
+    }
+
+
+def _last_ogg_granule(data: bytes, serial: bytes) -> Optional[int]:
+    """Find the granule position of the last complete page for a stream."""
+    position = data.rfind(b"OggS")
+    while position != -1:
+        if position + 27 <= len(data) and data[position + 14:position + 18] == serial:
+            granule = struct.unpack_from("<q", data, position + 6)[0]
+            if granule >= 0:
+                return granule
+        position = data.rfind(b"OggS", 0, position)
+    return None
+
+
+def _parse_mp3(data: bytes, file_size: int) -> Optional[Dict[str, Any]]:
+    """Parse MPEG audio frames, using Xing/Info or VBRI headers when present."""
+    offset = 0
+    if data.startswith(b"ID3") and len(data) >= 10:
+        tag_size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        offset = 10 + tag_size + (10 if data[5] & 0x10 else 0)
+        if offset >= len(data):
+            return None
+            
+    audio_start = _find_mp3_frame(data, offset)
+    if audio_start is None:
+        return None
+        
+    frame = _parse_mp3_frame_header(data, audio_start)
+    version_bits, layer, bitrate, sample_rate, channels, samples_per_frame, _ = frame
+    
+    # Xing/Info header follows the side information of the first frame
+    mpeg1 = version_bits == 3
+    if mpeg1:
+        side_info = 17 if channels == 1 else 32
+    else:
+        side_info = 9 if channels == 1 else 17
+    xing = audio_start + 4 + side_info
+    frames = None
+    if data[xing:xing + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack_from(">I", data, xing + 4)[0]
+        if flags & 0x1:
+            frames = struct.unpack_from(">I", data, xing + 8)[0]
+    elif data[audio_start + 36:audio_start + 40] == b"VBRI":
+        frames = struct.unpack_from(">I", data, audio_start + 36 + 14)[0]
+        
+    audio_bytes = file_size - audio_start
+    if frames:
+        duration = frames * samples_per_frame / sample_rate
+        return {
+            "duration": duration,
+            "format": "mp3",
+            "bitrate": int(audio_bytes * 8 / duration) if duration else 0,
+            "sample_rate": sample_rate,
+            "channels": channels,
+            "codec": "mp3"
+        }
+        
+    # No VBR header: scan the frames we have and assume their average bitrate
+    bitrates = []
+    position = audio_start
+    while position is not None and len(bitrates) < 64:
+        header = _parse_mp3_frame_header(data, position)
+        if header is None:
+            break
+        bitrates.append(header[2])
+        position += header[6]
+        if position + 4 > len(data):
+            break
+            
+    average_bitrate = sum(bitrates) / len(bitrates) * 1000
+    return {
+        "duration": audio_bytes * 8 / average_bitrate,
+        "format": "mp3",
+        "bitrate": int(average_bitrate),
+        "sample_rate": sample_rate,
+        "channels": channels,
+        "codec": "mp3"
+    }
+
+
+def _find_mp3_frame(data: bytes, offset: int) -> Optional[int]:
+    """Find the first frame sync followed by a second valid frame."""
+    limit = len(data) - 4
+    position = offset
+    while position < limit:
+        if data[position] == 0xFF and (data[position + 1] & 0xE0) == 0xE0:
+            header = _parse_mp3_frame_header(data, position)
+            if header is not None:
+                next_position = position + header[6]
+                # Accept a lone frame only when the buffer ends before the next one
+                if next_position + 4 > len(data) or _parse_mp3_frame_header(data, next_position):
+                    return position
+        position += 1
+    return None
+
+
+def _parse_mp3_frame_header(data: bytes, position: int) -> Optional[Tuple[int, int, int, int, int, int, int]]:
+    """
+    Decode a 4-byte MPEG audio frame header.
+    
+    Returns:
+        (version_bits, layer, bitrate_kbps, sample_rate, channels,
+        samples_per_frame, frame_length) or None if the header is invalid
+    """
+    if position + 4 > len(data):
+        return None
+    b1, b2, b3 = data[position + 1], data[position + 2], data[position + 3]
+    if data[position] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+        
+    version_bits = (b1 >> 3) & 0x3
+    layer = 4 - ((b1 >> 1) & 0x3)
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x3
+    padding = (b2 >> 1) & 0x1
+    
+    if version_bits == 1 or layer == 4 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+        
+    mpeg1 = version_bits == 3
+    bitrate = _MP3_BITRATES[(mpeg1, layer)][bitrate_index]
+    sample_rate = _MP3_SAMPLE_RATES[version_bits][sample_rate_index]
+    channels = 1 if (b3 >> 6) == 3 else 2
+    
+    if layer == 1:
+        samples_per_frame = 384
+        frame_length = (12 * bitrate * 1000 // sample_rate + padding) * 4
+    elif layer == 2 or mpeg1:
+        samples_per_frame = 1152
+        frame_length = 144 * bitrate * 1000 // sample_rate + padding
+    else:
+        samples_per_frame = 576
+        frame_length = 72 * bitrate * 1000 // sample_rate + padding
+        
+    if frame_length < 4:
+        return None
+        
+    return version_bits, layer, bitrate, sample_rate, channels, samples_per_frame, frame_length
+
+
+def _is_mp4(data: bytes) -> bool:
+    """Check for an ISO base media file (MP4/M4A/MOV)."""
+    return len(data) >= 12 and data[4:8] in (b"ftyp", b"moov", b"mdat", b"wide", b"free", b"skip")
+
+
+def _parse_mp4_file(f, file_size: int) -> Optional[Dict[str, Any]]:
+    """Walk top-level MP4 boxes with seeks and parse the moov box."""
+    offset = 0
+    while offset + 8 <= file_size:
+        f.seek(offset)
+        header = f.read(16)
+        size, box_type, header_size = _read_box_header(header, file_size - offset)
+        if size is None:
+            return None
+            
+        if box_type == b"moov":
+            if size > MAX_MOOV_SIZE:
+                return None
+            f.seek(offset + header_size)
+            result = _parse_moov(f.read(size - header_size))
+            return result
+            
+        offset += size
+        
+    return None
+
+
+def _parse_mp4_bytes(data: bytes, file_size: int) -> Optional[Dict[str, Any]]:
+    """Parse an MP4 whose moov box lies within the given leading bytes."""
+    offset = 0
+    while offset + 8 <= len(data):
+        size, box_type, header_size = _read_box_header(data[offset:offset + 16], file_size - offset)
+        if size is None:
+            return None
+        if box_type == b"moov":
+            if offset + size > len(data):
+                return None
+            return _parse_moov(data[offset + header_size:offset + size])
+        offset += size
+    return None
+
+
+def _read_box_header(header: bytes, remaining: int) -> Tuple[Optional[int], bytes, int]:
+    """Decode an MP4 box header into (size, type, header_size)."""
+    if len(header) < 8:
+        return None, b"", 0
+    size, box_type = struct.unpack_from(">I4s", header)
+    header_size = 8
+    if size == 1:
+        if len(header) < 16:
+            return None, b"", 0
+        size = struct.unpack_from(">Q", header, 8)[0]
+        header_size = 16
+    elif size == 0:
+        size = remaining
+    if size < header_size:
+        return None, b"", 0
+    return size, box_type, header_size
+
+
+def _iter_boxes(data: bytes):
+    """Yield (type, body) for each box in a buffer."""
+    offset = 0
+    while offset + 8 <= len(data):
+        size, box_type, header_size = _read_box_header(data[offset:offset + 16], len(data) - offset)
+        if size is None:
+            return
+        yield box_type, data[offset + header_size:offset + size]
+        offset += size
+
+
+def _parse_moov(moov: bytes) -> Optional[Dict[str, Any]]:
+    """Read duration from mvhd and audio parameters from the first sound track."""
+    duration = None
+    sample_rate = 0
+    channels = 0
+    codec = "unknown"
+    
+    for box_type, body in _iter_boxes(moov):
+        if box_type == b"mvhd":
+            if body[0] == 1:
+                timescale, length = struct.unpack_from(">IQ", body, 20)
+            else:
+                timescale, length = struct.unpack_from(">II", body, 12)
+            if timescale:
+                duration = length / timescale
+        elif box_type == b"trak" and not sample_rate:
+            audio = _parse_sound_track(body)
+            if audio:
+                codec, channels, sample_rate = audio
+                
+    if not duration:
+        return None
+        
+    result = {
+        "duration": duration,
+        "format": MP4_FORMAT_NAME,
+        "codec": codec
+    }
+    if sample_rate:
+        result["sample_rate"] = sample_rate
+        result["channels"] = channels
+    return result
+
+
+def _parse_sound_track(trak: bytes) -> Optional[Tuple[str, int, int]]:
+    """Return (codec, channels, sample_rate) if the track is an audio track."""
+    mdia = next((body for box_type, body in _iter_boxes(trak) if box_type == b"mdia"), None)
+    if mdia is None:
+        return None
+        
+    is_sound = False
+    stbl = None
+    for box_type, body in _iter_boxes(mdia):
+        if box_type == b"hdlr":
+            is_sound = body[8:12] == b"soun"
+        elif box_type == b"minf":
+            stbl = next((b for t, b in _iter_boxes(body) if t == b"stbl"), None)
+            
+    if not is_sound or stbl is None:
+        return None
+        
+    stsd = next((body for box_type, body in _iter_boxes(stbl) if box_type == b"stsd"), None)
+    if stsd is None:
+        return None
+        
+    # Skip version/flags and entry count to reach the first sample entry
+    for entry_type, entry in _iter_boxes(stsd[8:]):
+        channels = struct.unpack_from(">H", entry, 16)[0]
+        sample_rate = struct.unpack_from(">I", entry, 24)[0] >> 16
+        codec = {b"mp4a": "aac", b"alac": "alac", b"Opus": "opus", b"fLaC": "flac"}.get(
+            entry_type, entry_type.decode("latin-1").strip()
+        )
+        return codec, channels, sample_rate
+        
+    return None
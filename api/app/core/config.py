@@ -55,6 +55,19 @@ class Settings(BaseSettings):
     
     # File Storage
     max_file_size: int = 100 * 1024 * 1024  # 100MB
+    upload_chunk_size: int = 1024 * 1024  # Bytes copied per read when saving uploads
+    max_resumable_file_size: int = 1024 * 1024 * 1024  # 1GB; plan limits still apply
+    resumable_chunk_size: int = 8 * 1024 * 1024  # Chunk size suggested to resumable upload clients
+    upload_session_ttl: int = 24 * 60 * 60  # Idle resumable uploads are deleted after this
+    max_upload_sessions_per_user: int = 5  # Open resumable uploads per user
+    max_upload_session_bytes_per_user: int = 2 * 1024 * 1024 * 1024  # 2GB preallocated across a user's open uploads
+    upload_session_path: str = "/tmp/cantonese-scribe-state/uploads.db"
+    file_index_path: str = "/tmp/cantonese-scribe-state/files.db"  # Path, size, hash and expiry of stored files
+    upload_dedup_scope: str = "user"  # Hash-first uploads may reuse content of: "user" (their own) or "global"
+    file_retention_hours: int = 24  # Uploads and processed files are deleted after this
+    temp_file_ttl: int = 2 * 60 * 60  # Scratch files (conversions, split segments); longer than job_timeout
+    temp_bucket_seconds: int = 15 * 60  # Scratch files expiring in the same window share a directory
+    transcode_cache_ttl: int = 24 * 60 * 60
     temp_dir: str = "/tmp/cantonese-scribe"
     upload_dir: str = "/tmp/cantonese-scribe/uploads"
     processed_dir: str = "/tmp/cantonese-scribe/processed"
@@ -64,6 +77,73 @@ class Settings(BaseSettings):
     job_timeout: int = 1800  # 30 minutes
     cleanup_interval: int = 3600  # 1 hour
     
+    # Job Queue
+    job_queue_path: str = "/tmp/cantonese-scribe-state/jobs.db"  # Outside temp_dir so cleanup never removes it
+    job_worker_mode: str = "embedded"  # "embedded" runs workers in the API process, "external" only enqueues
+    job_visibility_timeout: int = 300  # Seconds a lease lasts without a heartbeat
+    job_max_attempts: int = 3
+    job_retry_delay: int = 30  # Seconds before a crashed job is retried
+    job_queue_poll_interval: float = 1.0
+    job_stage_path: str = "/tmp/cantonese-scribe-state/stages.db"  # Stage outputs reused by retries and re-runs
+    job_stage_ttl: int = 7 * 24 * 3600  # 7 days
+    
+    # Chunked Transcription
+    chunked_transcription_enabled: bool = True
+    transcription_chunk_duration: int = 600  # 10 minutes
+    transcription_chunk_overlap: float = 2.0  # Seconds shared between adjacent chunks
+    whisper_max_concurrent_chunks: int = 4
+    google_speech_max_concurrent_chunks: int = 4
+    audio_split_mode: str = "single_pass"  # "single_pass" or "per_segment"
+    silence_aware_chunking: bool = True
+    silence_search_window: float = 60.0  # Seconds before each target cut searched for a pause
+    silence_chunk_overlap: float = 0.0  # Overlap used when cuts land in silence
+    audio_probe_cache_size: int = 256  # Cached ffprobe results
+    
+    # YouTube Downloads
+    youtube_cache_dir: str = "/tmp/cantonese-scribe-state/youtube"  # Shared by all users, outside temp_dir cleanup
+    youtube_cache_max_bytes: int = 5 * 1024 * 1024 * 1024  # Unreferenced videos are evicted beyond this
+    youtube_audio_format: str = "bestaudio/best"  # Audio-only stream, stored without re-encoding
+    youtube_concurrent_fragments: int = 4
+    youtube_probe_timeout: int = 30  # Seconds for a metadata-only yt-dlp run
+    youtube_probe_cache_ttl: int = 3600  # Video metadata is reused this long
+    youtube_probe_cache_size: int = 1024
+    
+    # Provider Upload Transcoding
+    whisper_upload_transcode: bool = True
+    upload_transcode_format: str = "opus"  # "opus" or "mp3"
+    upload_transcode_bitrate: str = "24k"
+    
+    # Outbound HTTP Connection Pools
+    http_pool_limit: int = 100  # Connections per provider pool
+    http_pool_limit_per_host: int = 20
+    http_dns_cache_ttl: int = 300  # Seconds
+    http_keepalive_timeout: float = 30.0  # Seconds an idle connection is kept open
+    
+    # Segment Post-processing
+    translation_max_segments_per_request: int = 128  # Google Translate v2 limit on q fields
+    translation_max_chars_per_request: int = 5000  # Recommended maximum request size
+    translation_max_concurrent_batches: int = 4
+    
+    # Romanization
+    romanization_lexicon_enabled: bool = True  # Compiled trie instead of per-call PyCantonese lookups
+    romanization_lexicon_snapshot: str = "/tmp/cantonese-scribe-state/jyutping_lexicon.snapshot"  # Prebuilt with python -m app.core.jyutping_lexicon, "" to disable
+    romanization_executor: str = "process"  # "process" or "thread"
+    romanization_workers: int = 2  # Each process holds its own copy of the lexicon
+    romanization_batch_size: int = 200  # Segments per pool task
+    romanization_cache_size: int = 20000  # Memoized (text, flags) results, 0 to disable
+    
+    # Translation Cache
+    translation_cache_path: str = "/tmp/cantonese-scribe-state/translations.db"
+    translation_cache_size: int = 50000  # Entries kept in memory
+    translation_cache_ttl: int = 30 * 24 * 3600  # 30 days
+    translation_cache_warm_up: int = 5000  # Most frequent entries loaded at startup
+    
+    # Transcription Result Cache
+    transcription_cache_enabled: bool = True
+    transcription_cache_path: str = "/tmp/cantonese-scribe-state/transcriptions.db"
+    transcription_cache_ttl: int = 30 * 24 * 3600  # 30 days
+    transcription_cache_max_bytes: int = 512 * 1024 * 1024  # Least recently used results are evicted beyond this
+    
     # Rate Limiting
     rate_limit_requests: int = 100
     rate_limit_window: int = 3600  # 1 hour
@@ -0,0 +1,326 @@
+"""
+SQLite index of stored user files.
+
+FileManager records every upload and processed file here when it writes
+it: path, owner, file ID, type, size and hash. Lookups by file ID, the
+newest export of a job, file listings and storage totals are then index
+queries instead of directory globs and a stat() per file. Per-user
+totals are kept up to date by triggers, so reading them is a single-row
+lookup. Each entry also carries its expiry time, so cleanup reads the
+expired files from an index rather than scanning the tree.
+
+Uploads are stored once per distinct content as blobs named by their
+SHA-256; each user's upload is a hard link to its blob. Triggers count
+the uploads referencing each blob, so unreferenced blobs can be found
+without scanning.
+"""
+
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+UPLOAD = "upload"
+PROCESSED = "processed"
+TRANSCODE = "transcode"
+
+# user_version of an index whose pre-existing files have been indexed
+_BACKFILL_VERSION = 1
+
+
+class FileIndex:
+    """Index of user files keyed by path."""
+    
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self._initialized = False
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; one per operation so it can run in any thread."""
+        if not self._initialized:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    area TEXT NOT NULL,
+                    file_id TEXT NOT NULL,
+                    file_type TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    file_hash TEXT,
+                    modified_at REAL NOT NULL,
+                    expires_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_files_lookup
+                    ON files (user_id, area, file_id, file_type, modified_at);
+                CREATE INDEX IF NOT EXISTS idx_files_listing
+                    ON files (user_id, modified_at);
+                    
+                CREATE TABLE IF NOT EXISTS user_usage (
+                    user_id TEXT NOT NULL,
+                    area TEXT NOT NULL,
+                    size INTEGER NOT NULL DEFAULT 0,
+                    files INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_id, area)
+                );
+                
+                CREATE TRIGGER IF NOT EXISTS files_usage_insert AFTER INSERT ON files BEGIN
+                    INSERT INTO user_usage (user_id, area, size, files) VALUES (NEW.user_id, NEW.area, NEW.size, 1)
+                    ON CONFLICT (user_id, area) DO UPDATE SET size = size + NEW.size, files = files + 1;
+                END;
+                CREATE TRIGGER IF NOT EXISTS files_usage_delete AFTER DELETE ON files BEGIN
+                    UPDATE user_usage SET size = size - OLD.size, files = files - 1
+                    WHERE user_id = OLD.user_id AND area = OLD.area;
+                END;
+                
+                CREATE TABLE IF NOT EXISTS blobs (
+                    hash TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    refs INTEGER NOT NULL DEFAULT 0,
+                    linked_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_blobs_refs ON blobs (refs);
+                CREATE INDEX IF NOT EXISTS idx_files_hash ON files (file_hash, user_id);
+                
+                CREATE TRIGGER IF NOT EXISTS files_blob_insert AFTER INSERT ON files
+                WHEN NEW.area = 'upload' AND NEW.file_hash IS NOT NULL BEGIN
+                    UPDATE blobs SET refs = refs + 1 WHERE hash = NEW.file_hash;
+                END;
+                CREATE TRIGGER IF NOT EXISTS files_blob_delete AFTER DELETE ON files
+                WHEN OLD.area = 'upload' AND OLD.file_hash IS NOT NULL BEGIN
+                    UPDATE blobs SET refs = refs - 1 WHERE hash = OLD.file_hash;
+                END;
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(files)")}
+            if "expires_at" not in columns:
+                conn.execute("ALTER TABLE files ADD COLUMN expires_at REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_files_expiry ON files (expires_at)")
+            self._initialized = True
+            
+        return conn
+    
+    def add(
+        self,
+        path: Path,
+        user_id: str,
+        area: str,
+        file_id: str,
+        file_type: str,
+        size: int,
+        file_hash: Optional[str] = None,
+        modified_at: Optional[float] = None,
+        expires_at: Optional[float] = None
+    ) -> None:
+        """Record a written file, replacing any earlier entry for the same path."""
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Delete then insert so the usage triggers see the old size leave
+            conn.execute("DELETE FROM files WHERE path = ?", (str(path),))
+            conn.execute(
+                """
+                INSERT INTO files (path, user_id, area, file_id, file_type, size, file_hash, modified_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (str(path), user_id, area, file_id, file_type, size, file_hash, modified_at or time.time(), expires_at)
+            )
+            conn.execute("COMMIT")
+    
+    def remove(self, paths: Iterable[Path]) -> None:
+        """Forget deleted files."""
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("DELETE FROM files WHERE path = ?", [(str(path),) for path in paths])
+            conn.execute("COMMIT")
+    
+    def find(
+        self,
+        user_id: str,
+        area: str,
+        file_id: str,
+        file_type: Optional[str] = None
+    ) -> Optional[Path]:
+        """Get the newest file of a user with the given ID (and type)."""
+        query = "SELECT path FROM files WHERE user_id = ? AND area = ? AND file_id = ?"
+        params: List[Any] = [user_id, area, file_id]
+        if file_type is not None:
+            query += " AND file_type = ?"
+            params.append(file_type)
+        query += " ORDER BY modified_at DESC LIMIT 1"
+        
+        with closing(self._connect()) as conn:
+            row = conn.execute(query, params).fetchone()
+        return Path(row[0]) if row else None
+    
+    def list_user_files(self, user_id: str) -> List[Dict[str, Any]]:
+        """Get a user's files, newest first."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                """
+                SELECT path, area, size, modified_at FROM files
+                WHERE user_id = ? ORDER BY modified_at DESC
+                """,
+                (user_id,)
+            ).fetchall()
+        return [
+            {"path": Path(path), "area": area, "size": size, "modified_at": modified_at}
+            for path, area, size, modified_at in rows
+        ]
+    
+    def usage(self, user_id: str) -> Dict[str, Dict[str, int]]:
+        """Get a user's total size and file count per area."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT area, size, files FROM user_usage WHERE user_id = ?",
+                (user_id,)
+            ).fetchall()
+        return {area: {"size": size, "files": files} for area, size, files in rows}
+    
+    def expired(self, now: float, limit: int = 1000) -> List[Tuple[Path, int]]:
+        """Get up to limit files whose expiry has passed, with their sizes."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT path, size FROM files WHERE expires_at <= ? ORDER BY expires_at LIMIT ?",
+                (now, limit)
+            ).fetchall()
+        return [(Path(path), size) for path, size in rows]
+    
+    def renew(self, path: Path, now: float, expires_at: float) -> bool:
+        """
+        Push back the expiry of a file that has not expired yet.
+        
+        Returns:
+            False if the file is not indexed or already expired, in which
+            case cleanup may be deleting it
+        """
+        with closing(self._connect()) as conn:
+            renewed = conn.execute(
+                "UPDATE files SET expires_at = MAX(expires_at, ?) WHERE path = ? AND expires_at > ?",
+                (expires_at, str(path), now)
+            ).rowcount
+        return renewed > 0
+    
+    def add_blob(self, file_hash: str, path: Path, size: int) -> None:
+        """
+        Record a blob an upload was just linked to.
+        
+        Uploads added afterwards with its hash reference it; until then the
+        link time keeps it from being collected.
+        """
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """
+                INSERT INTO blobs (hash, path, size, linked_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (hash) DO UPDATE SET linked_at = excluded.linked_at
+                """,
+                (file_hash, str(path), size, time.time())
+            )
+    
+    def find_blob(self, file_hash: str, user_id: Optional[str] = None) -> Optional[Path]:
+        """
+        Get the blob stored for a hash.
+        
+        Args:
+            file_hash: SHA-256 of the content
+            user_id: If given, only return the blob if this user has an
+                upload with that content
+        """
+        with closing(self._connect()) as conn:
+            if user_id is not None:
+                owned = conn.execute(
+                    "SELECT 1 FROM files WHERE file_hash = ? AND user_id = ? AND area = ? LIMIT 1",
+                    (file_hash, user_id, UPLOAD)
+                ).fetchone()
+                if owned is None:
+                    return None
+            row = conn.execute("SELECT path FROM blobs WHERE hash = ?", (file_hash,)).fetchone()
+        return Path(row[0]) if row else None
+    
+    def unreferenced_blobs(self, linked_before: float, limit: int = 1000) -> List[Tuple[str, Path]]:
+        """Get up to limit blobs no upload references that were last linked before linked_before."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT hash, path FROM blobs WHERE refs <= 0 AND linked_at < ? LIMIT ?",
+                (linked_before, limit)
+            ).fetchall()
+        return [(file_hash, Path(path)) for file_hash, path in rows]
+    
+    def remove_blobs(self, hashes: Iterable[str]) -> None:
+        """Forget deleted blobs."""
+        with closing(self._connect()) as conn:
+            conn.executemany("DELETE FROM blobs WHERE hash = ?", [(file_hash,) for file_hash in hashes])
+    
+    def blob_stats(self) -> Dict[str, int]:
+        """Get blob count, bytes stored and bytes the referencing uploads would take without sharing."""
+        with closing(self._connect()) as conn:
+            blobs, stored, referenced = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(size * MAX(refs, 0)), 0) FROM blobs"
+            ).fetchone()
+        return {"blobs": blobs, "stored_bytes": stored, "referenced_bytes": referenced}
+    
+    def backfill(self, roots: Dict[str, Path], retention: float) -> None:
+        """
+        Index files written before the index existed.
+        
+        Runs once per index database, recorded in its user_version; later
+        calls return at once. Entries whose files disappear are dropped
+        when they are next looked up or expire, so nothing is scanned
+        on later startups. Files are expected at
+        <root>/<user_id>/<file_id><rest>, as FileManager writes them.
+        
+        Args:
+            roots: Directory of each area, e.g. {"upload": upload_dir}
+            retention: Seconds a file is kept after it was last modified,
+                for files indexed without an expiry
+        """
+        with closing(self._connect()) as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= _BACKFILL_VERSION:
+                return
+            indexed = {path for (path,) in conn.execute("SELECT path FROM files")}
+            
+        added = 0
+        for area, root in roots.items():
+            if not root.exists():
+                continue
+            for user_dir in root.iterdir():
+                if not user_dir.is_dir() or user_dir.name.startswith("."):
+                    continue
+                for path in user_dir.iterdir():
+                    if str(path) in indexed or not path.is_file() or path.name.startswith("."):
+                        continue
+                    file_id, file_type = self._parse_name(path.name, area)
+                    stat = path.stat()
+                    self.add(
+                        path, user_dir.name, area, file_id, file_type, stat.st_size,
+                        None, stat.st_mtime, stat.st_mtime + retention
+                    )
+                    added += 1
+                    
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE files SET expires_at = modified_at + ? WHERE expires_at IS NULL",
+                (retention,)
+            )
+            conn.execute(f"PRAGMA user_version = {_BACKFILL_VERSION}")
+            
+        logger.info(f"File index backfilled: {added} existing files added")
+    
+    @staticmethod
+    def _parse_name(name: str, area: str) -> Tuple[str, str]:
+        """Recover file ID and type from a name FileManager generated."""
+        stem = name.split(".", 1)[0]
+        if area == PROCESSED:
+            # {file_id}_{file_type}_{YYYYmmdd}_{HHMMSS}
+            parts = stem.split("_")
+            if len(parts) >= 4:
+                return parts[0], "_".join(parts[1:-2])
+        return stem, area
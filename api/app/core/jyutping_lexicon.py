@@ -0,0 +1,316 @@
+"""
+Compiled Jyutping lexicon for fast Cantonese romanization.
+
+The PyCantonese word list and character readings are compiled once into a
+longest-match word trie and a codepoint-indexed character table. A whole
+transcript can then be romanized with one dictionary walk per word, and
+Yale is derived from the Jyutping result instead of a second lookup.
+
+Compiling takes several seconds, so the result can be saved as a
+snapshot that later processes load without importing PyCantonese. The
+snapshot is plain JSON, so loading one never runs code from the file:
+
+    python -m app.core.jyutping_lexicon /path/to/jyutping_lexicon.snapshot
+"""
+
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+# PyCantonese's segmenter never produces words longer than this
+MAX_WORD_LENGTH = 5
+
+# Trie node key holding the Jyutping of the word ending at that node
+_TERMINAL = ""
+
+# Snapshot header: magic, format version, length of the source version string
+SNAPSHOT_FORMAT = 2
+_SNAPSHOT_MAGIC = b"JPLX"
+_SNAPSHOT_HEADER = struct.Struct("<4sHH")
+
+
+class JyutpingLexicon:
+    """Longest-match word trie with a per-codepoint fallback table."""
+    
+    def __init__(
+        self,
+        words: Dict[str, Optional[str]],
+        chars: Dict[str, str],
+        max_word_length: int = MAX_WORD_LENGTH
+    ):
+        """
+        Compile the lookup structures.
+        
+        Args:
+            words: Segmentation words mapped to their Jyutping (None if unknown)
+            chars: Single characters mapped to their most common Jyutping
+            max_word_length: Longest word the matcher may produce
+        """
+        self.max_word_length = max_word_length
+        self.trie: Dict[str, dict] = {}
+        self.word_count = 0
+        
+        for word, jyutping in words.items():
+            if len(word) < 2 or len(word) > max_word_length:
+                continue
+            node = self.trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[_TERMINAL] = jyutping
+            self.word_count += 1
+            
+        # Fallback readings indexed by codepoint; CJK blocks are dense so a list beats a dict
+        size = max((ord(char) for char in chars), default=-1) + 1
+        self.char_table: List[Optional[str]] = [None] * size
+        for char, jyutping in chars.items():
+            self.char_table[ord(char)] = jyutping
+            
+        self._yale_cache: Dict[str, Optional[str]] = {}
+        self._jyutping_to_yale = None
+    
+    @classmethod
+    def from_pycantonese(cls) -> "JyutpingLexicon":
+        """
+        Build the lexicon from the data PyCantonese uses for characters_to_jyutping.
+        
+        Raises:
+            ImportError: If PyCantonese or its internal data tables are unavailable
+        """
+        from pycantonese.jyutping.characters import _get_words_characters_to_jyutping
+        from pycantonese.word_segmentation import _get_default_segmenter
+        
+        words_to_jyutping, chars_to_jyutping = _get_words_characters_to_jyutping()
+        segmenter = _get_default_segmenter()
+        
+        # Segmentation words without their own reading fall back to per-character
+        # readings, and to None if any character is unknown, as in PyCantonese
+        words: Dict[str, Optional[str]] = {}
+        for parts in segmenter._words:
+            word = "".join(parts)
+            if len(parts) != len(word):
+                continue  # Alphanumeric runs never survive text cleaning
+            jyutping = words_to_jyutping.get(word)
+            if jyutping is None:
+                char_readings = [chars_to_jyutping.get(char) for char in word]
+                jyutping = None if None in char_readings else "".join(char_readings)
+            words[word] = jyutping
+            
+        # A single character segmented as a word takes its word reading first
+        chars = {
+            **chars_to_jyutping,
+            **{word: jyutping for word, jyutping in words_to_jyutping.items() if len(word) == 1}
+        }
+        
+        return cls(words, chars, max_word_length=segmenter.max_word_length)
+    
+    @classmethod
+    def load(cls, path: Union[str, Path], source_version: Optional[str] = None) -> "JyutpingLexicon":
+        """
+        Load a snapshot written by save().
+        
+        Each process decodes its own copy of the lexicon.
+        
+        Args:
+            path: Snapshot file
+            source_version: PyCantonese version the snapshot must have been built from
+            
+        Raises:
+            FileNotFoundError: If there is no snapshot at path
+            ValueError: If the snapshot is corrupt, of another format, stale or
+                not owned by this user
+        """
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            # Anyone able to replace the snapshot controls every romanization
+            if hasattr(os, "getuid") and (stat.st_uid != os.getuid() or stat.st_mode & 0o022):
+                raise ValueError("Lexicon snapshot is writable by other users")
+            data = f.read()
+            
+        if len(data) < _SNAPSHOT_HEADER.size:
+            raise ValueError("Lexicon snapshot is truncated")
+            
+        magic, snapshot_format, version_length = _SNAPSHOT_HEADER.unpack_from(data)
+        if magic != _SNAPSHOT_MAGIC or snapshot_format != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported lexicon snapshot format {snapshot_format}")
+            
+        offset = _SNAPSHOT_HEADER.size
+        built_from = data[offset:offset + version_length].decode("utf-8")
+        if source_version is not None and built_from != source_version:
+            raise ValueError(f"Lexicon snapshot built from PyCantonese {built_from}, have {source_version}")
+            
+        state = json.loads(data[offset + version_length:])
+        if not isinstance(state, dict):
+            raise ValueError("Lexicon snapshot is corrupt")
+            
+        lexicon = cls.__new__(cls)
+        lexicon.max_word_length = state["max_word_length"]
+        lexicon.trie = state["trie"]
+        lexicon.word_count = state["word_count"]
+        lexicon.char_table = state["char_table"]
+        lexicon._yale_cache = state["yale"]
+        lexicon._jyutping_to_yale = None
+        return lexicon
+    
+    def save(self, path: Union[str, Path], source_version: str = "") -> None:
+        """
+        Write a snapshot of the compiled lexicon.
+        
+        The file is written under a temporary name and renamed into place,
+        so concurrent loaders never see a partial snapshot.
+        
+        Args:
+            path: Snapshot file
+            source_version: PyCantonese version the lexicon was built from
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        version = source_version.encode("utf-8")
+        state = {
+            "max_word_length": self.max_word_length,
+            "trie": self.trie,
+            "word_count": self.word_count,
+            "char_table": self.char_table,
+            "yale": self._yale_cache
+        }
+        
+        partial_path = path.with_name(f"{path.name}.{os.getpid()}.partial")
+        try:
+            with open(partial_path, "wb") as f:
+                f.write(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, len(version)))
+                f.write(version)
+                f.write(json.dumps(state, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            os.replace(partial_path, path)
+        finally:
+            if partial_path.exists():
+                partial_path.unlink()
+    
+    def precompute_yale(self) -> int:
+        """
+        Convert every reading in the lexicon to Yale.
+        
+        A snapshot saved afterwards romanizes to Yale without PyCantonese.
+        
+        Returns:
+            Number of readings converted
+        """
+        readings = {jyutping for jyutping in self.char_table if jyutping}
+        nodes = [self.trie]
+        while nodes:
+            node = nodes.pop()
+            for key, value in node.items():
+                if key != _TERMINAL:
+                    nodes.append(value)
+                elif value:
+                    readings.add(value)
+                    
+        self.to_yale([("", jyutping) for jyutping in readings])
+        return len(readings)
+    
+    def lookup(self, text: str) -> List[Tuple[str, Optional[str]]]:
+        """
+        Segment text and romanize each word.
+        
+        Args:
+            text: Cantonese text; whitespace is ignored
+            
+        Returns:
+            List of (word, jyutping) pairs, jyutping None for unknown words,
+            in the same shape as pycantonese.characters_to_jyutping
+        """
+        text = "".join(text.split())
+        trie = self.trie
+        char_table = self.char_table
+        table_size = len(char_table)
+        max_length = self.max_word_length
+        length = len(text)
+        result: List[Tuple[str, Optional[str]]] = []
+        
+        i = 0
+        while i < length:
+            # Walk the trie as far as the text allows, remembering the longest word
+            node = trie
+            match_end = 0
+            match_jyutping = None
+            j = i
+            while j < length and j - i < max_length:
+                node = node.get(text[j])
+                if node is None:
+                    break
+                j += 1
+                if _TERMINAL in node:
+                    match_end = j
+                    match_jyutping = node[_TERMINAL]
+                    
+            if match_end:
+                result.append((text[i:match_end], match_jyutping))
+                i = match_end
+                continue
+                
+            char = text[i]
+            codepoint = ord(char)
+            result.append((char, char_table[codepoint] if codepoint < table_size else None))
+            i += 1
+            
+        return result
+    
+    def to_yale(self, pairs: List[Tuple[str, Optional[str]]]) -> List[Tuple[str, Optional[str]]]:
+        """
+        Convert (word, jyutping) pairs to (word, yale) pairs.
+        
+        Conversions are memoized per Jyutping string, so each distinct word
+        reading is converted once. PyCantonese is only imported on a miss.
+        """
+        cache = self._yale_cache
+        result = []
+        for word, jyutping in pairs:
+            if not jyutping:
+                result.append((word, None))
+                continue
+            yale = cache.get(jyutping)
+            if yale is None and jyutping not in cache:
+                if self._jyutping_to_yale is None:
+                    from pycantonese import jyutping_to_yale
+                    self._jyutping_to_yale = jyutping_to_yale
+                try:
+                    yale = self._jyutping_to_yale(jyutping, as_list=False)
+                except ValueError:
+                    yale = None
+                cache[jyutping] = yale
+            result.append((word, yale))
+        return result
+
+
+def pycantonese_version() -> str:
+    """
+    Get the installed PyCantonese version without importing it.
+    
+    Raises:
+        ImportError: If PyCantonese is not installed
+    """
+    from importlib.metadata import PackageNotFoundError, version
+    
+    try:
+        return version("pycantonese")
+    except PackageNotFoundError:
+        raise ImportError("PyCantonese is not installed")
+
+
+def build_snapshot(path: Union[str, Path]) -> JyutpingLexicon:
+    """Compile the lexicon from PyCantonese, with Yale readings, and save it to path."""
+    lexicon = JyutpingLexicon.from_pycantonese()
+    lexicon.precompute_yale()
+    lexicon.save(path, source_version=pycantonese_version())
+    return lexicon
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Build a Jyutping lexicon snapshot")
+    parser.add_argument("output", type=Path, help="Snapshot file to write")
+    args = parser.parse_args()
+    
+    lexicon = build_snapshot(args.output)
+    print(f"Wrote {lexicon.word_count} words to {args.output} ({args.output.stat().st_size // 1024} KiB)")
@@ -0,0 +1,98 @@
+"""
+Deferred imports for heavy provider SDKs.
+
+google-cloud-speech, stripe and supabase each take hundreds of
+milliseconds to import, and a cold start needs none of them to serve
+its first request. ``lazy_import`` returns a stand-in module that does
+the real import on first attribute access.
+"""
+
+import importlib
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+_lock = threading.RLock()
+_modules: Dict[str, "LazyModule"] = {}
+
+
+class LazyModule:
+    """Module proxy that imports the real module on first use."""
+    
+    def __init__(self, name: str):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+        object.__setattr__(self, "_import_seconds", None)
+        object.__setattr__(self, "_on_load", [])
+    
+    def _load(self) -> Any:
+        """Import the module if needed and return it."""
+        module = self._module
+        if module is None:
+            with _lock:
+                module = self._module
+                if module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    object.__setattr__(self, "_import_seconds", time.perf_counter() - start)
+                    for callback in self._on_load:
+                        callback(module)
+                    object.__setattr__(self, "_module", module)
+        return module
+    
+    def on_load(self, callback: Callable[[Any], None]) -> None:
+        """
+        Run callback with the real module once it is imported.
+        
+        Use this to configure the module (e.g. set an API key) without
+        importing it; setting an attribute on the proxy imports it.
+        """
+        with _lock:
+            if self._module is None:
+                self._on_load.append(callback)
+                return
+        callback(self._module)
+    
+    @property
+    def loaded(self) -> bool:
+        """Whether the real module has been imported."""
+        return self._module is not None
+    
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+    
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._load(), attr, value)
+    
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name: str) -> Any:
+    """
+    Get a module that is imported on first attribute access.
+    
+    Args:
+        name: Absolute module name, e.g. "google.cloud.speech"
+        
+    Returns:
+        Proxy standing in for the module; ImportError surfaces on first use
+    """
+    with _lock:
+        module = _modules.get(name)
+        if module is None:
+            module = LazyModule(name)
+            _modules[name] = module
+        return module
+
+
+def get_lazy_import_stats() -> Dict[str, Dict[str, Optional[float]]]:
+    """Get which deferred modules have been imported and what each import cost."""
+    return {
+        name: {
+            "loaded": module.loaded,
+            "import_seconds": module._import_seconds
+        }
+        for name, module in _modules.items()
+    }
@@ -0,0 +1,106 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same key share one in-flight call
+instead of each starting their own; the first caller runs it and the
+others await its result.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_groups: List["SingleFlight"] = []
+
+
+class SingleFlight:
+    """Group of in-flight calls keyed by their inputs."""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._stats = {"calls": 0, "saved_calls": 0}
+        _groups.append(self)
+    
+    def join(self, key: Hashable) -> Optional[asyncio.Future]:
+        """Return the future of an in-flight call for key, if any."""
+        future = self._in_flight.get(key)
+        if future is not None:
+            self._stats["saved_calls"] += 1
+        return future
+    
+    def start(self, key: Hashable) -> asyncio.Future:
+        """Register the caller as the one running the call for key."""
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self._stats["calls"] += 1
+        return future
+    
+    def finish(self, key: Hashable, result: Any = None, exception: Optional[BaseException] = None) -> None:
+        """
+        Complete the call for key and wake everyone waiting on it.
+        
+        A CancelledError cancels the shared future, so waiters retry the
+        call themselves instead of failing with the leader's cancellation.
+        """
+        future = self._in_flight.pop(key, None)
+        if future is None or future.done():
+            return
+            
+        if isinstance(exception, asyncio.CancelledError):
+            future.cancel()
+        elif exception is not None:
+            future.set_exception(exception)
+            future.exception()  # Mark retrieved when nobody else is waiting
+        else:
+            future.set_result(result)
+    
+    async def wait(self, future: asyncio.Future) -> Any:
+        """Await a joined call without letting the caller's cancellation cancel it."""
+        return await asyncio.shield(future)
+    
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run func for key, or await the identical call already in flight.
+        
+        Args:
+            key: Hashable identity of the call's inputs
+            func: Zero-argument coroutine function performing the call
+            
+        Returns:
+            Result of the shared call
+        """
+        while True:
+            future = self.join(key)
+            if future is None:
+                break
+            try:
+                return await self.wait(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader was cancelled; take over the call
+                continue
+                
+        self.start(key)
+        try:
+            result = await func()
+        except BaseException as e:
+            self.finish(key, exception=e)
+            raise
+            
+        self.finish(key, result=result)
+        return result
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get call and coalescing statistics."""
+        return {
+            **self._stats,
+            "in_flight": len(self._in_flight)
+        }
+
+
+def get_single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    """Get statistics of every single-flight group by name."""
+    return {group.name: group.get_stats() for group in _groups}
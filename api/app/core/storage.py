@@ -13,14 +13,18 @@ import shutil
 import tempfile
 import hashlib
 import asyncio
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Callable
 from fastapi import UploadFile, HTTPException
+from starlette.concurrency import run_in_threadpool
 import aiofiles
 import logging
 
 from ..core.config import get_settings
+from ..core.audio_headers import HEAD_SIZE, TAIL_SIZE
+from ..core.file_index import FileIndex, UPLOAD, PROCESSED, TRANSCODE
 
 logger = logging.getLogger(__name__)
 
@@ -33,11 +37,54 @@ class FileManager:
         self.temp_dir = Path(self.settings.temp_dir)
         self.upload_dir = Path(self.settings.upload_dir)
         self.processed_dir = Path(self.settings.processed_dir)
+        self.index = FileIndex(self.settings.file_index_path)
+        # Uploads are hard links to blobs stored once per distinct content
+        self.blob_root = self.upload_dir / ".blobs"
+        # Scratch files live in directories named after the time they expire by
+        self.scratch_root = self.temp_dir / "scratch"
+        self._cleanup_stats = {
+            "runs": 0,
+            "files": 0,
+            "buckets": 0,
+            "blobs": 0,
+            "bytes_reclaimed": 0,
+            "last_run": None
+        }
+        self._cleanup_hooks: Dict[str, Callable[[float], int]] = {}
     
     def ensure_directories(self) -> None:
-        """Ensure all required directories exist."""
+        """Ensure all required directories exist and the file index matches them."""
         for directory in [self.temp_dir, self.upload_dir, self.processed_dir]:
             directory.mkdir(parents=True, exist_ok=True)
+            
+        try:
+            self.index.backfill(
+                {UPLOAD: self.upload_dir, PROCESSED: self.processed_dir},
+                retention=self.settings.file_retention_hours * 3600
+            )
+        except Exception as e:
+            logger.error(f"Error backfilling file index: {str(e)}")
+    
+    def _expires_at(self) -> float:
+        """Expiry time of an upload or processed file written now."""
+        return time.time() + self.settings.file_retention_hours * 3600
+    
+    def scratch_dir(self, ttl: Optional[float] = None) -> Path:
+        """
+        Get the directory for scratch files that may be deleted after ttl seconds.
+        
+        Files expiring within the same temp_bucket_seconds window share a
+        directory named after the end of that window, so cleanup removes
+        whole directories without looking at the files in them.
+        
+        Args:
+            ttl: Seconds the files must survive, defaults to temp_file_ttl
+        """
+        expires_at = time.time() + (ttl if ttl is not None else self.settings.temp_file_ttl)
+        width = self.settings.temp_bucket_seconds
+        bucket = self.scratch_root / str(int(-(-expires_at // width) * width))
+        bucket.mkdir(parents=True, exist_ok=True)
+        return bucket
     
     def generate_file_id(self, filename: str) -> str:
         """Generate unique file ID based on filename and timestamp."""
@@ -45,6 +92,44 @@ class FileManager:
         content = f"{filename}_{timestamp}"
         return hashlib.md5(content.encode()).hexdigest()
     
+    async def get_upload_size(self, file: UploadFile) -> int:
+        """Get the size of an upload without reading its contents."""
+        if file.size is not None:
+            return file.size
+            
+        def _size() -> int:
+            position = file.file.tell()
+            size = file.file.seek(0, os.SEEK_END)
+            file.file.seek(position)
+            return size
+            
+        return await run_in_threadpool(_size)
+    
+    async def read_upload_header(self, file: UploadFile) -> Tuple[bytes, bytes, int]:
+        """
+        Read the bytes needed to parse an upload's container headers.
+        
+        Args:
+            file: FastAPI UploadFile object
+            
+        Returns:
+            Tuple of (head, tail, file size) for parse_audio_header; the
+            file is left positioned at its start
+        """
+        file_size = await self.get_upload_size(file)
+        
+        await file.seek(0)
+        head = await file.read(HEAD_SIZE)
+        
+        # Only Ogg needs the tail (for its last granule position)
+        tail = b""
+        if head.startswith(b"OggS") and file_size > HEAD_SIZE:
+            await file.seek(max(0, file_size - TAIL_SIZE))
+            tail = await file.read(TAIL_SIZE)
+            
+        await file.seek(0)
+        return head, tail, file_size
+    
     async def save_upload_file(
         self, 
         file: UploadFile, 
@@ -54,6 +139,11 @@ class FileManager:
         """
         Save uploaded file with proper organization and metadata.
         
+        The file is copied to disk in upload_chunk_size pieces while its
+        SHA-256 and size are computed, so memory use does not grow with the
+        file. An upload exceeding max_file_size is rejected as soon as the
+        limit is crossed.
+        
         Args:
             file: FastAPI UploadFile object
             user_id: User identifier for file organization
@@ -62,13 +152,11 @@ class FileManager:
         Returns:
             Dictionary with file metadata
         """
+        partial_path: Optional[Path] = None
         try:
             # Validate file size
-            if file.size > self.settings.max_file_size:
-                raise HTTPException(
-                    status_code=413,
-                    detail=f"File too large. Maximum size: {self.settings.max_file_size} bytes"
-                )
+            if file.size is not None and file.size > self.settings.max_file_size:
+                raise self._too_large()
             
             # Generate unique file ID and path
             file_id = self.generate_file_id(file.filename)
@@ -78,48 +166,218 @@ class FileManager:
             user_dir = self.upload_dir / user_id
             user_dir.mkdir(exist_ok=True)
             
-            # Generate safe filename
-            safe_filename = f"{file_id}{file_extension}"
-            file_path = user_dir / safe_filename
-            
-            # Save file asynchronously
-            async with aiofiles.open(file_path, "wb") as f:
-                content = await file.read()
-                await f.write(content)
-            
-            # Calculate file hash for integrity checking
-            file_hash = hashlib.sha256(content).hexdigest()
-            
-            # Create metadata
-            metadata = {
-                "file_id": file_id,
-                "original_filename": file.filename,
-                "safe_filename": safe_filename,
-                "file_path": str(file_path),
-                "file_size": len(content),
-                "file_hash": file_hash,
-                "file_type": file_type,
-                "user_id": user_id,
-                "upload_time": datetime.utcnow().isoformat(),
-                "mime_type": file.content_type
-            }
+            partial_path = user_dir / f".{file_id}{file_extension}.partial"
             
-            logger.info(f"File saved: {file_id} for user {user_id}")
+            # Stream to disk, hashing each chunk for integrity checking
+            hasher = hashlib.sha256()
+            file_size = 0
+            await file.seek(0)
+            async with aiofiles.open(partial_path, "wb") as f:
+                while True:
+                    chunk = await file.read(self.settings.upload_chunk_size)
+                    if not chunk:
+                        break
+                    file_size += len(chunk)
+                    if file_size > self.settings.max_file_size:
+                        raise self._too_large()
+                    hasher.update(chunk)
+                    await f.write(chunk)
+                    
+            metadata = await self.adopt_upload(
+                partial_path,
+                user_id,
+                file.filename,
+                file_type,
+                file.content_type,
+                file_size,
+                hasher.hexdigest(),
+                file_id=file_id
+            )
+            partial_path = None
             return metadata
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error saving file: {str(e)}")
             raise HTTPException(status_code=500, detail="Failed to save file")
+        finally:
+            if partial_path is not None:
+                partial_path.unlink(missing_ok=True)
     
-    async def get_file_path(self, file_id: str, user_id: str) -> Optional[Path]:
-        """Get file path if it exists and belongs to the user."""
+    def blob_path(self, file_hash: str) -> Path:
+        """Path of the blob storing content with the given SHA-256."""
+        return self.blob_root / file_hash[:2] / file_hash
+    
+    async def adopt_upload(
+        self,
+        source_path: Path,
+        user_id: str,
+        filename: str,
+        file_type: str,
+        mime_type: str,
+        file_size: int,
+        file_hash: str,
+        file_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Move a fully received file into the user's uploads.
+        
+        The content is stored once as a blob named by its SHA-256 and the
+        user's file is a hard link to it; if the blob already exists,
+        source_path is discarded. Nothing is copied.
+        
+        Returns:
+            Dictionary with file metadata
+        """
+        file_id = file_id or self.generate_file_id(filename)
+        file_path = self._user_upload_path(user_id, file_id, filename)
+        
+        deduplicated = await run_in_threadpool(self._store_blob, source_path, file_hash, file_size, file_path)
+        return await self._register_upload(
+            file_path, user_id, file_id, filename, file_type, mime_type, file_size, file_hash, deduplicated
+        )
+    
+    async def find_blob(self, user_id: str, file_hash: str) -> Optional[Path]:
+        """
+        Get stored content a hash-first upload may reuse.
+        
+        With upload_dedup_scope "user" only content the user has uploaded
+        before qualifies, so a hash alone never grants access to another
+        user's file; with "global" any stored content does.
+        """
+        owner = user_id if self.settings.upload_dedup_scope == "user" else None
+        blob = await run_in_threadpool(self.index.find_blob, file_hash.lower(), owner)
+        if blob is None or not blob.is_file():
+            return None
+        return blob
+    
+    async def adopt_blob(
+        self,
+        file_hash: str,
+        user_id: str,
+        filename: str,
+        file_type: str,
+        mime_type: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Create an upload from stored content without receiving it again.
+        
+        Returns:
+            Dictionary with file metadata, or None if the content is not
+            (or no longer) stored
+        """
+        file_hash = file_hash.lower()
+        blob = await self.find_blob(user_id, file_hash)
+        if blob is None:
+            return None
+            
+        file_id = self.generate_file_id(filename)
+        file_path = self._user_upload_path(user_id, file_id, filename)
+        try:
+            await run_in_threadpool(self._link, blob, file_path)
+        except FileNotFoundError:
+            # Collected since the lookup
+            return None
+            
+        return await self._register_upload(
+            file_path, user_id, file_id, filename, file_type, mime_type,
+            file_path.stat().st_size, file_hash, True
+        )
+    
+    def _user_upload_path(self, user_id: str, file_id: str, filename: str) -> Path:
         user_dir = self.upload_dir / user_id
+        user_dir.mkdir(parents=True, exist_ok=True)
+        return user_dir / f"{file_id}{Path(filename).suffix.lower()}"
+    
+    def _store_blob(self, source_path: Path, file_hash: str, file_size: int, file_path: Path) -> bool:
+        """Link file_path to the content's blob, storing source_path as the blob if new."""
+        blob = self.blob_path(file_hash)
+        try:
+            self._link(blob, file_path)
+            source_path.unlink()
+            deduplicated = True
+        except FileNotFoundError:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(source_path, blob)
+            self._link(blob, file_path)
+            deduplicated = False
+            
+        self.index.add_blob(file_hash, blob, file_size)
+        return deduplicated
+    
+    @staticmethod
+    def _link(blob: Path, file_path: Path) -> None:
+        """Hard-link file_path to blob, copying where hard links are unsupported."""
+        try:
+            os.link(blob, file_path)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            shutil.copyfile(blob, file_path)
+    
+    async def _register_upload(
+        self,
+        file_path: Path,
+        user_id: str,
+        file_id: str,
+        filename: str,
+        file_type: str,
+        mime_type: str,
+        file_size: int,
+        file_hash: str,
+        deduplicated: bool
+    ) -> Dict[str, Any]:
+        """Index a user's upload and build its metadata."""
+        await run_in_threadpool(
+            self.index.add, file_path, user_id, UPLOAD, file_id, file_type, file_size, file_hash,
+            None, self._expires_at()
+        )
         
-        # Search for file with matching ID
-        for file_path in user_dir.glob(f"{file_id}*"):
-            if file_path.is_file():
-                return file_path
-        return None
+        logger.info(f"File saved: {file_id} for user {user_id}{' (deduplicated)' if deduplicated else ''}")
+        return {
+            "file_id": file_id,
+            "original_filename": filename,
+            "safe_filename": file_path.name,
+            "file_path": str(file_path),
+            "file_size": file_size,
+            "file_hash": file_hash,
+            "file_type": file_type,
+            "user_id": user_id,
+            "upload_time": datetime.utcnow().isoformat(),
+            "mime_type": mime_type,
+            "deduplicated": deduplicated
+        }
+    
+    def _too_large(self) -> HTTPException:
+        return HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size: {self.settings.max_file_size} bytes"
+        )
+    
+    async def get_file_path(self, file_id: str, user_id: str) -> Optional[Path]:
+        """Get file path if it exists and belongs to the user."""
+        return await self._find(user_id, UPLOAD, file_id)
+    
+    async def get_processed_file_path(self, file_id: str, user_id: str, file_type: str) -> Optional[Path]:
+        """Get the newest processed file of a type (e.g. "export_srt") for a file or job ID."""
+        return await self._find(user_id, PROCESSED, file_id, file_type)
+    
+    async def _find(
+        self,
+        user_id: str,
+        area: str,
+        file_id: str,
+        file_type: Optional[str] = None
+    ) -> Optional[Path]:
+        """Look a file up in the index, dropping the entry if the file is gone."""
+        file_path = await run_in_threadpool(self.index.find, user_id, area, file_id, file_type)
+        if file_path is None:
+            return None
+        if not file_path.is_file():
+            await run_in_threadpool(self.index.remove, [file_path])
+            return None
+        return file_path
     
     async def delete_file(self, file_id: str, user_id: str) -> bool:
         """Delete a file if it exists and belongs to the user."""
@@ -127,6 +385,8 @@ class FileManager:
         if file_path and file_path.exists():
             try:
                 file_path.unlink()
+                await run_in_threadpool(self.index.remove, [file_path])
+                await run_in_threadpool(self._collect_blobs)
                 logger.info(f"Deleted file: {file_id} for user {user_id}")
                 return True
             except Exception as e:
@@ -145,7 +405,7 @@ class FileManager:
             fd, temp_path = tempfile.mkstemp(
                 suffix=suffix,
                 prefix=prefix,
-                dir=self.temp_dir
+                dir=self.scratch_dir()
             )
             
             # Write content and close file descriptor
@@ -180,15 +440,22 @@ class FileManager:
             file_path = user_processed_dir / filename
             
             # Save content based on type
-            if isinstance(content, (str, bytes)):
-                mode = "w" if isinstance(content, str) else "wb"
-                async with aiofiles.open(file_path, mode) as f:
-                    await f.write(content)
+            if isinstance(content, bytes):
+                data = content
+            elif isinstance(content, str):
+                data = content.encode("utf-8")
             else:
                 # Handle JSON or other serializable content
                 import json
-                async with aiofiles.open(file_path, "w") as f:
-                    await f.write(json.dumps(content, ensure_ascii=False, indent=2))
+                data = json.dumps(content, ensure_ascii=False, indent=2).encode("utf-8")
+                
+            async with aiofiles.open(file_path, "wb") as f:
+                await f.write(data)
+                
+            await run_in_threadpool(
+                self.index.add, file_path, user_id, PROCESSED, file_id, file_type,
+                len(data), hashlib.sha256(data).hexdigest(), None, self._expires_at()
+            )
             
             metadata = {
                 "file_id": file_id,
@@ -206,71 +473,175 @@ class FileManager:
             logger.error(f"Error saving processed file: {str(e)}")
             raise HTTPException(status_code=500, detail="Failed to save processed file")
     
-    async def cleanup_old_files(self, max_age_hours: int = 24) -> int:
-        """Clean up files older than specified age."""
-        cleaned_count = 0
-        cutoff_time = datetime.utcnow() - timedelta(hours=max_age_hours)
+    async def register_cache_file(self, path: Path, key: str, ttl: float) -> None:
+        """Index a shared cache file (e.g. a transcode) so it expires after ttl seconds."""
+        await run_in_threadpool(
+            self.index.add, path, "", TRANSCODE, key, TRANSCODE, path.stat().st_size,
+            None, None, time.time() + ttl
+        )
+    
+    async def find_cache_file(self, key: str, ttl: float) -> Optional[Path]:
+        """
+        Get a cache file registered under key, if it still exists.
+        
+        A hit keeps the file for another ttl seconds, so cleanup does not
+        delete it while the caller is using it.
+        """
+        file_path = await self._find("", TRANSCODE, key)
+        if file_path is None:
+            return None
+        now = time.time()
+        if not await run_in_threadpool(self.index.renew, file_path, now, now + ttl):
+            return None
+        return file_path
+    
+    def add_cleanup_hook(self, name: str, hook: Callable[[float], int]) -> None:
+        """
+        Run hook(now) in a worker thread on every cleanup, for state kept
+        outside the file index; it returns how many items it removed, which
+        is reported under name.
+        """
+        self._cleanup_hooks[name] = hook
+        self._cleanup_stats.setdefault(name, 0)
+    
+    async def cleanup_expired(self) -> Dict[str, int]:
+        """
+        Delete expired files in a worker thread.
+        
+        Scratch files go a whole bucket directory at a time; uploads,
+        processed files and cache files are read from the file index's
+        expiry column. No directory tree is walked except the buckets
+        being deleted.
         
+        Returns:
+            Dictionary with files, buckets, blobs, bytes_reclaimed and the
+            count of each cleanup hook
+        """
         try:
-            for directory in [self.temp_dir, self.upload_dir, self.processed_dir]:
-                if not directory.exists():
+            result = await run_in_threadpool(self._cleanup_expired, time.time())
+        except Exception as e:
+            logger.error(f"Error during cleanup: {str(e)}")
+            return {"files": 0, "buckets": 0, "blobs": 0, "bytes_reclaimed": 0}
+            
+        self._cleanup_stats["runs"] += 1
+        self._cleanup_stats["last_run"] = datetime.utcnow().isoformat()
+        for key, value in result.items():
+            self._cleanup_stats[key] += value
+        
+        logger.info(
+            f"Cleaned up {result['files']} expired files and {result['buckets']} scratch directories, "
+            f"{result['bytes_reclaimed'] / (1024 * 1024):.1f} MB reclaimed"
+        )
+        return result
+    
+    def _cleanup_expired(self, now: float) -> Dict[str, int]:
+        files = 0
+        buckets = 0
+        reclaimed = 0
+        
+        if self.scratch_root.exists():
+            for bucket in os.scandir(self.scratch_root):
+                if not bucket.name.isdigit() or int(bucket.name) > now:
                     continue
+                for root, _, names in os.walk(bucket.path):
+                    for name in names:
+                        try:
+                            reclaimed += os.stat(os.path.join(root, name)).st_size
+                            files += 1
+                        except OSError:
+                            pass
+                shutil.rmtree(bucket.path, ignore_errors=True)
+                buckets += 1
                 
-                for file_path in directory.rglob("*"):
-                    if file_path.is_file():
-                        # Check file age
-                        file_time = datetime.fromtimestamp(file_path.stat().st_mtime)
-                        if file_time < cutoff_time:
-                            try:
-                                file_path.unlink()
-                                cleaned_count += 1
-                                logger.debug(f"Cleaned up old file: {file_path}")
-                            except Exception as e:
-                                logger.error(f"Error deleting {file_path}: {str(e)}")
-            
-            logger.info(f"Cleaned up {cleaned_count} old files")
-            return cleaned_count
+        while True:
+            expired = self.index.expired(now)
+            if not expired:
+                break
+            for file_path, size in expired:
+                try:
+                    # A linked upload frees nothing until its blob is collected
+                    links = file_path.stat().st_nlink
+                    file_path.unlink()
+                    if links == 1:
+                        reclaimed += size
+                    files += 1
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.error(f"Error deleting {file_path}: {str(e)}")
+            self.index.remove(file_path for file_path, _ in expired)
             
+        blobs, blob_bytes = self._collect_blobs()
+        result = {"files": files, "buckets": buckets, "blobs": blobs, "bytes_reclaimed": reclaimed + blob_bytes}
+        
+        for name, hook in self._cleanup_hooks.items():
+            try:
+                result[name] = hook(now)
+            except Exception as e:
+                logger.error(f"Error in {name} cleanup: {str(e)}")
+        return result
+    
+    def _collect_blobs(self) -> Tuple[int, int]:
+        """Delete blobs no upload references; returns (blobs, bytes reclaimed)."""
+        # Spare blobs linked moments ago whose upload is not indexed yet
+        linked_before = time.time() - 60
+        collected = 0
+        reclaimed = 0
+        while True:
+            unreferenced = self.index.unreferenced_blobs(linked_before)
+            removed = []
+            for file_hash, blob in unreferenced:
+                try:
+                    stat = blob.stat()
+                    blob.unlink()
+                    collected += 1
+                    # A hard link the index does not know about keeps the content alive
+                    if stat.st_nlink == 1:
+                        reclaimed += stat.st_size
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.error(f"Error deleting blob {blob}: {str(e)}")
+                    continue
+                removed.append(file_hash)
+            if not removed:
+                break
+            self.index.remove_blobs(removed)
+        return collected, reclaimed
+    
+    def get_cleanup_stats(self) -> Dict[str, Any]:
+        """Get totals across cleanup runs, and how much blob sharing saves."""
+        stats = dict(self._cleanup_stats)
+        try:
+            stats["dedup"] = self.index.blob_stats()
         except Exception as e:
-            logger.error(f"Error during cleanup: {str(e)}")
-            return cleaned_count
+            logger.warning(f"Could not read blob statistics: {str(e)}")
+        return stats
     
     async def get_user_files(self, user_id: str) -> List[Dict[str, Any]]:
-        """Get list of user's files with metadata."""
-        files = []
-        user_upload_dir = self.upload_dir / user_id
-        user_processed_dir = self.processed_dir / user_id
-        
-        for directory, file_type in [(user_upload_dir, "upload"), (user_processed_dir, "processed")]:
-            if directory.exists():
-                for file_path in directory.iterdir():
-                    if file_path.is_file():
-                        stat = file_path.stat()
-                        files.append({
-                            "filename": file_path.name,
-                            "file_path": str(file_path),
-                            "file_size": stat.st_size,
-                            "file_type": file_type,
-                            "modified_time": datetime.fromtimestamp(stat.st_mtime).isoformat()
-                        })
-        
-        return sorted(files, key=lambda x: x["modified_time"], reverse=True)
+        """Get list of user's files with metadata, newest first."""
+        entries = await run_in_threadpool(self.index.list_user_files, user_id)
+        return [
+            {
+                "filename": entry["path"].name,
+                "file_path": str(entry["path"]),
+                "file_size": entry["size"],
+                "file_type": entry["area"],
+                "modified_time": datetime.fromtimestamp(entry["modified_at"]).isoformat()
+            }
+            for entry in entries
+        ]
     
     async def calculate_storage_usage(self, user_id: str) -> Dict[str, int]:
-        """Calculate user's storage usage."""
-        usage = {"upload_size": 0, "processed_size": 0, "total_files": 0}
-        
-        user_upload_dir = self.upload_dir / user_id
-        user_processed_dir = self.processed_dir / user_id
-        
-        for directory, key in [(user_upload_dir, "upload_size"), (user_processed_dir, "processed_size")]:
-            if directory.exists():
-                for file_path in directory.iterdir():
-                    if file_path.is_file():
-                        usage[key] += file_path.stat().st_size
-                        usage["total_files"] += 1
-        
-        return usage
+        """Calculate user's storage usage from the index's running totals."""
+        totals = await run_in_threadpool(self.index.usage, user_id)
+        upload = totals.get(UPLOAD, {"size": 0, "files": 0})
+        processed = totals.get(PROCESSED, {"size": 0, "files": 0})
+        return {
+            "upload_size": upload["size"],
+            "processed_size": processed["size"],
+            "total_files": upload["files"] + processed["files"]
+        }
 
 
 # Global file manager instance
@@ -283,17 +654,17 @@ def ensure_directories() -> None:
 
 
 async def cleanup_temp_files() -> None:
-    """Clean up temporary files (called during shutdown)."""
-    await file_manager.cleanup_old_files(max_age_hours=1)
+    """Clean up expired files (called during shutdown)."""
+    await file_manager.cleanup_expired()
 
 
 # Periodic cleanup task for long-running instances
 async def periodic_cleanup():
-    """Periodic cleanup task for development environments."""
+    """Delete expired files every cleanup_interval seconds until cancelled."""
     while True:
         try:
-            await asyncio.sleep(3600)  # Run every hour
-            await file_manager.cleanup_old_files()
+            await asyncio.sleep(file_manager.settings.cleanup_interval)
+            await file_manager.cleanup_expired()
         except Exception as e:
             logger.error(f"Error in periodic cleanup: {str(e)}")
 
@@ -2,6 +2,7 @@
 Main FastAPI application entry point.
 """
 
+import asyncio
 import os
 import logging
 from datetime import datetime
@@ -16,13 +17,15 @@ from .core.config import get_settings
 from .core.logging import setup_logging
 from .core.exceptions import AppException
 from .api.v1.api import api_router
-from .core.storage import cleanup_temp_files
-from .services.database_service import init_database
-from .services.google_speech_service import init_google_speech_service
+from .core.storage import cleanup_temp_files, periodic_cleanup
 from .services.unified_transcription_service import init_unified_transcription_service
 from .middleware.error_handling import add_error_handlers
 from .middleware.usage_tracking import UsageTrackingMiddleware
 from .services.monthly_reset_service import monthly_reset_service
+from .services.http_client_service import http_client_service
+from .services.worker_service import worker_service
+from .services.translation_cache_service import translation_cache_service
+from .services.romanization_service import romanization_service
 
 
 @asynccontextmanager
@@ -36,24 +39,19 @@ async def lifespan(app: FastAPI):
     from .core.storage import ensure_directories
     ensure_directories()
     
-    # Initialize database connection
-    try:
-        await init_database()
-        logging.info("Database initialized successfully")
-    except Exception as e:
-        logging.error(f"Failed to initialize database: {str(e)}")
-        # Don't fail startup for database issues in development
-        if get_settings().environment == "production":
-            raise
+    # Open shared HTTP connection pools for provider calls
+    await http_client_service.startup()
     
-    # Initialize transcription services
-    try:
-        await init_google_speech_service()
-        logging.info("Google Speech service initialized successfully")
-    except Exception as e:
-        logging.warning(f"Failed to initialize Google Speech service: {str(e)}")
-        # Continue startup even if Google Speech fails
+    # Preload the most frequent translations
+    await translation_cache_service.warm_up()
+    
+    # Start romanization workers in the background; each compiles its own lexicon
+    romanization_warm_up = asyncio.create_task(romanization_service.warm_up())
     
+    # The Supabase and Google Speech clients are created on first use, so
+    # startup does not import their SDKs
+    
+    # Initialize transcription services
     try:
         await init_unified_transcription_service()
         logging.info("Unified transcription service initialized successfully")
@@ -73,11 +71,22 @@ async def lifespan(app: FastAPI):
         if get_settings().environment == "production":
             logging.warning("Monthly reset scheduler failed to start in production")
     
+    # Start transcription workers unless they run as separate processes
+    if get_settings().job_worker_mode == "embedded":
+        worker_service.start()
+    
+    # Sweep expired files and idle upload sessions while the instance runs
+    cleanup_task = asyncio.create_task(periodic_cleanup())
+    
     yield
     
     # Shutdown
     logging.info("CantoneseScribe backend shutting down...")
     
+    # Stop transcription workers; unfinished jobs go back to the queue
+    if worker_service.running:
+        await worker_service.stop()
+    
     # Stop monthly reset scheduler
     try:
         monthly_reset_service.stop_scheduler()
@@ -85,7 +94,18 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logging.error(f"Error stopping monthly reset scheduler: {str(e)}")
     
+    # Persist translation cache hit counts for the next warm-up
+    await translation_cache_service.flush()
+    
+    # Stop romanization worker processes
+    romanization_warm_up.cancel()
+    romanization_service.shutdown()
+    
+    # Close shared HTTP connection pools
+    await http_client_service.shutdown()
+    
     # Clean up any temporary files
+    cleanup_task.cancel()
     await cleanup_temp_files()
 
 
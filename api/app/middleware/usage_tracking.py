@@ -15,6 +15,7 @@ from starlette.types import ASGIApp
 
 from ..core.config import get_settings
 from ..services.usage_service import usage_service
+from ..services.youtube_cache_service import youtube_cache_service
 from ..schemas.usage import UsageType
 
 logger = logging.getLogger(__name__)
@@ -136,6 +137,17 @@ class UsageTrackingMiddleware(BaseHTTPMiddleware):
             # Extract request details for usage check
             body = await self._get_request_body(request)
             
+            if body.get("youtube_url") and "duration" not in body:
+                # Size the video from its metadata; the endpoint reuses the cached probe
+                try:
+                    metadata = await youtube_cache_service.get_metadata(body["youtube_url"])
+                    if metadata["duration"]:
+                        body = {**body, "duration": metadata["duration"]}
+                    if metadata["file_size"]:
+                        body = {**body, "file_size": metadata["file_size"]}
+                except Exception as e:
+                    logger.warning(f"Could not probe YouTube metadata: {str(e)}")
+            
             # Estimate processing requirements
             estimated_duration = self._estimate_processing_duration(body)
             file_size = self._estimate_file_size(body)
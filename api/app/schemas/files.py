@@ -3,7 +3,7 @@ File-related Pydantic schemas.
 """
 
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, validator
 
 
@@ -18,6 +18,44 @@ class FileUploadResponse(BaseModel):
     usage_info: Optional[Dict[str, Any]] = None
 
 
+class HashUploadRequest(BaseModel):
+    """Request model for uploading a file by its hash alone."""
+    sha256: str  # Hex digest of the file
+    filename: str
+    content_type: str
+    
+    @validator('sha256')
+    def validate_sha256(cls, v):
+        """Require a hex SHA-256 digest."""
+        v = v.lower()
+        if len(v) != 64 or any(c not in "0123456789abcdef" for c in v):
+            raise ValueError("sha256 must be a 64-character hex digest")
+        return v
+
+
+class ResumableUploadCreate(BaseModel):
+    """Request model for starting a resumable upload."""
+    filename: str
+    file_size: int
+    content_type: str
+
+
+class ResumableUploadStatus(BaseModel):
+    """Progress of a resumable upload."""
+    upload_id: str
+    file_size: int
+    offset: int  # Bytes received contiguously from the start of the file
+    missing: List[List[int]]  # [start, end) byte ranges still to be sent
+    chunk_size: int  # Suggested chunk size
+    expires_at: float  # Unix time after which an idle upload is deleted
+    usage_info: Optional[Dict[str, Any]] = None
+
+
+class ResumableUploadComplete(BaseModel):
+    """Request model for completing a resumable upload."""
+    sha256: Optional[str] = None  # Hex digest the assembled file must match
+
+
 class FileMetadata(BaseModel):
     """File metadata model."""
     filename: str
@@ -94,6 +94,7 @@ class TranscriptionJob(BaseModel):
     cost: Optional[float] = None
     duration: Optional[float] = None
     usage_info: Optional[Dict[str, Any]] = None
+    parent_job_id: Optional[str] = None  # Job this one re-runs with different options
 
 
 class ExportOptions(BaseModel):
@@ -3,13 +3,19 @@ Audio processing service for handling audio/video files and YouTube downloads.
 """
 
 import os
+import math
 import asyncio
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import subprocess
 import tempfile
+import hashlib
+import shutil
+from collections import OrderedDict
 
 from ..core.storage import file_manager
+from ..core.audio_headers import read_audio_header
+from ..core.single_flight import SingleFlight
 from ..core.config import get_settings
 from ..core.logging import get_logger
 from ..core.exceptions import ProcessingError
@@ -20,16 +26,29 @@ logger = get_logger(__name__)
 class AudioService:
     """Service for audio processing operations."""
     
+    # Silence detection decodes to 16 kHz mono and measures energy in 30 ms frames
+    SILENCE_SAMPLE_RATE = 16000
+    SILENCE_FRAME_SAMPLES = 480
+    
     def __init__(self):
         self.settings = get_settings()
+        self._probe_cache: "OrderedDict[Tuple[str, int, int], Dict[str, Any]]" = OrderedDict()
+        self._probe_flight = SingleFlight("audio_probe")
+        self._transcode_flight = SingleFlight("upload_transcode")
+        self._probe_stats = {"hits": 0, "misses": 0, "evictions": 0}
     
-    async def download_youtube_audio(self, url: str, user_id: str) -> Path:
+    async def download_youtube_audio(self, url: str, output_dir: Path, name: str) -> Path:
         """
-        Download audio from YouTube URL.
+        Download the best audio-only stream of a YouTube video as-is.
+        
+        The stream is stored in its original container (usually m4a or
+        webm) without re-encoding, and fragments are fetched concurrently.
         
         Args:
             url: YouTube URL
-            user_id: User identifier for file organization
+            output_dir: Directory to download into; should not be shared
+                with other downloads in progress
+            name: File name without extension
             
         Returns:
             Path to downloaded audio file
@@ -37,22 +56,17 @@ class AudioService:
         try:
             logger.info(f"Downloading YouTube audio: {url}")
             
-            # Create temporary directory for download
-            temp_dir = Path(self.settings.temp_dir) / user_id
-            temp_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Generate output filename
-            output_template = str(temp_dir / "%(title)s.%(ext)s")
+            output_dir.mkdir(parents=True, exist_ok=True)
             
             # yt-dlp command for audio extraction
             cmd = [
                 "yt-dlp",
-                "--extract-audio",
-                "--audio-format", "mp3",
-                "--audio-quality", "192K",
-                "--output", output_template,
+                "--format", self.settings.youtube_audio_format,
+                "--concurrent-fragments", str(self.settings.youtube_concurrent_fragments),
+                "--output", str(output_dir / f"{name}.%(ext)s"),
+                "--print", "after_move:filepath",
                 "--no-playlist",
-                "--prefer-ffmpeg",
+                "--no-progress",
                 url
             ]
             
@@ -70,21 +84,167 @@ class AudioService:
                 logger.error(f"yt-dlp failed: {error_msg}")
                 raise ProcessingError(f"Failed to download YouTube audio: {error_msg}")
             
-            # Find the downloaded file
-            audio_files = list(temp_dir.glob("*.mp3"))
-            if not audio_files:
-                raise ProcessingError("No audio file found after download")
+            # yt-dlp prints the final path; fall back to the name we asked for
+            printed = [line.strip() for line in stdout.decode('utf-8', errors='replace').splitlines() if line.strip()]
+            audio_path = Path(printed[-1]) if printed else None
+            if audio_path is None or not audio_path.is_file():
+                candidates = [path for path in output_dir.glob(f"{name}.*") if not path.name.endswith(".part")]
+                if not candidates:
+                    raise ProcessingError("No audio file found after download")
+                audio_path = candidates[0]
             
-            audio_path = audio_files[0]
             logger.info(f"Downloaded audio file: {audio_path}")
             
             return audio_path
             
+        except ProcessingError:
+            raise
         except Exception as e:
             logger.error(f"Error downloading YouTube audio: {str(e)}")
             raise ProcessingError(f"Failed to download YouTube audio: {str(e)}")
     
+    async def probe_youtube_metadata(self, url: str) -> Dict[str, Any]:
+        """
+        Read a YouTube video's duration and audio size without downloading it.
+        
+        The size is that of the stream download_youtube_audio would fetch;
+        when YouTube does not report one it is estimated from the bitrate.
+        
+        Args:
+            url: YouTube URL
+            
+        Returns:
+            Dictionary with video_id, title, duration (seconds), file_size
+            (bytes) and is_live
+        """
+        cmd = [
+            "yt-dlp",
+            "--dump-single-json",
+            "--skip-download",
+            "--no-playlist",
+            "--format", self.settings.youtube_audio_format,
+            url
+        ]
+        
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    process.communicate(), timeout=self.settings.youtube_probe_timeout
+                )
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise ProcessingError("Timed out reading YouTube video metadata")
+            
+            if process.returncode != 0:
+                error_msg = stderr.decode('utf-8') if stderr else "Unknown error"
+                raise ProcessingError(f"Failed to read YouTube video metadata: {error_msg}")
+            
+            import json
+            info = json.loads(stdout.decode('utf-8'))
+            
+            duration = float(info.get("duration") or 0)
+            file_size = info.get("filesize") or info.get("filesize_approx")
+            if not file_size:
+                # abr/tbr are in kbit/s
+                bitrate = info.get("abr") or info.get("tbr")
+                file_size = duration * bitrate * 1000 / 8 if bitrate else 0
+            
+            return {
+                "video_id": info.get("id"),
+                "title": info.get("title"),
+                "duration": duration,
+                "file_size": int(file_size),
+                "is_live": bool(info.get("is_live"))
+            }
+            
+        except ProcessingError:
+            raise
+        except Exception as e:
+            logger.error(f"Error reading YouTube metadata: {str(e)}")
+            raise ProcessingError(f"Failed to read YouTube video metadata: {str(e)}")
+    
     async def get_audio_metadata(self, audio_path: Path) -> Dict[str, Any]:
+        """
+        Extract metadata from audio file, reusing cached probe results.
+        
+        Results are cached by (path, size, mtime), so a file that is rewritten
+        is probed again. Concurrent callers for the same file share a single
+        ffprobe process.
+        
+        Args:
+            audio_path: Path to audio file
+            
+        Returns:
+            Dictionary with audio metadata
+        """
+        try:
+            stat = audio_path.stat()
+        except OSError:
+            return await self._probe_audio_metadata(audio_path)
+        
+        key = (str(audio_path.resolve()), stat.st_size, stat.st_mtime_ns)
+        
+        cached = self._probe_cache.get(key)
+        if cached is not None:
+            self._probe_cache.move_to_end(key)
+            self._probe_stats["hits"] += 1
+            return dict(cached)
+        
+        self._probe_stats["misses"] += 1
+        result = await self._probe_flight.do(key, lambda: self._probe_audio_metadata(audio_path))
+        
+        # Failed probes are not cached so a transient error can be retried
+        if result.get("duration", 0) > 0 and key not in self._probe_cache:
+            self._probe_cache[key] = result
+            while len(self._probe_cache) > self.settings.audio_probe_cache_size:
+                self._probe_cache.popitem(last=False)
+                self._probe_stats["evictions"] += 1
+        
+        return dict(result)
+    
+    def get_probe_cache_stats(self) -> Dict[str, Any]:
+        """Get metadata probe cache statistics."""
+        flight_stats = self._probe_flight.get_stats()
+        lookups = self._probe_stats["hits"] + self._probe_stats["misses"]
+        saved = self._probe_stats["hits"] + flight_stats["saved_calls"]
+        return {
+            **self._probe_stats,
+            "in_flight_hits": flight_stats["saved_calls"],
+            "size": len(self._probe_cache),
+            "max_size": self.settings.audio_probe_cache_size,
+            "in_flight": flight_stats["in_flight"],
+            "hit_ratio": saved / lookups if lookups else 0.0
+        }
+    
+    async def _probe_audio_metadata(self, audio_path: Path) -> Dict[str, Any]:
+        """
+        Extract metadata from audio file.
+        
+        Container headers are parsed in-process first; ffprobe is only spawned
+        for containers the header parser does not understand.
+        
+        Args:
+            audio_path: Path to audio file
+            
+        Returns:
+            Dictionary with audio metadata
+        """
+        loop = asyncio.get_running_loop()
+        header_metadata = await loop.run_in_executor(None, read_audio_header, audio_path)
+        if header_metadata:
+            logger.debug(f"Audio metadata from headers for {audio_path}: {header_metadata}")
+            return header_metadata
+        
+        return await self._ffprobe_audio_metadata(audio_path)
+    
+    async def _ffprobe_audio_metadata(self, audio_path: Path) -> Dict[str, Any]:
         """
         Extract metadata from audio file using ffprobe.
         
@@ -161,19 +321,46 @@ class AudioService:
         Returns:
             Path to converted WAV file
         """
+        return await self.convert_audio(
+            input_path,
+            output_path,
+            suffix=".wav",
+            codec_args=["-c:a", "pcm_s16le"]  # 16-bit PCM
+        )
+    
+    async def convert_audio(
+        self,
+        input_path: Path,
+        output_path: Optional[Path] = None,
+        suffix: str = ".wav",
+        codec_args: Optional[List[str]] = None
+    ) -> Path:
+        """
+        Convert audio to 16 kHz mono with the given codec.
+        
+        Args:
+            input_path: Path to input audio or video file
+            output_path: Optional output path, creates temp file if not provided
+            suffix: Suffix of the temp file created when output_path is None
+            codec_args: ffmpeg codec arguments, e.g. ["-c:a", "libopus", "-b:a", "24k"]
+            
+        Returns:
+            Path to converted file
+        """
         try:
             if output_path is None:
-                # Create temporary WAV file
-                fd, temp_path = tempfile.mkstemp(suffix=".wav", dir=self.settings.temp_dir)
+                # Create temporary output file; it expires with its scratch directory
+                fd, temp_path = tempfile.mkstemp(suffix=suffix, dir=file_manager.scratch_dir())
                 os.close(fd)
                 output_path = Path(temp_path)
             
             cmd = [
                 "ffmpeg",
                 "-i", str(input_path),
+                "-vn",           # Drop any video stream
                 "-ar", "16000",  # 16kHz sample rate for Whisper
                 "-ac", "1",      # Mono
-                "-c:a", "pcm_s16le",  # 16-bit PCM
+                *(codec_args or ["-c:a", "pcm_s16le"]),
                 "-y",            # Overwrite output file
                 str(output_path)
             ]
@@ -191,20 +378,263 @@ class AudioService:
                 logger.error(f"ffmpeg conversion failed: {error_msg}")
                 raise ProcessingError(f"Failed to convert audio: {error_msg}")
             
-            logger.debug(f"Converted audio to WAV: {output_path}")
+            logger.debug(f"Converted audio to {output_path.suffix}: {output_path}")
             return output_path
             
         except Exception as e:
             logger.error(f"Error converting audio: {str(e)}")
             raise ProcessingError(f"Failed to convert audio: {str(e)}")
     
-    async def split_audio(self, audio_path: Path, segment_duration: float = 600) -> List[Path]:
+    async def prepare_for_upload(
+        self,
+        input_path: Path,
+        target_format: Optional[str] = None,
+        bitrate: Optional[str] = None
+    ) -> Path:
+        """
+        Transcode audio to a compact 16 kHz mono file for provider upload.
+        
+        The transcode is skipped when the source is already smaller than the
+        target bitrate would produce, and a transcode that does not shrink the
+        file is discarded. Results are cached by source content hash, so
+        re-running a job does not transcode again.
+        
+        Args:
+            input_path: Path to source audio or video file
+            target_format: "opus" (Ogg Opus) or "mp3", defaults to settings
+            bitrate: Target bitrate such as "24k", defaults to settings
+            
+        Returns:
+            Path to the smaller transcoded file, or input_path if transcoding
+            would not reduce the upload size
+        """
+        target_format = target_format or self.settings.upload_transcode_format
+        bitrate = bitrate or self.settings.upload_transcode_bitrate
+        
+        if target_format == "mp3":
+            suffix, codec_args = ".mp3", ["-c:a", "libmp3lame", "-b:a", bitrate]
+        else:
+            suffix, codec_args = ".ogg", ["-c:a", "libopus", "-b:a", bitrate, "-application", "voip"]
+        
+        input_size = input_path.stat().st_size
+        
+        # Skip sources that are already at or below the target bitrate
+        metadata = await self.get_audio_metadata(input_path)
+        target_bytes = metadata.get("duration", 0) * self._parse_bitrate(bitrate) / 8
+        if target_bytes and input_size <= target_bytes * 1.1:
+            return input_path
+        
+        source_hash = await self.hash_file(input_path)
+        cache_key = f"{source_hash}_{target_format}_{bitrate}"
+        
+        # Cache entries are registered in the file index, which expires them
+        # transcode_cache_ttl after they were last used
+        cached_path = await file_manager.find_cache_file(cache_key, self.settings.transcode_cache_ttl)
+        if cached_path is None:
+            # Jobs sharing a source (a cached download, an upload blob) transcode it once
+            cached_path = await self._transcode_flight.do(
+                cache_key, lambda: self._transcode_to_cache(input_path, cache_key, suffix, codec_args)
+            )
+        
+        output_size = cached_path.stat().st_size
+        if output_size >= input_size:
+            logger.debug(f"Transcode did not shrink {input_path.name}, uploading original")
+            return input_path
+        
+        logger.info(
+            f"Transcoded {input_path.name} for upload: {input_size} -> {output_size} bytes"
+        )
+        return cached_path
+    
+    async def _transcode_to_cache(
+        self,
+        input_path: Path,
+        cache_key: str,
+        suffix: str,
+        codec_args: List[str]
+    ) -> Path:
+        """Transcode into the shared cache under cache_key and register the entry."""
+        cache_dir = Path(self.settings.temp_dir) / "transcode_cache"
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        cached_path = cache_dir / f"{cache_key}{suffix}"
+        
+        # Write to a file unique to this call and rename, so readers never see a
+        # partial file and transcodes in other processes never share an output
+        fd, partial_name = tempfile.mkstemp(dir=cache_dir, prefix=f"{cache_key}.", suffix=f".partial{suffix}")
+        os.close(fd)
+        partial_path = Path(partial_name)
+        try:
+            await self.convert_audio(input_path, partial_path, suffix=suffix, codec_args=codec_args)
+            os.replace(partial_path, cached_path)
+        finally:
+            if partial_path.exists():
+                partial_path.unlink()
+                
+        await file_manager.register_cache_file(cached_path, cache_key, self.settings.transcode_cache_ttl)
+        return cached_path
+    
+    async def hash_file(self, path: Path) -> str:
+        """Compute the SHA-256 of a file without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._hash_file, path)
+    
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        """Compute the SHA-256 of a file in 1 MB blocks."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _parse_bitrate(bitrate: str) -> int:
+        """Convert an ffmpeg bitrate such as "24k" to bits per second."""
+        value = bitrate.strip().lower()
+        if value.endswith("k"):
+            return int(float(value[:-1]) * 1000)
+        if value.endswith("m"):
+            return int(float(value[:-1]) * 1000000)
+        return int(value)
+    
+    async def plan_chunk_boundaries(
+        self,
+        audio_path: Path,
+        target_duration: float = 600,
+        search_window: Optional[float] = None
+    ) -> List[float]:
+        """
+        Choose chunk start times that fall in silent gaps.
+        
+        The file is decoded once to 16 kHz mono PCM and streamed through a
+        frame energy pass. Each cut is placed at the quietest point of the
+        ``search_window`` seconds before the target length, so chunks never
+        exceed ``target_duration`` and rarely split a word.
+        
+        Args:
+            audio_path: Path to input audio file
+            target_duration: Maximum chunk length in seconds
+            search_window: Seconds before each target cut searched for silence
+            
+        Returns:
+            Sorted chunk start times in seconds, beginning with 0.0
+        """
+        if search_window is None:
+            search_window = self.settings.silence_search_window
+        
+        try:
+            import numpy as np
+        except ImportError:
+            logger.warning("NumPy not available, using fixed chunk boundaries")
+            return await self._fixed_boundaries(audio_path, target_duration)
+        
+        try:
+            energies = await self._compute_frame_energies(audio_path, np)
+        except Exception as e:
+            logger.warning(f"Silence detection failed for {audio_path}, using fixed boundaries: {str(e)}")
+            return await self._fixed_boundaries(audio_path, target_duration)
+        
+        frame_seconds = self.SILENCE_FRAME_SAMPLES / self.SILENCE_SAMPLE_RATE
+        duration = len(energies) * frame_seconds
+        if duration <= target_duration:
+            return [0.0]
+        
+        # Smooth over ~300 ms so a cut lands in a pause rather than a short stop consonant
+        energy_db = 10 * np.log10(energies + 1e-10)
+        window_frames = max(1, int(round(0.3 / frame_seconds)))
+        smoothed = np.convolve(energy_db, np.ones(window_frames) / window_frames, mode="same")
+        
+        target_frames = int(target_duration / frame_seconds)
+        search_frames = max(1, min(int(search_window / frame_seconds), target_frames - 1))
+        
+        boundaries = [0.0]
+        cut = 0
+        while len(energies) - cut > target_frames:
+            window_end = cut + target_frames
+            window_start = window_end - search_frames
+            cut = window_start + int(np.argmin(smoothed[window_start:window_end]))
+            boundaries.append(round(cut * frame_seconds, 3))
+        
+        logger.debug(f"Planned {len(boundaries)} chunks for {audio_path}: {boundaries}")
+        return boundaries
+    
+    async def _compute_frame_energies(self, audio_path: Path, np) -> Any:
+        """Decode the file once to 16 kHz mono PCM and return per-frame mean energy."""
+        cmd = [
+            "ffmpeg",
+            "-v", "error",
+            "-i", str(audio_path),
+            "-ar", str(self.SILENCE_SAMPLE_RATE),
+            "-ac", "1",
+            "-f", "s16le",
+            "-"
+        ]
+        
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        
+        frame_bytes = self.SILENCE_FRAME_SAMPLES * 2
+        read_size = frame_bytes * 2000
+        remainder = b""
+        energies = []
+        
+        while True:
+            block = await process.stdout.read(read_size)
+            if not block:
+                break
+            block = remainder + block
+            usable = len(block) - len(block) % frame_bytes
+            remainder = block[usable:]
+            if not usable:
+                continue
+            samples = np.frombuffer(block[:usable], dtype=np.int16).astype(np.float32) / 32768.0
+            frames = samples.reshape(-1, self.SILENCE_FRAME_SAMPLES)
+            energies.append(np.mean(frames * frames, axis=1))
+        
+        stderr = await process.stderr.read()
+        await process.wait()
+        
+        if process.returncode != 0:
+            error_msg = stderr.decode('utf-8') if stderr else "Unknown error"
+            raise ProcessingError(f"Failed to decode audio: {error_msg}")
+        
+        return np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)
+    
+    async def _fixed_boundaries(self, audio_path: Path, target_duration: float) -> List[float]:
+        """Fixed-interval chunk start times, used when silence detection is unavailable."""
+        metadata = await self.get_audio_metadata(audio_path)
+        duration = metadata.get("duration", 0)
+        count = max(1, math.ceil(duration / target_duration))
+        return [i * target_duration for i in range(count)]
+    
+    async def split_audio(
+        self,
+        audio_path: Path,
+        segment_duration: float = 600,
+        overlap: float = 0.0,
+        mode: Optional[str] = None,
+        boundaries: Optional[List[float]] = None
+    ) -> List[Path]:
         """
         Split large audio files into smaller segments for processing.
         
+        Segment ``i`` starts at ``boundaries[i]`` when boundaries are given and
+        at ``i * segment_duration`` seconds otherwise, so callers can map
+        segment timestamps back onto the original file.
+        
         Args:
             audio_path: Path to input audio file
             segment_duration: Duration of each segment in seconds (default: 10 minutes)
+            overlap: Extra seconds appended to each segment so words cut at a
+                boundary are heard in full by one of the two neighbouring segments
+            mode: "single_pass" decodes the input once and writes every segment
+                from that decode; "per_segment" runs one ffmpeg process per
+                segment. Defaults to the ``audio_split_mode`` setting.
+            boundaries: Optional segment start times in seconds, starting at 0,
+                e.g. from ``plan_chunk_boundaries``
             
         Returns:
             List of paths to audio segments
@@ -214,51 +644,149 @@ class AudioService:
             metadata = await self.get_audio_metadata(audio_path)
             duration = metadata.get("duration", 0)
             
-            if duration <= segment_duration:
-                return [audio_path]
+            if boundaries is not None:
+                starts = sorted(b for b in boundaries if 0 <= b < duration) or [0.0]
+            elif duration > segment_duration:
+                starts = [i * segment_duration for i in range(math.ceil(duration / segment_duration))]
+            else:
+                starts = [0.0]
             
-            # Create directory for segments
-            segments_dir = audio_path.parent / f"{audio_path.stem}_segments"
-            segments_dir.mkdir(exist_ok=True)
+            if len(starts) <= 1:
+                return [audio_path]
             
-            segments = []
-            segment_count = int(duration / segment_duration) + 1
+            # Segments go to a private scratch directory, deleted by remove_segments
+            # or, failing that, when the directory expires
+            segments_dir = Path(tempfile.mkdtemp(
+                prefix=f"{audio_path.stem}_segments_",
+                dir=file_manager.scratch_dir()
+            ))
+            
+            ends = starts[1:] + [duration]
+            ranges = [
+                (start, end - start + overlap)
+                for start, end in zip(starts, ends)
+            ]
             
-            for i in range(segment_count):
-                start_time = i * segment_duration
-                segment_path = segments_dir / f"segment_{i:03d}.wav"
-                
-                cmd = [
-                    "ffmpeg",
-                    "-i", str(audio_path),
-                    "-ss", str(start_time),
-                    "-t", str(segment_duration),
-                    "-ar", "16000",
-                    "-ac", "1",
-                    "-c:a", "pcm_s16le",
-                    "-y",
-                    str(segment_path)
-                ]
-                
-                process = await asyncio.create_subprocess_exec(
-                    *cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                
-                await process.communicate()
-                
-                if process.returncode == 0 and segment_path.exists():
-                    segments.append(segment_path)
-                    logger.debug(f"Created audio segment: {segment_path}")
+            mode = mode or self.settings.audio_split_mode
+            if mode == "per_segment":
+                segments = await self._split_per_segment(audio_path, ranges, segments_dir)
+            else:
+                segments = await self._split_single_pass(audio_path, ranges, segments_dir)
             
-            logger.info(f"Split audio into {len(segments)} segments")
+            logger.info(f"Split audio into {len(segments)} segments ({mode})")
             return segments
             
         except Exception as e:
             logger.error(f"Error splitting audio: {str(e)}")
             raise ProcessingError(f"Failed to split audio: {str(e)}")
     
+    def remove_segments(self, segments: List[Path], audio_path: Path) -> None:
+        """Delete the segments split_audio created from audio_path."""
+        if segments and segments[0] != audio_path:
+            shutil.rmtree(segments[0].parent, ignore_errors=True)
+    
+    async def _split_single_pass(
+        self,
+        audio_path: Path,
+        ranges: List[Tuple[float, float]],
+        segments_dir: Path
+    ) -> List[Path]:
+        """
+        Write all segments from a single decode of the input.
+        
+        The input is decoded and resampled once, fanned out with ``asplit`` and
+        each branch is trimmed to its (start, length) range, so decode work is
+        linear in the input duration regardless of the number of segments.
+        """
+        branch_labels = [f"[s{i}]" for i in range(len(ranges))]
+        filters = [
+            "[0:a:0]aformat=sample_rates=16000:channel_layouts=mono,"
+            f"asplit={len(ranges)}{''.join(branch_labels)}"
+        ]
+        
+        segment_paths = []
+        output_args: List[str] = []
+        for i, (start_time, length) in enumerate(ranges):
+            filters.append(
+                f"{branch_labels[i]}atrim=start={start_time}:duration={length},"
+                f"asetpts=PTS-STARTPTS[o{i}]"
+            )
+            segment_path = segments_dir / f"segment_{i:03d}.wav"
+            segment_paths.append(segment_path)
+            output_args.extend([
+                "-map", f"[o{i}]",
+                "-c:a", "pcm_s16le",
+                str(segment_path)
+            ])
+        
+        cmd = [
+            "ffmpeg",
+            "-i", str(audio_path),
+            "-filter_complex", ";".join(filters),
+            "-y",
+            *output_args
+        ]
+        
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        
+        stdout, stderr = await process.communicate()
+        
+        missing = [path for path in segment_paths if not path.exists()]
+        if process.returncode != 0 or missing:
+            error_msg = stderr.decode('utf-8') if stderr else "Unknown error"
+            raise ProcessingError(f"Single-pass split failed: {error_msg}")
+        
+        for segment_path in segment_paths:
+            logger.debug(f"Created audio segment: {segment_path}")
+        
+        return segment_paths
+    
+    async def _split_per_segment(
+        self,
+        audio_path: Path,
+        ranges: List[Tuple[float, float]],
+        segments_dir: Path
+    ) -> List[Path]:
+        """Write each segment with its own ffmpeg process."""
+        segments = []
+        
+        for i, (start_time, length) in enumerate(ranges):
+            segment_path = segments_dir / f"segment_{i:03d}.wav"
+            
+            cmd = [
+                "ffmpeg",
+                "-i", str(audio_path),
+                "-ss", str(start_time),
+                "-t", str(length),
+                "-ar", "16000",
+                "-ac", "1",
+                "-c:a", "pcm_s16le",
+                "-y",
+                str(segment_path)
+            ]
+            
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            
+            stdout, stderr = await process.communicate()
+            
+            if process.returncode != 0 or not segment_path.exists():
+                # A missing segment would shift every later timestamp
+                error_msg = stderr.decode('utf-8') if stderr else "Unknown error"
+                raise ProcessingError(f"Failed to create segment {i}: {error_msg}")
+            
+            segments.append(segment_path)
+            logger.debug(f"Created audio segment: {segment_path}")
+        
+        return segments
+    
     async def validate_audio_file(self, file_path: Path) -> bool:
         """
         Validate that the file is a valid audio file.
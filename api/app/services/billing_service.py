@@ -14,14 +14,15 @@ from datetime import datetime, timedelta
 from enum import Enum
 import json
 
-import stripe
-from stripe.error import StripeError
-
 from ..core.config import get_settings
 from ..core.exceptions import ExternalAPIError, ValidationError, ProcessingError
+from ..core.lazy_imports import lazy_import
 from ..services.database_service import DatabaseService, database_service
 from ..services.monitoring_service import monitoring_service
 
+# Stripe is imported on first use to keep cold starts fast
+stripe = lazy_import("stripe")
+
 logger = logging.getLogger(__name__)
 
 
@@ -69,9 +70,10 @@ class BillingService:
         }
     
     def _setup_stripe(self) -> None:
-        """Initialize Stripe configuration."""
+        """Initialize Stripe configuration, applied when Stripe is first used."""
         if self._settings.stripe_secret_key:
-            stripe.api_key = self._settings.stripe_secret_key
+            api_key = self._settings.stripe_secret_key
+            stripe.on_load(lambda module: setattr(module, "api_key", api_key))
             logger.info("Stripe API configured")
         else:
             logger.warning("Stripe API key not configured")
@@ -114,7 +116,7 @@ class BillingService:
                 "created": customer.created
             }
             
-        except StripeError as e:
+        except stripe.error.StripeError as e:
             logger.error(f"Stripe error creating customer: {str(e)}")
             raise ExternalAPIError(f"Failed to create customer: {str(e)}", "stripe")
         except Exception as e:
@@ -140,7 +142,7 @@ class BillingService:
                 "currency": customer.currency or "usd"
             }
             
-        except StripeError as e:
+        except stripe.error.StripeError as e:
             logger.error(f"Stripe error retrieving customer: {str(e)}")
             return None
         except Exception as e:
@@ -205,7 +207,7 @@ class BillingService:
                 "client_secret": subscription.latest_invoice.payment_intent.client_secret if subscription.latest_invoice.payment_intent else None
             }
             
-        except StripeError as e:
+        except stripe.error.StripeError as e:
             logger.error(f"Stripe error creating subscription: {str(e)}")
             raise ExternalAPIError(f"Failed to create subscription: {str(e)}", "stripe")
         except Exception as e:
@@ -244,7 +246,7 @@ class BillingService:
                 "current_period_end": subscription.current_period_end
             }
             
-        except StripeError as e:
+        except stripe.error.StripeError as e:
             logger.error(f"Stripe error cancelling subscription: {str(e)}")
             raise ExternalAPIError(f"Failed to cancel subscription: {str(e)}", "stripe")
     
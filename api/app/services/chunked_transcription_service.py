@@ -0,0 +1,225 @@
+"""
+Chunked transcription service for long audio files.
+
+Long recordings are split into chunks (cut in silent gaps where possible)
+which are transcribed concurrently (bounded per provider) and stitched back
+into a single result with timestamps relative to the original file.
+"""
+
+import asyncio
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+from ..core.config import get_settings
+from ..core.logging import get_logger
+from ..core.exceptions import ProcessingError
+from ..services.audio_service import audio_service
+from ..services.whisper_service import whisper_service
+
+logger = get_logger(__name__)
+
+
+class ChunkedTranscriptionService:
+    """Service that transcribes long audio as concurrently processed chunks."""
+    
+    # split_audio writes 16 kHz mono 16-bit PCM segments
+    SEGMENT_BYTES_PER_SECOND = 16000 * 2
+    
+    def __init__(self):
+        self.settings = get_settings()
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+    
+    def _get_semaphore(self, provider: str) -> asyncio.Semaphore:
+        """Get the concurrency limiter shared by all jobs using a provider."""
+        if provider not in self._semaphores:
+            limits = {
+                "whisper": self.settings.whisper_max_concurrent_chunks,
+                "google_speech": self.settings.google_speech_max_concurrent_chunks
+            }
+            self._semaphores[provider] = asyncio.Semaphore(max(1, limits.get(provider, 1)))
+        return self._semaphores[provider]
+    
+    async def should_chunk(self, audio_path: Path, duration: float) -> bool:
+        """
+        Decide whether a file should go through the chunked pipeline.
+        
+        Args:
+            audio_path: Path to audio file
+            duration: Audio duration in seconds
+            
+        Returns:
+            True if the file is longer than one chunk or the file Whisper would
+            be sent (transcoded when upload transcoding is enabled) is too large
+            for a single upload
+        """
+        if not self.settings.chunked_transcription_enabled:
+            return False
+            
+        if duration > self.settings.transcription_chunk_duration:
+            return True
+            
+        upload_path = audio_path
+        if self.settings.whisper_upload_transcode:
+            try:
+                upload_path = await audio_service.prepare_for_upload(audio_path)
+            except Exception as e:
+                logger.warning(f"Upload transcode failed for {audio_path.name}, sizing the original: {str(e)}")
+                
+        try:
+            return upload_path.stat().st_size > whisper_service.max_file_size
+        except OSError:
+            return False
+    
+    def chunk_duration(self) -> float:
+        """
+        Get the chunk length in seconds.
+        
+        Chunks are short enough that their PCM segments fit in a single
+        upload, so a file too large to upload whole is split into chunks
+        that each fit even if it is no longer than one chunk.
+        """
+        max_size = whisper_service.max_file_size * 0.95  # Headroom for the WAV header and overlap
+        return min(
+            self.settings.transcription_chunk_duration,
+            max_size / self.SEGMENT_BYTES_PER_SECOND
+        )
+    
+    async def transcribe(
+        self,
+        audio_path: Path,
+        language: str = "zh",
+        provider: str = "whisper"
+    ) -> Dict[str, Any]:
+        """
+        Transcribe a long audio file chunk by chunk.
+        
+        Args:
+            audio_path: Path to audio file
+            language: Language code passed to the provider
+            provider: Provider name used for the concurrency limit
+            
+        Returns:
+            Transcription result in the provider's format, with segment
+            timestamps relative to the start of the original file
+        """
+        chunk_duration = self.chunk_duration()
+        
+        if self.settings.silence_aware_chunking:
+            # Cuts land in pauses, so chunks need little or no overlap
+            offsets = await audio_service.plan_chunk_boundaries(
+                audio_path,
+                target_duration=chunk_duration
+            )
+            chunk_paths = await audio_service.split_audio(
+                audio_path,
+                overlap=self.settings.silence_chunk_overlap,
+                boundaries=offsets
+            )
+        else:
+            chunk_paths = await audio_service.split_audio(
+                audio_path,
+                segment_duration=chunk_duration,
+                overlap=self.settings.transcription_chunk_overlap
+            )
+            offsets = [i * chunk_duration for i in range(len(chunk_paths))]
+        offsets = offsets[:len(chunk_paths)]
+        
+        logger.info(f"Transcribing {audio_path.name} as {len(chunk_paths)} chunks with {provider}")
+        
+        semaphore = self._get_semaphore(provider)
+        
+        async def transcribe_chunk(chunk_path: Path) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._transcribe_chunk(chunk_path, language, provider)
+                
+        try:
+            results = await asyncio.gather(*[transcribe_chunk(path) for path in chunk_paths])
+        finally:
+            audio_service.remove_segments(chunk_paths, audio_path)
+        
+        merged = self.merge_chunk_results(list(zip(offsets, results)))
+        merged["language"] = language
+        merged["chunks"] = len(chunk_paths)
+        
+        logger.info(
+            f"Chunked transcription completed: {len(chunk_paths)} chunks, "
+            f"{len(merged['segments'])} segments"
+        )
+        return merged
+    
+    async def _transcribe_chunk(self, chunk_path: Path, language: str, provider: str) -> Dict[str, Any]:
+        """Transcribe a single chunk with the requested provider."""
+        if provider == "whisper":
+            return await whisper_service.transcribe(chunk_path, language=language)
+            
+        if provider == "google_speech":
+            from ..services.google_speech_service import google_speech_service
+            return await google_speech_service.transcribe_audio(
+                audio_file_path=chunk_path,
+                language_code=language
+            )
+            
+        raise ProcessingError(f"Unknown provider: {provider}")
+    
+    def merge_chunk_results(self, chunk_results: List[Tuple[float, Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Merge per-chunk results into a single transcription result.
+        
+        Each chunk owns the time range from its own offset up to the next
+        chunk's offset. Segments heard in the overlap are kept only by the
+        chunk that owns their midpoint, and a segment repeating the previous
+        segment's text at the same time is dropped.
+        
+        Args:
+            chunk_results: List of (offset_seconds, provider_result) in file order
+            
+        Returns:
+            Merged result with ``text``, ``segments`` and ``duration``
+        """
+        merged_segments: List[Dict[str, Any]] = []
+        duration = 0.0
+        
+        for index, (offset, result) in enumerate(chunk_results):
+            owned_end: Optional[float] = None
+            if index + 1 < len(chunk_results):
+                owned_end = chunk_results[index + 1][0]
+                
+            for segment in result.get("segments", []):
+                start = float(segment.get("start", segment.get("start_time", 0.0))) + offset
+                end = float(segment.get("end", segment.get("end_time", 0.0))) + offset
+                midpoint = (start + end) / 2
+                
+                if index > 0 and midpoint < offset:
+                    continue
+                if owned_end is not None and midpoint >= owned_end:
+                    continue
+                    
+                text = segment.get("text", "").strip()
+                if merged_segments:
+                    previous = merged_segments[-1]
+                    if text and text == previous["text"].strip() and start < previous["end"]:
+                        continue
+                        
+                shifted = dict(segment)
+                shifted["start"] = start
+                shifted["end"] = end
+                shifted["id"] = len(merged_segments)
+                if "words" in segment:
+                    shifted["words"] = [
+                        {**word, "start": word.get("start", 0.0) + offset, "end": word.get("end", 0.0) + offset}
+                        for word in segment["words"]
+                    ]
+                merged_segments.append(shifted)
+                
+            chunk_end = offset + float(result.get("duration", 0.0) or 0.0)
+            duration = max(duration, chunk_end, merged_segments[-1]["end"] if merged_segments else 0.0)
+            
+        return {
+            "text": "".join(segment.get("text", "") for segment in merged_segments),
+            "segments": merged_segments,
+            "duration": duration
+        }
+
+
+# Global service instance
+chunked_transcription_service = ChunkedTranscriptionService()
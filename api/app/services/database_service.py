@@ -9,17 +9,23 @@ import asyncio
 import logging
 import uuid
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any, Union
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Union
 from contextlib import asynccontextmanager
 
-from supabase import create_client, Client
-from postgrest import APIError
 from pydantic import BaseModel, Field
 
 from ..core.config import get_settings
 from ..core.exceptions import DatabaseError, NotFoundError
+from ..core.lazy_imports import lazy_import
 from ..models.database import JobStatus
 
+if TYPE_CHECKING:
+    from supabase import Client
+
+# The Supabase client is imported on first use to keep cold starts fast
+supabase = lazy_import("supabase")
+postgrest = lazy_import("postgrest")
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,19 +33,23 @@ class DatabaseService:
     """Main database service for Supabase operations."""
     
     def __init__(self):
-        self._client: Optional[Client] = None
+        self._client: Optional["Client"] = None
         self._settings = get_settings()
     
+    def _create_client(self) -> "Client":
+        """Create the Supabase client; this is where the SDK gets imported."""
+        if not self._settings.supabase_url or not self._settings.supabase_key:
+            raise DatabaseError("Supabase credentials not configured")
+            
+        return supabase.create_client(
+            self._settings.supabase_url,
+            self._settings.supabase_key
+        )
+    
     async def initialize(self) -> None:
         """Initialize database connection."""
         try:
-            if not self._settings.supabase_url or not self._settings.supabase_key:
-                raise DatabaseError("Supabase credentials not configured")
-            
-            self._client = create_client(
-                self._settings.supabase_url,
-                self._settings.supabase_key
-            )
+            self._client = self._create_client()
             
             # Test connection
             await self.health_check()
@@ -50,10 +60,10 @@ class DatabaseService:
             raise DatabaseError(f"Database initialization failed: {str(e)}")
     
     @property
-    def client(self) -> Client:
-        """Get Supabase client."""
+    def client(self) -> "Client":
+        """Get Supabase client, creating it on first use."""
         if not self._client:
-            raise DatabaseError("Database not initialized")
+            self._client = self._create_client()
         return self._client
     
     async def health_check(self) -> bool:
@@ -81,7 +91,7 @@ class DatabaseService:
             logger.info(f"Created user: {result.data[0]['id']}")
             return result.data[0]
             
-        except APIError as e:
+        except postgrest.APIError as e:
             if "duplicate key" in str(e).lower():
                 raise DatabaseError("User with this email already exists")
             raise DatabaseError(f"Database error: {str(e)}")
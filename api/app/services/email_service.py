@@ -109,27 +109,28 @@ class EmailService:
         """Send email via Resend API."""
         try:
             import aiohttp
+            from ..services.http_client_service import http_client_service
             
             headers = {
                 "Authorization": f"Bearer {self._resend_api_key}",
                 "Content-Type": "application/json"
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://api.resend.com/emails",
-                    headers=headers,
-                    json=email_data,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    result = await response.json()
+            session = http_client_service.get_session("resend")
+            async with session.post(
+                "https://api.resend.com/emails",
+                headers=headers,
+                json=email_data,
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                result = await response.json()
+                
+                if response.status == 200:
+                    return result
+                else:
+                    error_msg = result.get("message", "Unknown error")
+                    raise ExternalAPIError(f"Resend API error: {error_msg}", "resend")
                     
-                    if response.status == 200:
-                        return result
-                    else:
-                        error_msg = result.get("message", "Unknown error")
-                        raise ExternalAPIError(f"Resend API error: {error_msg}", "resend")
-                        
         except aiohttp.ClientError as e:
             logger.error(f"HTTP error sending email: {str(e)}")
             raise ExternalAPIError(f"Network error sending email: {str(e)}", "resend")
@@ -358,20 +359,21 @@ class EmailService:
             
             # Test API connectivity with a minimal request
             import aiohttp
+            from ..services.http_client_service import http_client_service
             
             headers = {
                 "Authorization": f"Bearer {self._resend_api_key}",
                 "Content-Type": "application/json"
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    "https://api.resend.com/domains",
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    return response.status in [200, 401]  # 401 means API key is recognized but may lack domain access
-                    
+            session = http_client_service.get_session("resend")
+            async with session.get(
+                "https://api.resend.com/domains",
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                return response.status in [200, 401]  # 401 means API key is recognized but may lack domain access
+                
         except Exception as e:
             logger.error(f"Email service health check failed: {str(e)}")
             return False
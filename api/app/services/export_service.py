@@ -294,21 +294,8 @@ class ExportService:
             Path to file if it exists, None otherwise
         """
         try:
-            # Search for export file in user's processed directory
-            user_processed_dir = Path(file_manager.processed_dir) / user_id
-            
-            if not user_processed_dir.exists():
-                return None
-            
-            # Look for file matching pattern: {job_id}_export_{format}_*.{format}
-            pattern = f"{job_id}_export_{format}_*.{format}"
-            matching_files = list(user_processed_dir.glob(pattern))
-            
-            if matching_files:
-                # Return the most recent file
-                return max(matching_files, key=lambda f: f.stat().st_mtime)
-            
-            return None
+            # Most recent export of this job in the format, from the file index
+            return await file_manager.get_processed_file_path(job_id, user_id, f"export_{format}")
             
         except Exception as e:
             logger.error(f"Error getting export file path: {str(e)}")
@@ -5,6 +5,8 @@ This service handles audio transcription using Google Cloud Speech-to-Text API
 with optimized settings for Cantonese language recognition.
 """
 
+from __future__ import annotations
+
 import asyncio
 import logging
 import os
@@ -14,15 +16,18 @@ from typing import List, Dict, Any, Optional, Union
 from datetime import datetime
 
 import aiofiles
-from google.cloud import speech
-from google.oauth2 import service_account
-from google.api_core import exceptions as google_exceptions
 
 from ..core.config import get_settings
 from ..core.exceptions import ExternalAPIError, ProcessingError, ValidationError
+from ..core.lazy_imports import lazy_import
 from ..services.database_service import DatabaseService
 from ..services.retry_service import with_api_retry, RetryConfig, CircuitBreakerConfig
 
+# The Google Cloud SDK is imported on first use to keep cold starts fast
+speech = lazy_import("google.cloud.speech")
+service_account = lazy_import("google.oauth2.service_account")
+google_exceptions = lazy_import("google.api_core.exceptions")
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,24 +41,29 @@ class GoogleSpeechService:
     
     async def initialize(self) -> None:
         """Initialize Google Cloud Speech client."""
+        self._client = self._create_client()
+    
+    def _create_client(self) -> speech.SpeechClient:
+        """Create the Speech client; this is where the SDK gets imported."""
         try:
             # Set up authentication
-            await self._setup_authentication()
+            self._setup_authentication()
             
             # Initialize client
             if self._credentials:
-                self._client = speech.SpeechClient(credentials=self._credentials)
+                client = speech.SpeechClient(credentials=self._credentials)
             else:
                 # Use default credentials (service account key from environment)
-                self._client = speech.SpeechClient()
+                client = speech.SpeechClient()
             
             logger.info("Google Speech service initialized successfully")
+            return client
             
         except Exception as e:
             logger.error(f"Failed to initialize Google Speech service: {str(e)}")
             raise ExternalAPIError(f"Google Speech initialization failed: {str(e)}", "google_speech")
     
-    async def _setup_authentication(self) -> None:
+    def _setup_authentication(self) -> None:
         """Set up Google Cloud authentication."""
         try:
             # Check for service account key file
@@ -83,9 +93,9 @@ class GoogleSpeechService:
     
     @property
     def client(self) -> speech.SpeechClient:
-        """Get Speech client."""
+        """Get Speech client, creating it on first use."""
         if not self._client:
-            raise ExternalAPIError("Google Speech client not initialized")
+            self._client = self._create_client()
         return self._client
     
     async def transcribe_audio(
@@ -357,9 +367,6 @@ class GoogleSpeechService:
     async def health_check(self) -> bool:
         """Check service health."""
         try:
-            if not self._client:
-                return False
-            
             # Try a minimal recognition request
             test_audio = speech.RecognitionAudio(content=b'')  # Empty audio for test
             test_config = speech.RecognitionConfig(
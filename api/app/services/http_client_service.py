@@ -0,0 +1,159 @@
+"""
+Shared pooled HTTP client for outbound provider calls.
+
+Sessions are created once per provider and reused for every request, so
+connections stay alive between calls instead of paying for TCP and TLS
+setup each time. Sessions are opened in the application lifespan and
+closed on shutdown; code running outside the app (workers, scripts)
+gets a session lazily on first use.
+"""
+
+import asyncio
+import time
+from typing import Dict, Any
+
+import aiohttp
+
+from ..core.config import get_settings
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class HttpClientService:
+    """Registry of pooled aiohttp sessions keyed by provider name."""
+    
+    def __init__(self):
+        self.settings = get_settings()
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._loops: Dict[str, asyncio.AbstractEventLoop] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+    
+    async def startup(self, names: tuple = ("openai", "google", "resend")) -> None:
+        """Open sessions for the known providers."""
+        for name in names:
+            self.get_session(name)
+        logger.info(f"HTTP client pools opened: {', '.join(names)}")
+    
+    async def shutdown(self) -> None:
+        """Close all sessions and their connection pools."""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        self._loops.clear()
+        
+        for session in sessions:
+            try:
+                await session.close()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP session: {str(e)}")
+                
+        # Give the connectors a moment to close TLS transports cleanly
+        await asyncio.sleep(0.25)
+        logger.info("HTTP client pools closed")
+    
+    def get_session(self, name: str = "default") -> aiohttp.ClientSession:
+        """
+        Get the shared session for a provider, creating it if needed.
+        
+        Args:
+            name: Provider name, each provider gets its own connection pool
+            
+        Returns:
+            Pooled aiohttp session; callers must not close it
+        """
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(name)
+        
+        # A session is bound to the loop it was created on
+        if session is None or session.closed or self._loops.get(name) is not loop:
+            session = self._create_session(name)
+            self._sessions[name] = session
+            self._loops[name] = loop
+            
+        return session
+    
+    def _create_session(self, name: str) -> aiohttp.ClientSession:
+        """Create a session with a keep-alive, DNS-caching connection pool."""
+        connector = aiohttp.TCPConnector(
+            limit=self.settings.http_pool_limit,
+            limit_per_host=self.settings.http_pool_limit_per_host,
+            ttl_dns_cache=self.settings.http_dns_cache_ttl,
+            keepalive_timeout=self.settings.http_keepalive_timeout
+        )
+        
+        return aiohttp.ClientSession(
+            connector=connector,
+            trace_configs=[self._create_trace_config(name)]
+        )
+    
+    def _create_trace_config(self, name: str) -> aiohttp.TraceConfig:
+        """Create request hooks that record pool usage for a provider."""
+        stats = self._stats.setdefault(name, {
+            "requests": 0,
+            "in_flight": 0,
+            "peak_in_flight": 0,
+            "errors": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "pool_waits": 0,
+            "pool_wait_seconds": 0.0
+        })
+        
+        async def on_request_start(session, context, params):
+            stats["requests"] += 1
+            stats["in_flight"] += 1
+            stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+        
+        async def on_request_end(session, context, params):
+            stats["in_flight"] -= 1
+        
+        async def on_request_exception(session, context, params):
+            stats["in_flight"] -= 1
+            stats["errors"] += 1
+        
+        async def on_connection_queued_start(session, context, params):
+            # Every connection in the pool is busy
+            stats["pool_waits"] += 1
+            context.queued_at = time.monotonic()
+        
+        async def on_connection_queued_end(session, context, params):
+            stats["pool_wait_seconds"] += time.monotonic() - context.queued_at
+        
+        async def on_connection_create_end(session, context, params):
+            stats["connections_created"] += 1
+        
+        async def on_connection_reuseconn(session, context, params):
+            stats["connections_reused"] += 1
+            
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        trace_config.on_connection_queued_start.append(on_connection_queued_start)
+        trace_config.on_connection_queued_end.append(on_connection_queued_end)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics per provider."""
+        pools = {}
+        for name, stats in self._stats.items():
+            connections = stats["connections_created"] + stats["connections_reused"]
+            pools[name] = {
+                **stats,
+                "pool_wait_seconds": round(stats["pool_wait_seconds"], 3),
+                "open": name in self._sessions and not self._sessions[name].closed,
+                "reuse_ratio": stats["connections_reused"] / connections if connections else 0.0,
+                "saturation": stats["in_flight"] / self.settings.http_pool_limit_per_host
+            }
+            
+        return {
+            "limit": self.settings.http_pool_limit,
+            "limit_per_host": self.settings.http_pool_limit_per_host,
+            "pools": pools
+        }
+
+
+# Global service instance
+http_client_service = HttpClientService()
@@ -0,0 +1,302 @@
+"""
+Durable transcription job queue backed by SQLite.
+
+Jobs are stored with their full state so every API process and worker
+sees the same status. Workers lease a job for a visibility timeout and
+keep the lease alive with heartbeats; a job whose worker dies becomes
+visible again once its lease expires and is retried up to a limit.
+"""
+
+import asyncio
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+from ..schemas.transcription import TranscriptionJob, JobStatus
+from ..core.config import get_settings
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class QueueState:
+    """Queue states of a stored job."""
+    CREATED = "created"    # Stored but not yet submitted
+    QUEUED = "queued"      # Waiting for a worker
+    LEASED = "leased"      # Held by a worker until lease_expires_at
+    DONE = "done"          # Acknowledged by a worker
+    DEAD = "dead"          # Gave up after max attempts
+
+
+class JobQueueService:
+    """Persistent job store with lease/ack semantics."""
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.settings = get_settings()
+        self.db_path = Path(db_path or self.settings.job_queue_path)
+        self._initialized = False
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; one per operation so it can run in any thread."""
+        if not self._initialized:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    queue_state TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    lease_owner TEXT,
+                    lease_expires_at REAL,
+                    available_at REAL NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_user ON jobs (user_id, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs (queue_state, available_at)")
+            self._initialized = True
+            
+        return conn
+    
+    async def _run(self, func, *args):
+        """Run a blocking database operation in the default executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+    
+    async def create(self, job: TranscriptionJob) -> None:
+        """Store a new job without making it visible to workers."""
+        await self._run(self._create, job)
+    
+    def _create(self, job: TranscriptionJob) -> None:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """
+                INSERT INTO jobs (job_id, user_id, status, data, queue_state, available_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (job.job_id, job.user_id, job.status.value, job.json(),
+                 QueueState.CREATED, now, job.created_at, now)
+            )
+    
+    async def save(self, job: TranscriptionJob) -> None:
+        """Persist the current state of a job unless it has been cancelled."""
+        await self._run(self._save, job)
+    
+    def _save(self, job: TranscriptionJob) -> None:
+        with closing(self._connect()) as conn:
+            # A cancelled job is final; late progress updates must not revive it
+            conn.execute(
+                "UPDATE jobs SET status = ?, data = ?, updated_at = ? WHERE job_id = ? AND status != ?",
+                (job.status.value, job.json(), time.time(), job.job_id, JobStatus.CANCELLED.value)
+            )
+    
+    async def get(self, job_id: str) -> Optional[TranscriptionJob]:
+        """Load a job by id."""
+        return await self._run(self._get, job_id)
+    
+    def _get(self, job_id: str) -> Optional[TranscriptionJob]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return TranscriptionJob.parse_raw(row["data"]) if row else None
+    
+    async def list_for_user(self, user_id: str, limit: int = 10, offset: int = 0) -> List[TranscriptionJob]:
+        """List a user's jobs, newest first."""
+        return await self._run(self._list_for_user, user_id, limit, offset)
+    
+    def _list_for_user(self, user_id: str, limit: int, offset: int) -> List[TranscriptionJob]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT data FROM jobs WHERE user_id = ? ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                (user_id, limit, offset)
+            ).fetchall()
+        return [TranscriptionJob.parse_raw(row["data"]) for row in rows]
+    
+    async def enqueue(self, job_id: str, delay: float = 0.0) -> None:
+        """Make a stored job visible to workers."""
+        await self._run(self._enqueue, job_id, delay)
+    
+    def _enqueue(self, job_id: str, delay: float) -> None:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """
+                UPDATE jobs SET queue_state = ?, available_at = ?, lease_owner = NULL,
+                    lease_expires_at = NULL, updated_at = ?
+                WHERE job_id = ?
+                """,
+                (QueueState.QUEUED, now + delay, now, job_id)
+            )
+    
+    async def lease(self, worker_id: str, visibility_timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Lease the next available job.
+        
+        Queued jobs and jobs whose lease has expired are both eligible. A job
+        that has already used all its attempts is marked dead and failed
+        instead of being handed out again.
+        
+        Args:
+            worker_id: Identifier of the leasing worker
+            visibility_timeout: Seconds before the lease expires without a heartbeat
+            
+        Returns:
+            Dict with ``job_id``, ``user_id`` and ``attempts``, or None if the queue is empty
+        """
+        timeout = visibility_timeout or self.settings.job_visibility_timeout
+        return await self._run(self._lease, worker_id, timeout)
+    
+    def _lease(self, worker_id: str, visibility_timeout: float) -> Optional[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            while True:
+                now = time.time()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    row = conn.execute(
+                        """
+                        SELECT job_id, user_id, attempts, data FROM jobs
+                        WHERE (queue_state = ? AND available_at <= ?)
+                           OR (queue_state = ? AND lease_expires_at <= ?)
+                        ORDER BY available_at
+                        LIMIT 1
+                        """,
+                        (QueueState.QUEUED, now, QueueState.LEASED, now)
+                    ).fetchone()
+                    
+                    if row is None:
+                        conn.execute("COMMIT")
+                        return None
+                        
+                    if row["attempts"] >= self.settings.job_max_attempts:
+                        # Previous workers died holding this job; stop retrying it
+                        job = TranscriptionJob.parse_raw(row["data"])
+                        job.status = JobStatus.FAILED
+                        job.error_message = job.error_message or "Job abandoned after repeated worker failures"
+                        job.completed_at = datetime.utcnow().isoformat()
+                        conn.execute(
+                            """
+                            UPDATE jobs SET queue_state = ?, status = ?, data = ?, lease_owner = NULL,
+                                lease_expires_at = NULL, updated_at = ?
+                            WHERE job_id = ?
+                            """,
+                            (QueueState.DEAD, job.status.value, job.json(), now, row["job_id"])
+                        )
+                        conn.execute("COMMIT")
+                        logger.warning(f"Job {row['job_id']} dead after {row['attempts']} attempts")
+                        continue
+                        
+                    conn.execute(
+                        """
+                        UPDATE jobs SET queue_state = ?, lease_owner = ?, lease_expires_at = ?,
+                            attempts = attempts + 1, updated_at = ?
+                        WHERE job_id = ?
+                        """,
+                        (QueueState.LEASED, worker_id, now + visibility_timeout, now, row["job_id"])
+                    )
+                    conn.execute("COMMIT")
+                    
+                    return {
+                        "job_id": row["job_id"],
+                        "user_id": row["user_id"],
+                        "attempts": row["attempts"] + 1
+                    }
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+    
+    async def heartbeat(self, job_id: str, worker_id: str, visibility_timeout: Optional[float] = None) -> bool:
+        """
+        Extend a lease held by a worker.
+        
+        Returns:
+            False if the worker no longer holds the lease or the job was cancelled
+        """
+        timeout = visibility_timeout or self.settings.job_visibility_timeout
+        return await self._run(self._heartbeat, job_id, worker_id, timeout)
+    
+    def _heartbeat(self, job_id: str, worker_id: str, visibility_timeout: float) -> bool:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs SET lease_expires_at = ?, updated_at = ?
+                WHERE job_id = ? AND queue_state = ? AND lease_owner = ? AND status != ?
+                """,
+                (now + visibility_timeout, now, job_id, QueueState.LEASED, worker_id,
+                 JobStatus.CANCELLED.value)
+            )
+            return cursor.rowcount == 1
+    
+    async def ack(self, job_id: str, worker_id: str) -> bool:
+        """Mark a leased job as finished."""
+        return await self._run(self._ack, job_id, worker_id)
+    
+    def _ack(self, job_id: str, worker_id: str) -> bool:
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs SET queue_state = ?, lease_owner = NULL, lease_expires_at = NULL, updated_at = ?
+                WHERE job_id = ? AND lease_owner = ?
+                """,
+                (QueueState.DONE, time.time(), job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+    
+    async def nack(self, job_id: str, worker_id: str, delay: float = 0.0) -> bool:
+        """Release a leased job back to the queue, optionally after a delay."""
+        return await self._run(self._nack, job_id, worker_id, delay)
+    
+    def _nack(self, job_id: str, worker_id: str, delay: float) -> bool:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs SET queue_state = ?, available_at = ?, lease_owner = NULL,
+                    lease_expires_at = NULL, updated_at = ?
+                WHERE job_id = ? AND lease_owner = ?
+                """,
+                (QueueState.QUEUED, now + delay, now, job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+    
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get job counts by queue state."""
+        return await self._run(self._get_stats)
+    
+    def _get_stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            counts = {
+                row["queue_state"]: row["count"]
+                for row in conn.execute(
+                    "SELECT queue_state, COUNT(*) AS count FROM jobs GROUP BY queue_state"
+                )
+            }
+            expired = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE queue_state = ? AND lease_expires_at <= ?",
+                (QueueState.LEASED, now)
+            ).fetchone()[0]
+            
+        return {
+            "queued": counts.get(QueueState.QUEUED, 0),
+            "leased": counts.get(QueueState.LEASED, 0),
+            "expired_leases": expired,
+            "done": counts.get(QueueState.DONE, 0),
+            "dead": counts.get(QueueState.DEAD, 0)
+        }
+
+
+# Global service instance
+job_queue_service = JobQueueService()
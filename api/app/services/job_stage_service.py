@@ -0,0 +1,206 @@
+"""
+Persistent per-job pipeline stage outputs.
+
+Each stage of a transcription job (probe, transcript, romanization,
+translation) stores its output with a dependency key
+derived from the inputs it was computed from. A retried job, or a
+re-run of a finished job with different options, reuses every stage
+whose key still matches and recomputes only the invalidated ones.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple
+
+from ..core.config import get_settings
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class StageRun:
+    """Stage runner bound to one job and the jobs whose outputs it may reuse."""
+    
+    def __init__(self, service: "JobStageService", job_ids: List[str]):
+        self.service = service
+        self.job_ids = job_ids
+        self.reused: List[str] = []
+    
+    async def __call__(
+        self,
+        stage: str,
+        dependency_key: str,
+        compute: Callable[[], Awaitable[Any]],
+        is_valid: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """Run a stage, remembering whether its output was reused."""
+        output, reused = await self.service.run_stage(self.job_ids, stage, dependency_key, compute, is_valid)
+        if reused:
+            self.reused.append(stage)
+        return output
+
+
+class JobStageService:
+    """SQLite store of stage outputs keyed by job, stage and dependency key."""
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.settings = get_settings()
+        self.db_path = Path(db_path or self.settings.job_stage_path)
+        self._initialized = False
+        self._stats = {
+            "reused": 0,
+            "computed": 0,
+            "errors": 0
+        }
+    
+    @staticmethod
+    def dependency_key(*parts: Any) -> str:
+        """Hash JSON-serializable inputs into a dependency key."""
+        encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; one per operation so it can run in any thread."""
+        if not self._initialized:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_stages (
+                    job_id TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    dependency_key TEXT NOT NULL,
+                    output TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (job_id, stage)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_job_stages_created ON job_stages (created_at)")
+            self._initialized = True
+            
+        return conn
+    
+    async def _run(self, func, *args):
+        """Run a blocking database operation in the default executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+    
+    async def get(self, job_id: str, stage: str, dependency_key: str) -> Optional[Any]:
+        """
+        Get a stage output if it was computed from the same inputs.
+        
+        Args:
+            job_id: Job that produced the output
+            stage: Stage name
+            dependency_key: Key of the inputs the caller would compute from
+            
+        Returns:
+            The stored output, or None if missing, stale or expired
+        """
+        try:
+            payload = await self._run(self._load, job_id, stage, dependency_key)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Stage lookup failed for job {job_id}/{stage}: {str(e)}")
+            return None
+            
+        return json.loads(payload) if payload is not None else None
+    
+    def _load(self, job_id: str, stage: str, dependency_key: str) -> Optional[str]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                """
+                SELECT output FROM job_stages
+                WHERE job_id = ? AND stage = ? AND dependency_key = ? AND created_at >= ?
+                """,
+                (job_id, stage, dependency_key, time.time() - self.settings.job_stage_ttl)
+            ).fetchone()
+            return row[0] if row else None
+    
+    async def put(self, job_id: str, stage: str, dependency_key: str, output: Any) -> None:
+        """Store a stage output, replacing the job's previous output for that stage."""
+        try:
+            payload = json.dumps(output, ensure_ascii=False)
+            await self._run(self._store, job_id, stage, dependency_key, payload)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Could not store stage output for job {job_id}/{stage}: {str(e)}")
+    
+    def _store(self, job_id: str, stage: str, dependency_key: str, payload: str) -> None:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """
+                INSERT INTO job_stages (job_id, stage, dependency_key, output, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (job_id, stage)
+                DO UPDATE SET dependency_key = excluded.dependency_key,
+                              output = excluded.output, created_at = excluded.created_at
+                """,
+                (job_id, stage, dependency_key, payload, now)
+            )
+            conn.execute("DELETE FROM job_stages WHERE created_at < ?", (now - self.settings.job_stage_ttl,))
+    
+    async def run_stage(
+        self,
+        job_ids: List[str],
+        stage: str,
+        dependency_key: str,
+        compute: Callable[[], Awaitable[Any]],
+        is_valid: Optional[Callable[[Any], bool]] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Reuse a stage output from the given jobs, or compute and store it.
+        
+        Args:
+            job_ids: Job running the stage first, then jobs whose outputs it may reuse
+            stage: Stage name
+            dependency_key: Key of the stage's inputs
+            compute: Zero-argument coroutine function producing the output
+            is_valid: Optional check that a stored output is still usable
+            
+        Returns:
+            Tuple of (output, reused)
+        """
+        job_id = job_ids[0]
+        
+        for source_job_id in job_ids:
+            output = await self.get(source_job_id, stage, dependency_key)
+            if output is None or (is_valid is not None and not is_valid(output)):
+                continue
+                
+            if source_job_id != job_id:
+                # Keep a copy so re-runs of this job can reuse it too
+                await self.put(job_id, stage, dependency_key, output)
+            self._stats["reused"] += 1
+            logger.info(f"Job {job_id}: reusing {stage} from job {source_job_id}")
+            return output, True
+            
+        output = await compute()
+        await self.put(job_id, stage, dependency_key, output)
+        self._stats["computed"] += 1
+        return output, False
+    
+    def for_job(self, job_id: str, parent_job_id: Optional[str] = None) -> StageRun:
+        """Get a stage runner for a job, reusing its parent's outputs if it is a re-run."""
+        return StageRun(self, [job_id, parent_job_id] if parent_job_id else [job_id])
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get stage reuse statistics."""
+        total = self._stats["reused"] + self._stats["computed"]
+        return {
+            **self._stats,
+            "reuse_ratio": self._stats["reused"] / total if total else 0.0
+        }
+
+
+# Global service instance
+job_stage_service = JobStageService()
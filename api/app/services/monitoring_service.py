@@ -20,6 +20,19 @@ from ..services.whisper_service import whisper_service
 from ..services.unified_transcription_service import unified_transcription_service
 from ..services.retry_service import retry_service
 from ..services.progress_service import progress_service
+from ..services.audio_service import audio_service
+from ..services.http_client_service import http_client_service
+from ..services.job_queue_service import job_queue_service
+from ..services.worker_service import worker_service
+from ..services.translation_cache_service import translation_cache_service
+from ..services.transcription_cache_service import transcription_cache_service
+from ..services.job_stage_service import job_stage_service
+from ..services.youtube_cache_service import youtube_cache_service
+from ..services.romanization_service import romanization_service
+from ..services.upload_session_service import upload_session_service
+from ..core.single_flight import get_single_flight_stats
+from ..core.storage import file_manager
+from ..core.lazy_imports import get_lazy_import_stats
 
 logger = logging.getLogger(__name__)
 
@@ -354,11 +367,45 @@ class MonitoringService:
             # Get circuit breaker metrics
             circuit_breaker_stats = retry_service.get_all_circuit_breaker_status()
             
+            # Get job queue metrics
+            try:
+                job_queue_stats = await job_queue_service.get_stats()
+            except Exception as e:
+                logger.warning(f"Error getting job queue stats: {str(e)}")
+                job_queue_stats = {}
+            
+            # Get transcription result cache metrics
+            try:
+                transcription_cache_stats = await transcription_cache_service.get_stats()
+            except Exception as e:
+                logger.warning(f"Error getting transcription cache stats: {str(e)}")
+                transcription_cache_stats = {}
+            
+            # Get YouTube download cache metrics
+            try:
+                youtube_cache_stats = await youtube_cache_service.get_stats()
+            except Exception as e:
+                logger.warning(f"Error getting YouTube cache stats: {str(e)}")
+                youtube_cache_stats = {}
+            
             return {
                 "timestamp": datetime.utcnow().isoformat(),
                 "database": db_stats,
                 "progress_service": progress_stats,
                 "circuit_breakers": circuit_breaker_stats,
+                "audio_probe_cache": audio_service.get_probe_cache_stats(),
+                "http_clients": http_client_service.get_stats(),
+                "translation_cache": translation_cache_service.get_stats(),
+                "transcription_cache": transcription_cache_stats,
+                "job_stages": job_stage_service.get_stats(),
+                "youtube_cache": youtube_cache_stats,
+                "uploads": upload_session_service.get_stats(),
+                "storage_cleanup": file_manager.get_cleanup_stats(),
+                "single_flight": get_single_flight_stats(),
+                "romanization": romanization_service.get_stats(),
+                "lazy_imports": get_lazy_import_stats(),
+                "job_queue": job_queue_stats,
+                "workers": worker_service.get_stats(),
                 "uptime_seconds": time.time() - self._start_time
             }
             
@@ -3,11 +3,18 @@ PyCantonese romanization service for converting Chinese text to Yale and Jyutpin
 """
 
 import asyncio
-from typing import Dict, Optional, List
+import threading
+import time
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
 import re
 
 from ..core.logging import get_logger
 from ..core.exceptions import ProcessingError
+from ..core.single_flight import SingleFlight
+from ..core.jyutping_lexicon import JyutpingLexicon, pycantonese_version
+from ..core.config import get_settings
 
 logger = get_logger(__name__)
 
@@ -16,21 +23,255 @@ class RomanizationService:
     """Service for Cantonese romanization using PyCantonese."""
     
     def __init__(self):
+        self.settings = get_settings()
         self._pycantonese = None
-        self._init_lock = asyncio.Lock()
-    
-    async def _ensure_initialized(self):
-        """Ensure PyCantonese is initialized (lazy loading)."""
-        if self._pycantonese is None:
-            async with self._init_lock:
-                if self._pycantonese is None:
-                    try:
-                        import pycantonese
-                        self._pycantonese = pycantonese
-                        logger.info("PyCantonese initialized successfully")
-                    except ImportError:
-                        logger.error("PyCantonese not available")
-                        raise ProcessingError("PyCantonese library not installed")
+        self._loaded = False
+        self._lexicon: Optional[JyutpingLexicon] = None
+        self._flight = SingleFlight("romanization")
+        self._executor: Optional[Executor] = None
+        self._memo: "OrderedDict[Tuple[str, bool, bool], Dict[str, Optional[str]]]" = OrderedDict()
+        self._memo_stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "duplicates": 0
+        }
+        self._stats = {
+            "tasks": 0,
+            "texts": 0,
+            "errors": 0,
+            "queue_depth": 0,
+            "max_queue_depth": 0,
+            "total_wait_seconds": 0.0,
+            "total_run_seconds": 0.0,
+            "max_latency_seconds": 0.0
+        }
+    
+    def _load(self) -> None:
+        """
+        Load the Jyutping lexicon, or PyCantonese itself without one (blocking).
+        
+        Runs once in each executor worker, never on the event loop. With a
+        lexicon snapshot PyCantonese is never imported.
+        """
+        if self._loaded:
+            return
+            
+        if self.settings.romanization_lexicon_enabled:
+            self._lexicon = self._load_lexicon()
+            
+        if self._lexicon is None:
+            try:
+                import pycantonese
+            except ImportError:
+                logger.error("PyCantonese not available")
+                raise ProcessingError("PyCantonese library not installed")
+            self._pycantonese = pycantonese
+            logger.info("PyCantonese initialized successfully")
+            
+        self._loaded = True
+    
+    def _load_lexicon(self) -> Optional[JyutpingLexicon]:
+        """Load the lexicon snapshot, compiling and saving a new one if it is missing or stale."""
+        snapshot = self.settings.romanization_lexicon_snapshot
+        try:
+            source_version = pycantonese_version()
+        except ImportError:
+            source_version = None  # A prebuilt snapshot still works without PyCantonese
+            
+        if snapshot:
+            try:
+                lexicon = JyutpingLexicon.load(snapshot, source_version=source_version)
+                logger.info(f"Jyutping lexicon loaded from snapshot: {lexicon.word_count} words")
+                return lexicon
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Ignoring Jyutping lexicon snapshot {snapshot}: {str(e)}")
+                
+        if source_version is None:
+            return None
+            
+        try:
+            lexicon = JyutpingLexicon.from_pycantonese()
+            logger.info(f"Jyutping lexicon compiled: {lexicon.word_count} words")
+        except Exception as e:
+            # Internal PyCantonese data moved; the public API still works
+            logger.warning(f"Could not compile Jyutping lexicon, using PyCantonese directly: {str(e)}")
+            return None
+            
+        if snapshot:
+            try:
+                lexicon.precompute_yale()
+                lexicon.save(snapshot, source_version=source_version)
+                logger.info(f"Saved Jyutping lexicon snapshot to {snapshot}")
+            except Exception as e:
+                logger.warning(f"Could not save Jyutping lexicon snapshot: {str(e)}")
+                
+        return lexicon
+    
+    def _get_executor(self) -> Executor:
+        """Create the romanization worker pool on first use."""
+        if self._executor is None:
+            workers = max(1, self.settings.romanization_workers)
+            if self.settings.romanization_executor == "thread":
+                self._executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix="romanization",
+                    initializer=_init_worker
+                )
+            else:
+                self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+            logger.info(f"Romanization {self.settings.romanization_executor} pool started with {workers} workers")
+        return self._executor
+    
+    async def _run_in_pool(self, func, *args) -> Any:
+        """Run a worker function in the pool and record queueing and run time."""
+        loop = asyncio.get_running_loop()
+        self._stats["queue_depth"] += 1
+        self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._stats["queue_depth"])
+        submitted = time.perf_counter()
+        
+        try:
+            result, run_seconds = await loop.run_in_executor(self._get_executor(), func, *args)
+        except BrokenExecutor:
+            # A worker process died; start a fresh pool for the next call
+            self._stats["errors"] += 1
+            self._executor = None
+            raise
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+        finally:
+            self._stats["queue_depth"] -= 1
+            
+        latency = time.perf_counter() - submitted
+        self._stats["tasks"] += 1
+        self._stats["total_run_seconds"] += run_seconds
+        self._stats["total_wait_seconds"] += max(0.0, latency - run_seconds)
+        self._stats["max_latency_seconds"] = max(self._stats["max_latency_seconds"], latency)
+        return result
+    
+    def _memo_get(self, key: Tuple[str, bool, bool]) -> Optional[Dict[str, Optional[str]]]:
+        """Look up a memoized result, marking it most recently used."""
+        result = self._memo.get(key)
+        if result is not None:
+            self._memo.move_to_end(key)
+        return result
+    
+    def _memo_set(self, key: Tuple[str, bool, bool], result: Dict[str, Optional[str]]) -> None:
+        """Memoize a result, evicting least recently used entries."""
+        if self.settings.romanization_cache_size <= 0:
+            return
+            
+        self._memo[key] = result
+        self._memo.move_to_end(key)
+        
+        while len(self._memo) > self.settings.romanization_cache_size:
+            self._memo.popitem(last=False)
+            self._memo_stats["evictions"] += 1
+    
+    async def _romanize_in_pool(
+        self,
+        text_list: List[str],
+        include_yale: bool,
+        include_jyutping: bool
+    ) -> List[Dict[str, Optional[str]]]:
+        """
+        Romanize texts through the memo and the worker pool.
+        
+        Each distinct cleaned text is converted at most once per call, and
+        not at all if it is memoized; the rest are split into batches and
+        romanized across the pool.
+        """
+        results: List[Optional[Dict[str, Optional[str]]]] = [None] * len(text_list)
+        pending: Dict[str, List[int]] = {}
+        
+        for index, text in enumerate(text_list):
+            cleaned_text = self._clean_text(text)
+            if not cleaned_text:
+                results[index] = {"yale": None, "jyutping": None}
+                continue
+                
+            if cleaned_text in pending:
+                pending[cleaned_text].append(index)
+                self._memo_stats["duplicates"] += 1
+                continue
+                
+            cached = self._memo_get((cleaned_text, include_yale, include_jyutping))
+            if cached is not None:
+                results[index] = dict(cached)
+                self._memo_stats["hits"] += 1
+            else:
+                pending[cleaned_text] = [index]
+                self._memo_stats["misses"] += 1
+                
+        if pending:
+            distinct = list(pending)
+            batch_size = max(1, self.settings.romanization_batch_size)
+            batches = [distinct[i:i + batch_size] for i in range(0, len(distinct), batch_size)]
+            
+            batch_results = await asyncio.gather(*[
+                self._run_in_pool(_romanize_batch, batch, include_yale, include_jyutping)
+                for batch in batches
+            ])
+            
+            converted = [result for batch in batch_results for result in batch]
+            for cleaned_text, result in zip(distinct, converted):
+                # Don't memoize failures so a later call can retry them
+                if result["yale"] is not None or result["jyutping"] is not None:
+                    self._memo_set((cleaned_text, include_yale, include_jyutping), result)
+                for index in pending[cleaned_text]:
+                    results[index] = dict(result)
+                    
+        self._stats["texts"] += len(text_list)
+        return results
+    
+    async def warm_up(self) -> None:
+        """Start every pool worker so the lexicon is compiled before the first job."""
+        loop = asyncio.get_running_loop()
+        try:
+            # One task per worker, kept out of the stats so start-up cost doesn't skew latency
+            executor = self._get_executor()
+            await asyncio.gather(*[
+                loop.run_in_executor(executor, _init_worker)
+                for _ in range(max(1, self.settings.romanization_workers))
+            ])
+            logger.info("Romanization workers ready")
+        except Exception as e:
+            logger.warning(f"Romanization warm-up failed: {str(e)}")
+    
+    def shutdown(self) -> None:
+        """Stop the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get worker pool queue and latency statistics."""
+        tasks = self._stats["tasks"]
+        return {
+            **self._stats,
+            "executor": self.settings.romanization_executor,
+            "workers": self.settings.romanization_workers,
+            "avg_wait_seconds": self._stats["total_wait_seconds"] / tasks if tasks else 0.0,
+            "avg_run_seconds": self._stats["total_run_seconds"] / tasks if tasks else 0.0,
+            "memo": self.get_memo_stats()
+        }
+    
+    def get_memo_stats(self) -> Dict[str, Any]:
+        """Get romanization memo hit-ratio and eviction statistics."""
+        lookups = self._memo_stats["hits"] + self._memo_stats["misses"]
+        return {
+            **self._memo_stats,
+            "size": len(self._memo),
+            "max_size": self.settings.romanization_cache_size,
+            "hit_ratio": self._memo_stats["hits"] / lookups if lookups else 0.0
+        }
+    
+    def clear_memo(self) -> None:
+        """Clear memoized romanizations."""
+        self._memo.clear()
     
     async def romanize(
         self,
@@ -50,13 +291,29 @@ class RomanizationService:
             Dictionary with romanization results
         """
         try:
-            await self._ensure_initialized()
+            results = await self._romanize_in_pool([chinese_text], include_yale, include_jyutping)
+            return results[0]
             
+        except Exception as e:
+            logger.error(f"Error in romanization: {str(e)}")
+            return {"yale": None, "jyutping": None}
+    
+    def _romanize_text(
+        self,
+        chinese_text: str,
+        include_yale: bool,
+        include_jyutping: bool
+    ) -> Dict[str, Optional[str]]:
+        """Romanize one text synchronously; PyCantonese must be loaded."""
+        try:
             # Clean and prepare text
             cleaned_text = self._clean_text(chinese_text)
             if not cleaned_text:
                 return {"yale": None, "jyutping": None}
             
+            if self._lexicon is not None:
+                return self._romanize_with_lexicon(cleaned_text, include_yale, include_jyutping)
+            
             result = {}
             
             # Get Jyutping if requested
@@ -90,6 +347,28 @@ class RomanizationService:
             logger.error(f"Error in romanization: {str(e)}")
             return {"yale": None, "jyutping": None}
     
+    def _romanize_with_lexicon(
+        self,
+        cleaned_text: str,
+        include_yale: bool,
+        include_jyutping: bool
+    ) -> Dict[str, Optional[str]]:
+        """Romanize with the compiled lexicon; Yale is derived from the Jyutping pass."""
+        jyutping_result = self._lexicon.lookup(cleaned_text)
+        
+        result = {
+            "jyutping": self._format_jyutping(jyutping_result) if include_jyutping else None,
+            "yale": None
+        }
+        
+        if include_yale:
+            try:
+                result["yale"] = self._format_yale(self._lexicon.to_yale(jyutping_result))
+            except Exception as e:
+                logger.warning(f"Yale conversion failed: {str(e)}")
+                
+        return result
+    
     def _clean_text(self, text: str) -> str:
         """Clean text for better romanization results."""
         if not text:
@@ -155,20 +434,33 @@ class RomanizationService:
         """
         Romanize multiple texts in batch for better performance.
         
+        Texts are split into batches of ``romanization_batch_size`` and
+        converted in the romanization worker pool, so long transcripts never
+        block the event loop. Concurrent calls with identical input (e.g. two
+        jobs for the same video) share one conversion.
+        
         Args:
             text_list: List of Chinese texts to romanize
             include_yale: Whether to include Yale romanization
             include_jyutping: Whether to include Jyutping romanization
             
         Returns:
-            List of romanization results
+            List of romanization results in input order
         """
-        tasks = [
-            self.romanize(text, include_yale, include_jyutping) 
-            for text in text_list
-        ]
+        if not text_list:
+            return []
+            
+        try:
+            results = await self._flight.do(
+                (tuple(text_list), include_yale, include_jyutping),
+                lambda: self._romanize_in_pool(text_list, include_yale, include_jyutping)
+            )
+        except Exception as e:
+            logger.error(f"Error in batch romanization: {str(e)}")
+            return [{"yale": None, "jyutping": None} for _ in text_list]
         
-        return await asyncio.gather(*tasks, return_exceptions=True)
+        # Callers sharing a result each get their own dicts to modify
+        return [dict(result) for result in results]
     
     async def get_word_segmentation(self, chinese_text: str) -> List[str]:
         """
@@ -181,17 +473,7 @@ class RomanizationService:
             List of segmented words
         """
         try:
-            await self._ensure_initialized()
-            
-            cleaned_text = self._clean_text(chinese_text)
-            if not cleaned_text:
-                return []
-            
-            # Use PyCantonese word segmentation
-            words = self._pycantonese.segment(cleaned_text)
-            
-            # Extract word strings
-            word_list = [word.word for word in words if word.word.strip()]
+            word_list = await self._run_in_pool(_segment_text, chinese_text)
             
             logger.debug(f"Segmented '{chinese_text}' into {len(word_list)} words")
             return word_list
@@ -212,7 +494,59 @@ class RomanizationService:
             return test_result.get("yale") is not None or test_result.get("jyutping") is not None
         except Exception:
             return False
+    
+    
+    def _segment_text(self, chinese_text: str) -> List[str]:
+        """Segment one text synchronously; PyCantonese must be loaded."""
+        cleaned_text = self._clean_text(chinese_text)
+        if not cleaned_text:
+            return []
+        
+        if self._lexicon is not None:
+            return [word for word, _ in self._lexicon.lookup(cleaned_text)]
+        
+        # Use PyCantonese word segmentation
+        words = self._pycantonese.segment(cleaned_text)
+        return [word for word in words if word.strip()]
 
 
 # Global service instance
-romanization_service = RomanizationService()
\ No newline at end of file
+romanization_service = RomanizationService()
+
+
+# Pool worker state: one loaded service per worker process, shared by pool threads
+_worker_service: Optional[RomanizationService] = None
+_worker_lock = threading.Lock()
+
+
+def _init_worker() -> None:
+    """Pool initializer: load PyCantonese and compile the lexicon up front."""
+    global _worker_service
+    with _worker_lock:
+        if _worker_service is None:
+            service = RomanizationService()
+            service._load()
+            _worker_service = service
+
+
+def _romanize_batch(
+    text_list: List[str],
+    include_yale: bool,
+    include_jyutping: bool
+) -> Tuple[List[Dict[str, Optional[str]]], float]:
+    """Pool task: romanize a batch and report how long the work took."""
+    _init_worker()
+    start = time.perf_counter()
+    results = [
+        _worker_service._romanize_text(text, include_yale, include_jyutping)
+        for text in text_list
+    ]
+    return results, time.perf_counter() - start
+
+
+def _segment_text(chinese_text: str) -> Tuple[List[str], float]:
+    """Pool task: segment one text and report how long the work took."""
+    _init_worker()
+    start = time.perf_counter()
+    words = _worker_service._segment_text(chinese_text)
+    return words, time.perf_counter() - start
\ No newline at end of file
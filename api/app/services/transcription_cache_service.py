@@ -0,0 +1,230 @@
+"""
+Content-addressed transcription result cache.
+
+Raw provider results are stored in SQLite keyed on the SHA-256 of the
+audio, the provider, the language and the model, so re-uploading the
+same file or re-running a job with different export options skips the
+paid speech-to-text call. Entries expire after a TTL and the least
+recently used are evicted once the cache exceeds its size budget.
+"""
+
+import asyncio
+import json
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+from ..core.config import get_settings
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class TranscriptionCacheService:
+    """Persistent cache of provider transcription results."""
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.settings = get_settings()
+        self.db_path = Path(db_path or self.settings.transcription_cache_path)
+        self._initialized = False
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "errors": 0
+        }
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; one per operation so it can run in any thread."""
+        if not self._initialized:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS transcriptions (
+                    audio_hash TEXT NOT NULL,
+                    provider TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL,
+                    PRIMARY KEY (audio_hash, provider, language, model)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_transcriptions_last_used ON transcriptions (last_used_at)")
+            self._initialized = True
+            
+        return conn
+    
+    async def _run(self, func, *args):
+        """Run a blocking database operation in the default executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+    
+    async def get(
+        self,
+        audio_hash: str,
+        provider: str,
+        language: str,
+        model: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached provider result.
+        
+        Args:
+            audio_hash: SHA-256 of the audio file
+            provider: Transcription provider, e.g. "whisper"
+            language: Language code sent to the provider
+            model: Provider model name
+            
+        Returns:
+            The provider result as originally returned, or None on a miss
+        """
+        if not self.settings.transcription_cache_enabled:
+            return None
+            
+        try:
+            payload = await self._run(self._load, (audio_hash, provider, language, model))
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Transcription cache lookup failed: {str(e)}")
+            return None
+            
+        if payload is None:
+            self._stats["misses"] += 1
+            return None
+            
+        self._stats["hits"] += 1
+        logger.info(f"Transcription cache hit for {audio_hash[:12]} ({provider}/{model}/{language})")
+        return json.loads(payload)
+    
+    def _load(self, key: Tuple[str, str, str, str]) -> Optional[str]:
+        """Load an unexpired result and mark it recently used."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                """
+                SELECT result FROM transcriptions
+                WHERE audio_hash = ? AND provider = ? AND language = ? AND model = ?
+                  AND created_at >= ?
+                """,
+                (*key, now - self.settings.transcription_cache_ttl)
+            ).fetchone()
+            
+            if row is None:
+                return None
+                
+            conn.execute(
+                """
+                UPDATE transcriptions SET hits = hits + 1, last_used_at = ?
+                WHERE audio_hash = ? AND provider = ? AND language = ? AND model = ?
+                """,
+                (now, *key)
+            )
+            return row[0]
+    
+    async def set(
+        self,
+        audio_hash: str,
+        provider: str,
+        language: str,
+        model: str,
+        result: Dict[str, Any]
+    ) -> None:
+        """Cache a provider result, evicting old entries to stay within budget."""
+        if not self.settings.transcription_cache_enabled:
+            return
+            
+        try:
+            payload = json.dumps(result, ensure_ascii=False)
+            evicted = await self._run(self._store, (audio_hash, provider, language, model), payload)
+            self._stats["writes"] += 1
+            self._stats["evictions"] += evicted
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Transcription cache write failed: {str(e)}")
+    
+    def _store(self, key: Tuple[str, str, str, str], payload: str) -> int:
+        """Store a result and return how many entries were evicted."""
+        now = time.time()
+        size = len(payload.encode("utf-8"))
+        
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """
+                INSERT INTO transcriptions
+                    (audio_hash, provider, language, model, result, size, created_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (audio_hash, provider, language, model)
+                DO UPDATE SET result = excluded.result, size = excluded.size,
+                              created_at = excluded.created_at, last_used_at = excluded.last_used_at
+                """,
+                (*key, payload, size, now, now)
+            )
+            return self._evict(conn, now)
+    
+    def _evict(self, conn: sqlite3.Connection, now: float) -> int:
+        """Drop expired entries, then least recently used ones until under the size budget."""
+        evicted = conn.execute(
+            "DELETE FROM transcriptions WHERE created_at < ?",
+            (now - self.settings.transcription_cache_ttl,)
+        ).rowcount
+        
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcriptions").fetchone()[0]
+        excess = total - self.settings.transcription_cache_max_bytes
+        if excess <= 0:
+            return evicted
+            
+        doomed: List[Tuple[str, str, str, str]] = []
+        for audio_hash, provider, language, model, size in conn.execute(
+            "SELECT audio_hash, provider, language, model, size FROM transcriptions ORDER BY last_used_at"
+        ):
+            if excess <= 0:
+                break
+            doomed.append((audio_hash, provider, language, model))
+            excess -= size
+            
+        conn.executemany(
+            "DELETE FROM transcriptions WHERE audio_hash = ? AND provider = ? AND language = ? AND model = ?",
+            doomed
+        )
+        return evicted + len(doomed)
+    
+    async def clear(self) -> None:
+        """Remove every cached result."""
+        await self._run(self._clear)
+    
+    def _clear(self) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM transcriptions")
+    
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit-ratio statistics."""
+        entries, size = await self._run(self._size)
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.settings.transcription_cache_max_bytes,
+            "hit_ratio": self._stats["hits"] / lookups if lookups else 0.0
+        }
+    
+    def _size(self) -> Tuple[int, int]:
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcriptions"
+            ).fetchone()
+
+
+# Global service instance
+transcription_cache_service = TranscriptionCacheService()
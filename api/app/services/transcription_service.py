@@ -6,7 +6,7 @@ import asyncio
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 import json
 
@@ -17,15 +17,21 @@ from ..schemas.transcription import (
 from ..schemas.usage import UsageType
 from ..services.audio_service import audio_service
 from ..services.whisper_service import whisper_service
+from ..services.chunked_transcription_service import chunked_transcription_service
 from ..services.romanization_service import romanization_service
 from ..services.translation_service import translation_service
 from ..services.export_service import export_service
 from ..services.usage_service import usage_service
 from ..core.storage import file_manager
+from ..core.config import get_settings
 from ..core.logging import get_logger
 from ..core.exceptions import ProcessingError
 from ..services.progress_service import progress_service
 from ..services.unified_transcription_service import unified_transcription_service
+from ..services.job_queue_service import job_queue_service
+from ..services.transcription_cache_service import transcription_cache_service
+from ..services.job_stage_service import job_stage_service, StageRun
+from ..services.youtube_cache_service import youtube_cache_service
 
 logger = get_logger(__name__)
 
@@ -34,7 +40,7 @@ class TranscriptionService:
     """Main transcription service that coordinates the entire pipeline."""
     
     def __init__(self):
-        self.jobs: Dict[str, TranscriptionJob] = {}
+        # Jobs are stored in the durable job queue; this only tracks tasks running in this process
         self.active_jobs: Dict[str, asyncio.Task] = {}
     
     async def create_job(
@@ -44,7 +50,9 @@ class TranscriptionService:
         youtube_url: Optional[str] = None,
         options: Optional[TranscriptionOptions] = None,
         estimated_credits: Optional[int] = None,
-        estimated_cost: Optional[float] = None
+        estimated_cost: Optional[float] = None,
+        parent_job_id: Optional[str] = None,
+        estimated_duration: Optional[float] = None
     ) -> TranscriptionJob:
         """Create a new transcription job."""
         job_id = str(uuid.uuid4())
@@ -59,10 +67,12 @@ class TranscriptionService:
             file_id=file_id,
             youtube_url=youtube_url,
             options=options,
-            created_at=datetime.utcnow().isoformat()
+            created_at=datetime.utcnow().isoformat(),
+            parent_job_id=parent_job_id,
+            duration=estimated_duration
         )
         
-        self.jobs[job_id] = job
+        await job_queue_service.create(job)
         
         # Initialize progress tracking
         await progress_service.create_job_progress(job_id, user_id)
@@ -70,9 +80,56 @@ class TranscriptionService:
         logger.info(f"Created transcription job: {job_id}")
         return job
     
+    async def rerun_job(
+        self,
+        job_id: str,
+        user_id: str,
+        options: TranscriptionOptions
+    ) -> Optional[TranscriptionJob]:
+        """
+        Create and queue a re-run of a completed job with different options.
+        
+        The re-run reuses every stage of the original whose inputs are
+        unchanged and that is still stored, so new romanization or translation
+        options only recompute those stages. Stages that have expired are
+        recomputed, and a transcript computed again is charged as usual.
+        
+        Returns:
+            The new job, or None if the original is not a completed job of the user
+        """
+        parent = await self.get_job_status(job_id, user_id)
+        if not parent or parent.status != JobStatus.COMPLETED:
+            return None
+            
+        job = await self.create_job(
+            user_id=user_id,
+            file_id=parent.file_id,
+            youtube_url=parent.youtube_url,
+            options=options,
+            parent_job_id=parent.job_id
+        )
+        await self.submit_job(job.job_id)
+        
+        logger.info(f"Re-running job {parent.job_id} as {job.job_id} with new options")
+        return job
+    
+    def _transcript_key(self, job: TranscriptionJob) -> str:
+        """Dependency key of a job's transcript stage."""
+        source_key = job_stage_service.dependency_key(job.file_id, job.youtube_url)
+        return job_stage_service.dependency_key(source_key, "whisper", "zh", whisper_service.model)
+    
+    async def has_stored_transcript(self, job: TranscriptionJob) -> bool:
+        """Whether a job's transcript is stored, so a re-run of it is not charged."""
+        return await job_stage_service.get(job.job_id, "transcript", self._transcript_key(job)) is not None
+    
+    async def submit_job(self, job_id: str) -> None:
+        """Queue a created job for processing by the worker pool."""
+        await job_queue_service.enqueue(job_id)
+        logger.info(f"Queued transcription job: {job_id}")
+    
     async def process_job(self, job_id: str, user_id: Optional[UUID] = None) -> None:
         """Process a transcription job through the complete pipeline with usage tracking."""
-        job = self.jobs.get(job_id)
+        job = await job_queue_service.get(job_id)
         if not job:
             logger.error(f"Job not found: {job_id}")
             return
@@ -91,48 +148,117 @@ class TranscriptionService:
             job.status = JobStatus.PROCESSING
             job.started_at = datetime.utcnow().isoformat()
             job.progress = 0.1
+            await job_queue_service.save(job)
             
             logger.info(f"Starting transcription job: {job_id}")
             
-            # Step 1: Get audio file
-            audio_path = await self._get_audio_file(job)
+            # Stage outputs are reused from an earlier attempt of this job, or from the
+            # job it re-runs, whenever the inputs they were computed from are unchanged
+            stages = job_stage_service.for_job(job_id, job.parent_job_id)
+            source_key = job_stage_service.dependency_key(job.file_id, job.youtube_url)
+            audio_path: Optional[Path] = None
+            
+            # Step 1: Get audio file (only once a stage below has to be recomputed)
+            async def get_audio_path() -> Path:
+                nonlocal audio_path
+                if audio_path is None:
+                    audio_path = await self._get_audio_file(job)
+                return audio_path
             job.progress = 0.2
             
             # Step 2: Extract audio metadata and get actual duration
-            metadata = await audio_service.get_audio_metadata(audio_path)
+            async def probe() -> Dict[str, Any]:
+                if job.youtube_url:
+                    # Known from the video's metadata, so nothing is downloaded yet
+                    try:
+                        video = await youtube_cache_service.get_metadata(job.youtube_url)
+                        if video["duration"] and not video["is_live"]:
+                            return video
+                    except ProcessingError as e:
+                        logger.warning(f"Job {job_id}: metadata probe failed, probing the download: {str(e)}")
+                return await audio_service.get_audio_metadata(await get_audio_path())
+            
+            metadata = await stages("probe", source_key, probe)
             actual_duration = metadata.get("duration", 0)
             job.duration = actual_duration
             job.progress = 0.3
+            await job_queue_service.save(job)
+            
+            transcript_key = self._transcript_key(job)
             
             # Step 3: Calculate actual cost and usage (now that we have real duration)
-            actual_cost = self._calculate_cost(actual_duration)
-            actual_credits = max(1, (actual_duration + 59) // 60)  # 1 credit per minute, minimum 1
+            reuses_parent_transcript = bool(job.parent_job_id) and await job_stage_service.get(
+                job.parent_job_id, "transcript", transcript_key
+            ) is not None
+            if reuses_parent_transcript:
+                # The re-run reuses the original job's transcript, which was already charged;
+                # if it expired or was never stored, transcribing again is charged as usual
+                actual_cost = 0.0
+                actual_credits = 0
+            else:
+                actual_cost = self._calculate_cost(actual_duration)
+                actual_credits = max(1, (actual_duration + 59) // 60)  # 1 credit per minute, minimum 1
+                
+                # Record actual usage (replace the initial estimate), once per job
+                # even if a crashed attempt already got this far
+                try:
+                    await self._record_job_usage(
+                        job_id, user_id, actual_duration, metadata.get("file_size", 0), actual_cost
+                    )
+                    initial_usage_recorded = True
+                    logger.info(f"Recorded actual usage for job {job_id}: {actual_credits} credits, {actual_duration}s duration")
+                except Exception as usage_error:
+                    logger.error(f"Failed to record usage for job {job_id}: {str(usage_error)}")
+                    # Continue processing even if usage recording fails
             
-            # Record actual usage (replace the initial estimate)
-            try:
-                await usage_service.record_usage(
-                    user_id=user_id,
-                    usage_type=UsageType.TRANSCRIPTION,
-                    duration_seconds=int(actual_duration),
-                    file_size_bytes=metadata.get("file_size", 0),
-                    cost=actual_cost,
-                    transcription_id=UUID(job_id)
-                )
-                initial_usage_recorded = True
-                logger.info(f"Recorded actual usage for job {job_id}: {actual_credits} credits, {actual_duration}s duration")
-            except Exception as usage_error:
-                logger.error(f"Failed to record usage for job {job_id}: {str(usage_error)}")
-                # Continue processing even if usage recording fails
+            # Step 4: Transcribe with Whisper (long files are split into concurrent chunks),
+            # reusing the provider result if this exact audio was transcribed before
+            cache_hit = False
             
-            # Step 4: Transcribe with Whisper
-            whisper_result = await whisper_service.transcribe(
-                audio_path, 
-                language="zh"
-            )
+            async def transcribe() -> Dict[str, Any]:
+                nonlocal cache_hit
+                path = await get_audio_path()
+                cache_key = await self._transcription_cache_key(path, "whisper", "zh", whisper_service.model)
+                result = await transcription_cache_service.get(*cache_key) if cache_key else None
+                cache_hit = result is not None
+                
+                if not cache_hit:
+                    if await chunked_transcription_service.should_chunk(path, actual_duration):
+                        result = await chunked_transcription_service.transcribe(
+                            path,
+                            language="zh",
+                            provider="whisper"
+                        )
+                    else:
+                        result = await whisper_service.transcribe(
+                            path, 
+                            language="zh"
+                        )
+                        
+                    if cache_key:
+                        await transcription_cache_service.set(*cache_key, result)
+                        
+                return {"provider_result": result, "audio_hash": cache_key[0] if cache_key else None}
+            
+            transcript = await stages("transcript", transcript_key, transcribe)
+            whisper_result = transcript["provider_result"]
+            
+            if reuses_parent_transcript and "transcript" not in stages.reused:
+                # The parent's transcript expired since the check above
+                actual_cost = self._calculate_cost(actual_duration)
+                actual_credits = max(1, (actual_duration + 59) // 60)
+                try:
+                    await self._record_job_usage(
+                        job_id, user_id, actual_duration, metadata.get("file_size", 0), actual_cost
+                    )
+                    initial_usage_recorded = True
+                except Exception as usage_error:
+                    logger.error(f"Failed to record usage for job {job_id}: {str(usage_error)}")
             job.progress = 0.6
+            await job_queue_service.save(job)
             
             # Step 5: Process transcription segments
-            segments = await self._process_segments(whisper_result, job.options)
+            segments = await self._process_segments(whisper_result, job.options, stages, transcript_key)
             job.progress = 0.9
             
             # Step 6: Create final result
@@ -144,7 +270,12 @@ class TranscriptionService:
                     "segments_count": len(segments),
                     "processing_time": self._calculate_processing_time(job),
                     "actual_cost": actual_cost,
-                    "actual_credits": actual_credits
+                    "actual_credits": actual_credits,
+                    "chunks": whisper_result.get("chunks", 1),
+                    "transcription_cache_hit": cache_hit,
+                    "audio_hash": transcript["audio_hash"],
+                    "parent_job_id": job.parent_job_id,
+                    "reused_stages": stages.reused
                 },
                 statistics={
                     "average_confidence": sum(s.confidence for s in segments) / len(segments) if segments else 0,
@@ -171,6 +302,7 @@ class TranscriptionService:
             
             # Save result to file
             await self._save_job_result(job)
+            await job_queue_service.save(job)
             
             logger.info(f"Completed transcription job: {job_id}, duration: {actual_duration}s, cost: ${actual_cost:.4f}")
             
@@ -179,6 +311,7 @@ class TranscriptionService:
             job.status = JobStatus.FAILED
             job.error_message = str(e)
             job.completed_at = datetime.utcnow().isoformat()
+            await job_queue_service.save(job)
             
             # Handle usage refund for failed processing
             if initial_usage_recorded:
@@ -190,9 +323,39 @@ class TranscriptionService:
                     logger.error(f"Failed to handle usage refund for job {job_id}: {str(refund_error)}")
         
         finally:
-            # Clean up active job tracking
-            if job_id in self.active_jobs:
-                del self.active_jobs[job_id]
+            # Let the shared YouTube cache evict the video once nobody uses it
+            if job.youtube_url:
+                await youtube_cache_service.release(job_id)
+    
+    async def _record_job_usage(
+        self,
+        job_id: str,
+        user_id: UUID,
+        duration: float,
+        file_size: int,
+        cost: float
+    ) -> None:
+        """
+        Charge a job's usage unless an earlier attempt of the job already did.
+        
+        A job whose worker crashed is leased again and runs from the start,
+        so the charge is marked in the stage store before it is recorded and
+        later attempts skip it.
+        """
+        usage_key = job_stage_service.dependency_key(job_id)
+        if await job_stage_service.get(job_id, "usage", usage_key) is not None:
+            logger.info(f"Usage for job {job_id} was recorded by an earlier attempt")
+            return
+            
+        await job_stage_service.put(job_id, "usage", usage_key, {"duration": int(duration), "cost": cost})
+        await usage_service.record_usage(
+            user_id=user_id,
+            usage_type=UsageType.TRANSCRIPTION,
+            duration_seconds=int(duration),
+            file_size_bytes=file_size,
+            cost=cost,
+            transcription_id=UUID(job_id)
+        )
     
     async def _get_audio_file(self, job: TranscriptionJob) -> Path:
         """Get audio file for processing."""
@@ -204,22 +367,47 @@ class TranscriptionService:
             return file_path
         
         elif job.youtube_url:
-            # Download from YouTube
-            audio_path = await audio_service.download_youtube_audio(
-                job.youtube_url, 
-                job.user_id
-            )
-            return audio_path
+            # Download from YouTube, or reuse the copy another job already fetched;
+            # the job holds a reference to it until it finishes
+            return await youtube_cache_service.acquire(job.youtube_url, holder=job.job_id)
         
         else:
             raise ProcessingError("No input source specified")
     
+    async def _transcription_cache_key(
+        self,
+        audio_path: Path,
+        provider: str,
+        language: str,
+        model: str
+    ) -> Optional[Tuple[str, str, str, str]]:
+        """Key the transcription cache on the audio content; None if caching is off or hashing fails."""
+        if not get_settings().transcription_cache_enabled:
+            return None
+            
+        try:
+            audio_hash = await audio_service.hash_file(audio_path)
+        except Exception as e:
+            logger.warning(f"Could not hash {audio_path.name} for the transcription cache: {str(e)}")
+            return None
+            
+        return (audio_hash, provider, language, model)
+    
     async def _process_segments(
         self, 
         whisper_result: Dict[str, Any], 
-        options: TranscriptionOptions
+        options: TranscriptionOptions,
+        stages: StageRun,
+        transcript_key: str
     ) -> List[TranscriptionItem]:
-        """Process Whisper transcription segments."""
+        """
+        Process Whisper transcription segments.
+        
+        Romanization and translation run as batched stages over all segment
+        texts instead of one awaited call per segment. Each depends only on
+        the transcript and its own options, so a re-run that changes one of
+        them reuses the other.
+        """
         segments = []
         
         for i, segment in enumerate(whisper_result.get("segments", [])):
@@ -230,36 +418,60 @@ class TranscriptionService:
                 continue
             
             # Initialize segment
-            item = TranscriptionItem(
+            segments.append(TranscriptionItem(
                 id=i,
                 start_time=segment["start"],
                 end_time=segment["end"],
                 chinese=chinese_text,
                 confidence=segment.get("avg_logprob", 0.0)
-            )
-            
-            # Add romanization if requested
-            if options.include_yale or options.include_jyutping:
-                romanization = await romanization_service.romanize(
-                    chinese_text,
+            ))
+        
+        texts = [item.chinese for item in segments]
+        
+        romanization_task = None
+        if options.include_yale or options.include_jyutping:
+            romanization_task = stages(
+                "romanization",
+                job_stage_service.dependency_key(transcript_key, options.include_yale, options.include_jyutping),
+                lambda: romanization_service.batch_romanize(
+                    texts,
                     include_yale=options.include_yale,
                     include_jyutping=options.include_jyutping
                 )
+            )
+        
+        translation_task = None
+        if options.include_english:
+            translation_task = stages(
+                "translation",
+                job_stage_service.dependency_key(transcript_key, "en"),
+                lambda: translation_service.batch_translate(texts, target_language="en")
+            )
+        
+        # Romanization is CPU work in an executor, translation waits on the network
+        romanizations, translations = await asyncio.gather(
+            romanization_task or self._empty_stage(),
+            translation_task or self._empty_stage()
+        )
+        
+        # Add romanization if requested
+        if romanization_task is not None:
+            for item, romanization in zip(segments, romanizations):
                 item.yale = romanization.get("yale") if options.include_yale else None
                 item.jyutping = romanization.get("jyutping") if options.include_jyutping else None
-            
-            # Add translation if requested
-            if options.include_english:
-                translation = await translation_service.translate(
-                    chinese_text, 
-                    target_language="en"
-                )
+        
+        # Add translation if requested
+        if translation_task is not None:
+            for item, translation in zip(segments, translations):
                 item.english = translation
-            
-            segments.append(item)
         
         return segments
     
+    @staticmethod
+    async def _empty_stage() -> list:
+        """Placeholder for a post-processing stage that was not requested."""
+        return []
+    
     def _calculate_processing_time(self, job: TranscriptionJob) -> float:
         """Calculate processing time in seconds."""
         if job.started_at and job.completed_at:
@@ -270,7 +482,6 @@ class TranscriptionService:
     
     def _calculate_cost(self, duration_seconds: float) -> float:
         """Calculate processing cost based on duration."""
-        from core.config import get_settings
         settings = get_settings()
         
         duration_minutes = duration_seconds / 60
@@ -300,7 +511,7 @@ class TranscriptionService:
     
     async def get_job_status(self, job_id: str, user_id: str) -> Optional[TranscriptionJob]:
         """Get job status and results."""
-        job = self.jobs.get(job_id)
+        job = await job_queue_service.get(job_id)
         
         if not job or job.user_id != user_id:
             return None
@@ -314,19 +525,20 @@ class TranscriptionService:
         offset: int = 0
     ) -> List[TranscriptionJob]:
         """List user's transcription jobs."""
-        user_jobs = [
-            job for job in self.jobs.values() 
-            if job.user_id == user_id
-        ]
-        
-        # Sort by creation time (newest first)
-        user_jobs.sort(key=lambda x: x.created_at, reverse=True)
-        
-        return user_jobs[offset:offset + limit]
+        # Sorted by creation time (newest first)
+        return await job_queue_service.list_for_user(user_id, limit=limit, offset=offset)
+    
+    def track_job(self, job_id: str, task: asyncio.Task) -> None:
+        """Register the task a worker in this process runs a job in, so cancel_job can stop it."""
+        self.active_jobs[job_id] = task
+    
+    def untrack_job(self, job_id: str) -> None:
+        """Forget a job's task once its worker is done with it."""
+        self.active_jobs.pop(job_id, None)
     
     async def cancel_job(self, job_id: str, user_id: str) -> bool:
         """Cancel a transcription job."""
-        job = self.jobs.get(job_id)
+        job = await job_queue_service.get(job_id)
         
         if not job or job.user_id != user_id:
             return False
@@ -334,15 +546,17 @@ class TranscriptionService:
         if job.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED]:
             return False
         
-        # Cancel active task if running
-        if job_id in self.active_jobs:
-            task = self.active_jobs[job_id]
-            task.cancel()
-            del self.active_jobs[job_id]
-        
         job.status = JobStatus.CANCELLED
         job.completed_at = datetime.utcnow().isoformat()
         
+        # Workers in other processes notice the cancellation on their next heartbeat
+        await job_queue_service.save(job)
+        
+        # A worker in this process is stopped at once
+        task = self.active_jobs.pop(job_id, None)
+        if task is not None:
+            task.cancel()
+        
         logger.info(f"Cancelled transcription job: {job_id}")
         return True
     
@@ -415,13 +629,24 @@ class TranscriptionService:
                 }
                 
             elif youtube_url:
-                # For YouTube URLs, we need to estimate before downloading
-                # This is a rough estimation - actual size/duration will be known after download
+                # Read duration and audio size from the video's metadata, without downloading
+                try:
+                    metadata = await youtube_cache_service.get_metadata(youtube_url)
+                    file_size = metadata["file_size"]
+                    estimated_duration = metadata["duration"]
+                except Exception as e:
+                    logger.warning(f"Could not probe YouTube metadata for {youtube_url}: {str(e)}")
+                    metadata = {}
+                    file_size = 0
+                    estimated_duration = 0
+                    
                 return {
-                    "file_size": 50 * 1024 * 1024,  # Estimate 50MB average
-                    "estimated_duration": 600,  # Estimate 10 minutes average
+                    "file_size": file_size or 50 * 1024 * 1024,  # Estimate 50MB average
+                    "estimated_duration": estimated_duration or 600,  # Estimate 10 minutes average
                     "file_type": "youtube",
-                    "youtube_url": youtube_url
+                    "youtube_url": youtube_url,
+                    "title": metadata.get("title"),
+                    "is_estimate": not estimated_duration
                 }
             
             else:
@@ -0,0 +1,308 @@
+"""
+Two-tier translation cache.
+
+A bounded in-memory LRU tier with a TTL sits in front of a persistent
+SQLite tier shared by every process on the host, so translations survive
+restarts and deploys. Entries are keyed on the normalized source text and
+the language pair.
+"""
+
+import asyncio
+import re
+import sqlite3
+import time
+import unicodedata
+from collections import OrderedDict, Counter
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+from ..core.config import get_settings
+from ..core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class TranslationCacheService:
+    """LRU/TTL memory cache backed by a persistent SQLite table."""
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.settings = get_settings()
+        self.db_path = Path(db_path or self.settings.translation_cache_path)
+        self._memory: "OrderedDict[Tuple[str, str, str], Tuple[str, float]]" = OrderedDict()
+        self._pending_hits: Counter = Counter()
+        self._initialized = False
+        self._stats = {
+            "memory_hits": 0,
+            "persistent_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "writes": 0,
+            "expired": 0
+        }
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize text so trivially different spellings share an entry."""
+        return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; one per operation so it can run in any thread."""
+        if not self._initialized:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS translations (
+                    source_language TEXT NOT NULL,
+                    target_language TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    translation TEXT NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (source_language, target_language, text)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_hits ON translations (hits DESC)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_created ON translations (created_at)")
+            self._initialized = True
+            
+        return conn
+    
+    async def _run(self, func, *args):
+        """Run a blocking database operation in the default executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+    
+    def _memory_get(self, key: Tuple[str, str, str]) -> Optional[str]:
+        """Look up a key in the memory tier, dropping it if expired."""
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+            
+        translation, stored_at = entry
+        if time.time() - stored_at > self.settings.translation_cache_ttl:
+            del self._memory[key]
+            return None
+            
+        self._memory.move_to_end(key)
+        return translation
+    
+    def _memory_set(self, key: Tuple[str, str, str], translation: str, stored_at: Optional[float] = None) -> None:
+        """Store a key in the memory tier, evicting least recently used entries."""
+        self._memory[key] = (translation, stored_at or time.time())
+        self._memory.move_to_end(key)
+        
+        while len(self._memory) > self.settings.translation_cache_size:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+    
+    async def get(self, text: str, source_language: str, target_language: str) -> Optional[str]:
+        """Get a cached translation for one text."""
+        found = await self.get_many([text], source_language, target_language)
+        return found.get(text)
+    
+    async def get_many(
+        self,
+        texts: List[str],
+        source_language: str,
+        target_language: str
+    ) -> Dict[str, str]:
+        """
+        Look up cached translations for several texts.
+        
+        Args:
+            texts: Source texts as given by the caller
+            source_language: Source language code
+            target_language: Target language code
+            
+        Returns:
+            Mapping of the caller's texts to translations, for cache hits only
+        """
+        found: Dict[str, str] = {}
+        missing: Dict[str, List[str]] = {}
+        
+        for text in texts:
+            normalized = self.normalize(text)
+            translation = self._memory_get((source_language, target_language, normalized))
+            if translation is not None:
+                found[text] = translation
+                self._pending_hits[(source_language, target_language, normalized)] += 1
+                self._stats["memory_hits"] += 1
+            else:
+                missing.setdefault(normalized, []).append(text)
+                
+        if missing:
+            try:
+                rows = await self._run(self._load, list(missing), source_language, target_language)
+            except Exception as e:
+                logger.warning(f"Persistent translation cache lookup failed: {str(e)}")
+                rows = {}
+                
+            for normalized, originals in missing.items():
+                if normalized in rows:
+                    translation, created_at = rows[normalized]
+                    self._memory_set((source_language, target_language, normalized), translation, created_at)
+                    for text in originals:
+                        found[text] = translation
+                    self._stats["persistent_hits"] += len(originals)
+                else:
+                    self._stats["misses"] += len(originals)
+                    
+        if sum(self._pending_hits.values()) >= 100:
+            await self.flush()
+            
+        return found
+    
+    def _load(self, texts: List[str], source_language: str, target_language: str) -> Dict[str, Tuple[str, float]]:
+        """Load unexpired rows for the given normalized texts and count the hits."""
+        cutoff = time.time() - self.settings.translation_cache_ttl
+        rows: Dict[str, Tuple[str, float]] = {}
+        
+        with closing(self._connect()) as conn:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(texts), 500):
+                batch = texts[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                for text, translation, created_at in conn.execute(
+                    f"""
+                    SELECT text, translation, created_at FROM translations
+                    WHERE source_language = ? AND target_language = ?
+                      AND created_at >= ? AND text IN ({placeholders})
+                    """,
+                    (source_language, target_language, cutoff, *batch)
+                ):
+                    rows[text] = (translation, created_at)
+                    
+            if rows:
+                conn.executemany(
+                    "UPDATE translations SET hits = hits + 1 WHERE source_language = ? AND target_language = ? AND text = ?",
+                    [(source_language, target_language, text) for text in rows]
+                )
+                
+        return rows
+    
+    async def set(self, text: str, translation: str, source_language: str, target_language: str) -> None:
+        """Cache a translation for one text."""
+        await self.set_many({text: translation}, source_language, target_language)
+    
+    async def set_many(self, translations: Dict[str, str], source_language: str, target_language: str) -> None:
+        """Cache translations in both tiers."""
+        now = time.time()
+        rows = []
+        for text, translation in translations.items():
+            normalized = self.normalize(text)
+            self._memory_set((source_language, target_language, normalized), translation, now)
+            rows.append((source_language, target_language, normalized, translation, now))
+            
+        if not rows:
+            return
+            
+        try:
+            self._stats["expired"] += await self._run(self._store, rows)
+            self._stats["writes"] += len(rows)
+        except Exception as e:
+            logger.warning(f"Persistent translation cache write failed: {str(e)}")
+    
+    def _store(self, rows: List[Tuple[str, str, str, str, float]]) -> int:
+        """Store translations and drop expired ones; returns how many expired."""
+        with closing(self._connect()) as conn:
+            conn.executemany(
+                """
+                INSERT INTO translations (source_language, target_language, text, translation, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (source_language, target_language, text)
+                DO UPDATE SET translation = excluded.translation, created_at = excluded.created_at
+                """,
+                rows
+            )
+            return conn.execute(
+                "DELETE FROM translations WHERE created_at < ?",
+                (time.time() - self.settings.translation_cache_ttl,)
+            ).rowcount
+    
+    async def flush(self) -> None:
+        """Persist hit counts from the memory tier so warm-up sees real frequencies."""
+        if not self._pending_hits:
+            return
+            
+        pending, self._pending_hits = self._pending_hits, Counter()
+        try:
+            await self._run(self._store_hits, list(pending.items()))
+        except Exception as e:
+            logger.debug(f"Could not persist translation cache hits: {str(e)}")
+    
+    def _store_hits(self, hits: List[Tuple[Tuple[str, str, str], int]]) -> None:
+        with closing(self._connect()) as conn:
+            conn.executemany(
+                "UPDATE translations SET hits = hits + ? WHERE source_language = ? AND target_language = ? AND text = ?",
+                [(count, *key) for key, count in hits]
+            )
+    
+    async def warm_up(self, limit: Optional[int] = None) -> int:
+        """
+        Load the most frequently used translations into memory.
+        
+        Args:
+            limit: Number of entries to load, defaults to translation_cache_warm_up
+            
+        Returns:
+            Number of entries loaded
+        """
+        limit = min(limit or self.settings.translation_cache_warm_up, self.settings.translation_cache_size)
+        if limit <= 0:
+            return 0
+            
+        try:
+            rows = await self._run(self._load_frequent, limit)
+        except Exception as e:
+            logger.warning(f"Translation cache warm-up failed: {str(e)}")
+            return 0
+            
+        # Least frequent first so the most frequent end up most recently used
+        for source_language, target_language, text, translation, created_at in reversed(rows):
+            self._memory_set((source_language, target_language, text), translation, created_at)
+            
+        logger.info(f"Translation cache warmed with {len(rows)} entries")
+        return len(rows)
+    
+    def _load_frequent(self, limit: int) -> List[Tuple[str, str, str, str, float]]:
+        cutoff = time.time() - self.settings.translation_cache_ttl
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                """
+                SELECT source_language, target_language, text, translation, created_at
+                FROM translations WHERE created_at >= ?
+                ORDER BY hits DESC LIMIT ?
+                """,
+                (cutoff, limit)
+            ).fetchall()
+    
+    async def clear(self) -> None:
+        """Clear both cache tiers."""
+        self._memory.clear()
+        self._pending_hits.clear()
+        await self._run(self._clear)
+    
+    def _clear(self) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM translations")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit-ratio statistics."""
+        hits = self._stats["memory_hits"] + self._stats["persistent_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "size": len(self._memory),
+            "max_size": self.settings.translation_cache_size,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "memory_hit_ratio": self._stats["memory_hits"] / lookups if lookups else 0.0
+        }
+
+
+# Global service instance
+translation_cache_service = TranslationCacheService()
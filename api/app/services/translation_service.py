@@ -10,6 +10,9 @@ import urllib.parse
 from ..core.config import get_settings
 from ..core.logging import get_logger
 from ..core.exceptions import ExternalAPIError, ProcessingError
+from ..core.single_flight import SingleFlight
+from ..services.http_client_service import http_client_service
+from ..services.translation_cache_service import translation_cache_service
 
 logger = get_logger(__name__)
 
@@ -20,7 +23,12 @@ class TranslationService:
     def __init__(self):
         self.settings = get_settings()
         self.api_url = "https://translation.googleapis.com/language/translate/v2"
-        self._translation_cache = {}
+        # Shared by translate and batch_translate so identical texts are requested once
+        self._flight = SingleFlight("translation")
+    
+    def _flight_key(self, text: str, source_language: str, target_language: str) -> tuple:
+        """Key identifying a translation request for coalescing."""
+        return (source_language, target_language, translation_cache_service.normalize(text))
     
     async def translate(
         self,
@@ -44,55 +52,42 @@ class TranslationService:
                 return None
             
             # Check cache first
-            cache_key = f"{source_language}:{target_language}:{text}"
-            if cache_key in self._translation_cache:
-                return self._translation_cache[cache_key]
+            cached = await translation_cache_service.get(text, source_language, target_language)
+            if cached is not None:
+                return cached
             
             if not self.settings.google_translate_api_key:
                 logger.warning("Google Translate API key not configured")
                 return None
             
-            # Prepare API request
-            params = {
-                "q": text,
-                "target": target_language,
-                "source": source_language,
-                "key": self.settings.google_translate_api_key,
-                "format": "text"
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.api_url,
-                    data=params,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"Google Translate API error {response.status}: {error_text}")
-                        return None
-                    
-                    result = await response.json()
-            
-            # Extract translation
-            translations = result.get("data", {}).get("translations", [])
-            if not translations:
-                logger.warning(f"No translation returned for: {text}")
-                return None
-            
-            translated_text = translations[0].get("translatedText", "")
-            
-            # Cache the result
-            self._translation_cache[cache_key] = translated_text
-            
-            logger.debug(f"Translated '{text}' -> '{translated_text}'")
-            return translated_text
+            # Concurrent callers for the same text share one API request
+            return await self._flight.do(
+                self._flight_key(text, source_language, target_language),
+                lambda: self._translate_uncached(text, target_language, source_language)
+            )
             
         except Exception as e:
             logger.error(f"Error in translation: {str(e)}")
             return None
     
+    async def _translate_uncached(
+        self,
+        text: str,
+        target_language: str,
+        source_language: str
+    ) -> Optional[str]:
+        """Request a translation from the API and cache it."""
+        translated_text = (await self._request_batch([text], target_language, source_language))[0]
+        if translated_text is None:
+            logger.warning(f"No translation returned for: {text}")
+            return None
+        
+        # Cache the result
+        await translation_cache_service.set(text, translated_text, source_language, target_language)
+        
+        logger.debug(f"Translated '{text}' -> '{translated_text}'")
+        return translated_text
+    
     async def batch_translate(
         self,
         texts: List[str],
@@ -102,13 +97,18 @@ class TranslationService:
         """
         Translate multiple texts in batch for better performance.
         
+        Uncached texts are sent as repeated ``q`` fields, split into requests
+        within the API's per-request segment and character limits. Requests
+        run concurrently up to ``translation_max_concurrent_batches``.
+        
         Args:
             texts: List of texts to translate
             target_language: Target language code
             source_language: Source language code
             
         Returns:
-            List of translated texts (same order as input)
+            List of translated texts (same order as input), None where
+            translation failed
         """
         try:
             if not texts:
@@ -118,66 +118,149 @@ class TranslationService:
                 logger.warning("Google Translate API key not configured")
                 return [None] * len(texts)
             
-            # Filter out empty texts and prepare for batch request
-            text_mapping = {}
-            texts_to_translate = []
+            results: List[Optional[str]] = [None] * len(texts)
+            
+            cached = await translation_cache_service.get_many(
+                [text for text in texts if text and text.strip()],
+                source_language,
+                target_language
+            )
+            
+            # Indices of every occurrence of each uncached text, so duplicates are sent once
+            pending: Dict[str, List[int]] = {}
             
             for i, text in enumerate(texts):
                 if text and text.strip():
-                    cache_key = f"{source_language}:{target_language}:{text}"
-                    if cache_key in self._translation_cache:
-                        text_mapping[i] = self._translation_cache[cache_key]
+                    if text in cached:
+                        results[i] = cached[text]
                     else:
-                        texts_to_translate.append((i, text))
-            
-            # Translate remaining texts
-            if texts_to_translate:
-                # Prepare batch request
-                params = {
-                    "target": target_language,
-                    "source": source_language,
-                    "key": self.settings.google_translate_api_key,
-                    "format": "text"
-                }
-                
-                # Add all texts as 'q' parameters
-                for _, text in texts_to_translate:
-                    params[f"q"] = text
+                        pending.setdefault(text, []).append(i)
+            
+            # Texts another caller is already requesting are awaited instead of sent again
+            joined: Dict[str, asyncio.Future] = {}
+            owned: List[str] = []
+            for text in pending:
+                future = self._flight.join(self._flight_key(text, source_language, target_language))
+                if future is not None:
+                    joined[text] = future
+                else:
+                    self._flight.start(self._flight_key(text, source_language, target_language))
+                    owned.append(text)
+            
+            translated_texts: Dict[str, str] = {}
+            
+            if owned:
+                chunks = self._chunk_texts(owned)
+                semaphore = asyncio.Semaphore(max(1, self.settings.translation_max_concurrent_batches))
                 
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        self.api_url,
-                        data=params,
-                        timeout=aiohttp.ClientTimeout(total=60)
-                    ) as response:
+                async def translate_chunk(chunk: List[str]) -> None:
+                    async with semaphore:
+                        translations = await self._request_batch(chunk, target_language, source_language)
                         
-                        if response.status == 200:
-                            result = await response.json()
-                            translations = result.get("data", {}).get("translations", [])
-                            
-                            # Map translations back to original indices
-                            for j, (i, original_text) in enumerate(texts_to_translate):
-                                if j < len(translations):
-                                    translated = translations[j].get("translatedText", "")
-                                    text_mapping[i] = translated
-                                    
-                                    # Cache the result
-                                    cache_key = f"{source_language}:{target_language}:{original_text}"
-                                    self._translation_cache[cache_key] = translated
-                        else:
-                            logger.error(f"Batch translation failed: {response.status}")
-            
-            # Build final result list
-            result = []
-            for i, text in enumerate(texts):
-                result.append(text_mapping.get(i))
+                    for text, translated in zip(chunk, translations):
+                        if translated is not None:
+                            translated_texts[text] = translated
+                
+                try:
+                    await asyncio.gather(*[translate_chunk(chunk) for chunk in chunks])
+                    await translation_cache_service.set_many(translated_texts, source_language, target_language)
+                finally:
+                    # Release waiters even if this call failed or was cancelled
+                    for text in owned:
+                        self._flight.finish(
+                            self._flight_key(text, source_language, target_language),
+                            result=translated_texts.get(text)
+                        )
+                
+                logger.debug(f"Batch translated {len(owned)} unique texts in {len(chunks)} requests")
+            
+            for text, future in joined.items():
+                try:
+                    translated = await self._flight.wait(future)
+                except asyncio.CancelledError:
+                    if not future.cancelled():
+                        raise
+                    translated = None
+                except Exception:
+                    translated = None
+                if translated is not None:
+                    translated_texts[text] = translated
             
-            return result
+            for text, translated in translated_texts.items():
+                for i in pending[text]:
+                    results[i] = translated
+            
+            return results
             
         except Exception as e:
             logger.error(f"Error in batch translation: {str(e)}")
             return [None] * len(texts)
     
+    def _chunk_texts(self, texts: List[str]) -> List[List[str]]:
+        """Split texts into request-sized chunks by segment count and characters."""
+        max_segments = self.settings.translation_max_segments_per_request
+        max_chars = self.settings.translation_max_chars_per_request
+        
+        chunks: List[List[str]] = []
+        current: List[str] = []
+        current_chars = 0
+        
+        for text in texts:
+            if current and (len(current) >= max_segments or current_chars + len(text) > max_chars):
+                chunks.append(current)
+                current, current_chars = [], 0
+            current.append(text)
+            current_chars += len(text)
+            
+        if current:
+            chunks.append(current)
+            
+        return chunks
+    
+    async def _request_batch(
+        self,
+        texts: List[str],
+        target_language: str,
+        source_language: str
+    ) -> List[Optional[str]]:
+        """Translate one chunk of texts in a single API request."""
+        params = [
+            ("target", target_language),
+            ("source", source_language),
+            ("key", self.settings.google_translate_api_key),
+            ("format", "text")
+        ]
+        params.extend(("q", text) for text in texts)
+        
+        try:
+            session = http_client_service.get_session("google")
+            async with session.post(
+                self.api_url,
+                data=params,
+                timeout=aiohttp.ClientTimeout(total=60)
+            ) as response:
+                
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(f"Batch translation failed {response.status}: {error_text}")
+                    return [None] * len(texts)
+                
+                result = await response.json()
+                
+        except Exception as e:
+            logger.error(f"Batch translation request failed: {str(e)}")
+            return [None] * len(texts)
+        
+        translations = result.get("data", {}).get("translations", [])
+        if len(translations) != len(texts):
+            logger.warning(f"Batch translation returned {len(translations)} results for {len(texts)} texts")
+        
+        # Translations come back in request order
+        mapped: List[Optional[str]] = [None] * len(texts)
+        for j, translation in enumerate(translations[:len(texts)]):
+            mapped[j] = translation.get("translatedText", "")
+        return mapped
+    
     async def detect_language(self, text: str) -> Optional[str]:
         """
         Detect the language of the given text.
@@ -201,17 +284,17 @@ class TranslationService:
                 "key": self.settings.google_translate_api_key
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    detect_url,
-                    data=params,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    
-                    if response.status != 200:
-                        return None
-                    
-                    result = await response.json()
+            session = http_client_service.get_session("google")
+            async with session.post(
+                detect_url,
+                data=params,
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                
+                if response.status != 200:
+                    return None
+                
+                result = await response.json()
             
             detections = result.get("data", {}).get("detections", [])
             if detections and detections[0]:
@@ -244,17 +327,17 @@ class TranslationService:
                 "target": "en"
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    languages_url,
-                    params=params,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    
-                    if response.status != 200:
-                        return []
-                    
-                    result = await response.json()
+            session = http_client_service.get_session("google")
+            async with session.get(
+                languages_url,
+                params=params,
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                
+                if response.status != 200:
+                    return []
+                
+                result = await response.json()
             
             languages = result.get("data", {}).get("languages", [])
             return languages
@@ -282,9 +365,9 @@ class TranslationService:
             logger.error(f"API key validation failed: {str(e)}")
             return False
     
-    def clear_cache(self):
+    async def clear_cache(self):
         """Clear the translation cache."""
-        self._translation_cache.clear()
+        await translation_cache_service.clear()
         logger.info("Translation cache cleared")
 
 
@@ -48,20 +48,15 @@ class UnifiedTranscriptionService:
     async def initialize(self) -> None:
         """Initialize all transcription providers."""
         try:
-            # Initialize Google Speech service
-            try:
-                await google_speech_service.initialize()
-                self._provider_status[TranscriptionProvider.GOOGLE_SPEECH] = ProviderStatus.AVAILABLE
-                logger.info("Google Speech service initialized successfully")
-            except Exception as e:
-                logger.warning(f"Failed to initialize Google Speech: {str(e)}")
-                self._provider_status[TranscriptionProvider.GOOGLE_SPEECH] = ProviderStatus.ERROR
+            # The Google Speech client is created on first use, so startup does not
+            # import its SDK; the first health check or transcription creates it
+            self._provider_status[TranscriptionProvider.GOOGLE_SPEECH] = ProviderStatus.AVAILABLE
             
             # Whisper service doesn't need explicit initialization
             self._provider_status[TranscriptionProvider.WHISPER] = ProviderStatus.AVAILABLE
             
             # Perform initial health checks
-            await self._check_provider_health()
+            await self._check_provider_health([TranscriptionProvider.WHISPER])
             
             logger.info("Unified transcription service initialized")
             
@@ -174,7 +169,7 @@ class UnifiedTranscriptionService:
             file_size = audio_file_path.stat().st_size
             
             # Get audio duration for cost estimation
-            from services.audio_service import audio_service
+            from ..services.audio_service import audio_service
             try:
                 metadata = await audio_service.get_audio_metadata(audio_file_path)
                 duration = metadata.get("duration", 0)
@@ -357,11 +352,11 @@ class UnifiedTranscriptionService:
                 'statistics': {'total_segments': 0}
             }
     
-    async def _check_provider_health(self) -> None:
-        """Check health of all providers."""
+    async def _check_provider_health(self, providers: Optional[List[str]] = None) -> None:
+        """Check health of the given providers, all by default."""
         current_time = datetime.utcnow()
         
-        for provider in [TranscriptionProvider.GOOGLE_SPEECH, TranscriptionProvider.WHISPER]:
+        for provider in providers or [TranscriptionProvider.GOOGLE_SPEECH, TranscriptionProvider.WHISPER]:
             last_check = self._last_health_check.get(provider)
             
             # Skip if recently checked
@@ -0,0 +1,482 @@
+"""
+Resumable chunked uploads.
+
+A client creates an upload session for a file of known size, sends the
+file in chunks to explicit byte offsets (in any order, several at a
+time) and completes the session once every byte has arrived. Chunks are
+written straight into a preallocated file, so completing the upload
+moves that file into place instead of copying parts together. Received
+ranges are recorded in SQLite, so a client whose connection dropped can
+ask which ranges are missing and resume from there.
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+
+import aiofiles
+
+from ..core.config import get_settings
+from ..core.exceptions import FileError
+from ..core.logging import get_logger
+from ..core.storage import file_manager
+
+logger = get_logger(__name__)
+
+
+class UploadSessionService:
+    """SQLite-backed resumable upload sessions."""
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.settings = get_settings()
+        self.db_path = Path(db_path or self.settings.upload_session_path)
+        self.parts_dir = Path(self.settings.upload_dir) / ".resumable"
+        self._initialized = False
+        # Running SHA-256 of each upload's contiguous prefix, advanced by chunks
+        # that arrive in order; completing hashes only the rest from disk. Only
+        # valid if every chunk was written by this process, see _writer
+        self._hashers: Dict[str, Tuple[Any, int]] = {}
+        self._instance = uuid.uuid4().hex
+        self._stats = {
+            "created": 0,
+            "chunks": 0,
+            "bytes_received": 0,
+            "completed": 0,
+            "aborted": 0,
+            "expired": 0,
+            "rejected": 0,
+            "bytes_rehashed": 0
+        }
+        # Idle sessions are swept with expired files, so their parts do not
+        # outlive the TTL on an instance that receives no new uploads
+        file_manager.add_cleanup_hook("upload_sessions", self._expire_idle)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; one per operation so it can run in any thread."""
+        if not self._initialized:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.parts_dir.mkdir(parents=True, exist_ok=True)
+            
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS upload_sessions (
+                    upload_id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    content_type TEXT NOT NULL,
+                    file_type TEXT NOT NULL,
+                    file_size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS upload_chunks (
+                    upload_id TEXT NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    writer TEXT
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(upload_chunks)")}
+            if "writer" not in columns:
+                conn.execute("ALTER TABLE upload_chunks ADD COLUMN writer TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_upload_sessions_updated ON upload_sessions (updated_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_upload_chunks_upload ON upload_chunks (upload_id, offset)")
+            self._initialized = True
+            
+        return conn
+    
+    @property
+    def _writer(self) -> str:
+        """Identifies this process in upload_chunks; workers forked after import differ by PID."""
+        return f"{self._instance}:{os.getpid()}"
+    
+    async def _run(self, func, *args):
+        """Run a blocking operation in the default executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+    
+    def _part_path(self, upload_id: str) -> Path:
+        return self.parts_dir / f"{upload_id}.partial"
+    
+    async def create(
+        self,
+        user_id: str,
+        filename: str,
+        content_type: str,
+        file_type: str,
+        file_size: int
+    ) -> Dict[str, Any]:
+        """
+        Start an upload session and preallocate its file.
+        
+        Args:
+            user_id: Owner of the upload
+            filename: Original file name
+            content_type: MIME type of the file
+            file_type: "audio" or "video"
+            file_size: Exact size of the file in bytes
+            
+        Returns:
+            Session status, as returned by status()
+        """
+        if file_size <= 0:
+            raise FileError("File size must be positive")
+        if file_size > self.settings.max_resumable_file_size:
+            raise FileError(f"File too large. Maximum size: {self.settings.max_resumable_file_size} bytes")
+            
+        upload_id = uuid.uuid4().hex
+        try:
+            await self._run(
+                self._create, upload_id, user_id, filename, content_type, file_type, file_size
+            )
+        except FileError:
+            self._stats["rejected"] += 1
+            raise
+        self._stats["created"] += 1
+        logger.info(f"Created upload session {upload_id} for user {user_id} ({file_size} bytes)")
+        return await self.status(upload_id, user_id)
+    
+    def _create(
+        self,
+        upload_id: str,
+        user_id: str,
+        filename: str,
+        content_type: str,
+        file_type: str,
+        file_size: int
+    ) -> None:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            self._stats["expired"] += self._expire(conn, now)
+            self._prune_hashers(conn)
+            
+            # Serializes concurrent creates by the same user against the limits
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                sessions, reserved = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(file_size), 0) FROM upload_sessions WHERE user_id = ?",
+                    (user_id,)
+                ).fetchone()
+                if sessions >= self.settings.max_upload_sessions_per_user:
+                    raise FileError(
+                        f"Too many uploads in progress. Maximum: {self.settings.max_upload_sessions_per_user}; "
+                        "complete or abort one first"
+                    )
+                if reserved + file_size > self.settings.max_upload_session_bytes_per_user:
+                    raise FileError(
+                        f"Uploads in progress would exceed {self.settings.max_upload_session_bytes_per_user} bytes; "
+                        "complete or abort one first"
+                    )
+                    
+                # Sparse on most filesystems; chunks fill it in place
+                with open(self._part_path(upload_id), "wb") as f:
+                    f.truncate(file_size)
+                    
+                conn.execute(
+                    """
+                    INSERT INTO upload_sessions
+                        (upload_id, user_id, filename, content_type, file_type, file_size, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (upload_id, user_id, filename, content_type, file_type, file_size, now, now)
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                self._part_path(upload_id).unlink(missing_ok=True)
+                raise
+    
+    def _expire(self, conn: sqlite3.Connection, now: float) -> int:
+        """Delete sessions that have not received data within the TTL."""
+        expired = conn.execute(
+            "SELECT upload_id FROM upload_sessions WHERE updated_at < ?",
+            (now - self.settings.upload_session_ttl,)
+        ).fetchall()
+        
+        for (upload_id,) in expired:
+            self._delete(conn, upload_id)
+        return len(expired)
+    
+    def _expire_idle(self, now: float) -> int:
+        """Cleanup hook deleting sessions that have not received data within the TTL."""
+        with closing(self._connect()) as conn:
+            expired = self._expire(conn, now)
+            self._prune_hashers(conn)
+        self._stats["expired"] += expired
+        return expired
+    
+    def _prune_hashers(self, conn: sqlite3.Connection) -> None:
+        """Drop hashers of sessions another process completed, aborted or expired."""
+        upload_ids = list(self._hashers)
+        if not upload_ids:
+            return
+        placeholders = ",".join("?" * len(upload_ids))
+        live = {
+            upload_id for (upload_id,) in conn.execute(
+                f"SELECT upload_id FROM upload_sessions WHERE upload_id IN ({placeholders})",
+                upload_ids
+            )
+        }
+        for upload_id in upload_ids:
+            if upload_id not in live:
+                self._hashers.pop(upload_id, None)
+    
+    def _delete(self, conn: sqlite3.Connection, upload_id: str) -> None:
+        self._part_path(upload_id).unlink(missing_ok=True)
+        self._hashers.pop(upload_id, None)
+        conn.execute("DELETE FROM upload_chunks WHERE upload_id = ?", (upload_id,))
+        conn.execute("DELETE FROM upload_sessions WHERE upload_id = ?", (upload_id,))
+    
+    def _session(self, upload_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                """
+                SELECT filename, content_type, file_type, file_size, updated_at FROM upload_sessions
+                WHERE upload_id = ? AND user_id = ? AND updated_at >= ?
+                """,
+                (upload_id, user_id, time.time() - self.settings.upload_session_ttl)
+            ).fetchone()
+            if row is None:
+                return None
+                
+            filename, content_type, file_type, file_size, updated_at = row
+            ranges = conn.execute(
+                "SELECT offset, offset + length FROM upload_chunks WHERE upload_id = ? ORDER BY offset",
+                (upload_id,)
+            ).fetchall()
+            
+        return {
+            "upload_id": upload_id,
+            "filename": filename,
+            "content_type": content_type,
+            "file_type": file_type,
+            "file_size": file_size,
+            "updated_at": updated_at,
+            "missing": self._missing(ranges, file_size)
+        }
+    
+    @staticmethod
+    def _missing(ranges: List[Tuple[int, int]], file_size: int) -> List[Tuple[int, int]]:
+        """Get the [start, end) byte ranges not covered by the received ranges."""
+        missing = []
+        covered = 0
+        for start, end in ranges:
+            if start > covered:
+                missing.append((covered, start))
+            covered = max(covered, end)
+        if covered < file_size:
+            missing.append((covered, file_size))
+        return missing
+    
+    async def status(self, upload_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the progress of an upload session.
+        
+        Returns:
+            Dictionary with upload_id, file_size, offset (bytes received
+            contiguously from the start), missing byte ranges, the
+            recommended chunk_size and expires_at; None if the session does
+            not exist, has expired or belongs to another user
+        """
+        session = await self._run(self._session, upload_id, user_id)
+        if session is None:
+            return None
+            
+        missing = session["missing"]
+        return {
+            "upload_id": upload_id,
+            "file_size": session["file_size"],
+            "offset": missing[0][0] if missing else session["file_size"],
+            "missing": [list(gap) for gap in missing],
+            "chunk_size": self.settings.resumable_chunk_size,
+            "expires_at": session["updated_at"] + self.settings.upload_session_ttl
+        }
+    
+    async def write_chunk(
+        self,
+        upload_id: str,
+        user_id: str,
+        offset: int,
+        chunks: AsyncIterator[bytes]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Write a chunk of the file at offset as it streams in.
+        
+        Whatever was written is recorded even if the stream breaks off, so
+        the client only re-sends what is missing. Chunks may overlap and
+        may be sent concurrently.
+        
+        Args:
+            upload_id: Upload session ID
+            user_id: Owner of the upload
+            offset: Byte offset of the chunk in the file
+            chunks: Request body stream
+            
+        Returns:
+            Session status after the write, or None if the session is unknown
+        """
+        session = await self._run(self._session, upload_id, user_id)
+        if session is None:
+            return None
+            
+        file_size = session["file_size"]
+        if offset < 0 or offset >= file_size:
+            raise FileError(f"Offset {offset} is outside the file (0-{file_size - 1})")
+            
+        written = 0
+        try:
+            async with aiofiles.open(self._part_path(upload_id), "r+b") as f:
+                await f.seek(offset)
+                async for piece in chunks:
+                    if not piece:
+                        continue
+                    if offset + written + len(piece) > file_size:
+                        raise FileError("Chunk extends past the declared file size")
+                    await f.write(piece)
+                    self._hash(upload_id, offset + written, piece)
+                    written += len(piece)
+        finally:
+            if written:
+                await self._run(self._record, upload_id, offset, written)
+                self._stats["chunks"] += 1
+                self._stats["bytes_received"] += written
+                
+        return await self.status(upload_id, user_id)
+    
+    def _hash(self, upload_id: str, position: int, piece: bytes) -> None:
+        """Advance the running hash if the piece continues the hashed prefix."""
+        entry = self._hashers.get(upload_id)
+        if entry is None:
+            if position != 0:
+                return
+            entry = (hashlib.sha256(), 0)
+            
+        hasher, hashed = entry
+        if position == hashed:
+            hasher.update(piece)
+            self._hashers[upload_id] = (hasher, hashed + len(piece))
+        elif position < hashed:
+            # Hashed bytes were rewritten; hash the whole file on completion instead
+            self._hashers.pop(upload_id, None)
+    
+    def _record(self, upload_id: str, offset: int, length: int) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO upload_chunks (upload_id, offset, length, writer) VALUES (?, ?, ?, ?)",
+                (upload_id, offset, length, self._writer)
+            )
+            conn.execute(
+                "UPDATE upload_sessions SET updated_at = ? WHERE upload_id = ?",
+                (time.time(), upload_id)
+            )
+    
+    async def complete(
+        self,
+        upload_id: str,
+        user_id: str,
+        sha256: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Finish an upload once every byte has been received.
+        
+        Args:
+            upload_id: Upload session ID
+            user_id: Owner of the upload
+            sha256: Optional hex digest the file must match
+            
+        Returns:
+            File metadata, as returned by FileManager.save_upload_file, or
+            None if the session is unknown
+        """
+        session = await self._run(self._session, upload_id, user_id)
+        if session is None:
+            return None
+            
+        missing = session["missing"]
+        if missing:
+            missing_bytes = sum(end - start for start, end in missing)
+            raise FileError(f"Upload incomplete: {missing_bytes} bytes in {len(missing)} ranges missing")
+            
+        part_path = self._part_path(upload_id)
+        hasher, hashed = self._hashers.pop(upload_id, (hashlib.sha256(), 0))
+        if hashed and await self._run(self._written_elsewhere, upload_id):
+            # Another process may have rewritten bytes this hasher already covered
+            hasher, hashed = hashlib.sha256(), 0
+        file_hash = await self._run(self._hash_rest, part_path, hasher, hashed)
+        self._stats["bytes_rehashed"] += session["file_size"] - hashed
+        
+        if sha256 and file_hash != sha256.lower():
+            raise FileError("Checksum mismatch; the upload is corrupt and must be sent again")
+            
+        metadata = await file_manager.adopt_upload(
+            part_path,
+            user_id,
+            session["filename"],
+            session["file_type"],
+            session["content_type"],
+            session["file_size"],
+            file_hash
+        )
+        await self._run(self._finish, upload_id)
+        self._stats["completed"] += 1
+        return metadata
+    
+    def _written_elsewhere(self, upload_id: str) -> bool:
+        """Whether any chunk of the upload was written by another process."""
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT 1 FROM upload_chunks WHERE upload_id = ? AND (writer IS NULL OR writer != ?) LIMIT 1",
+                (upload_id, self._writer)
+            ).fetchone() is not None
+    
+    def _hash_rest(self, path: Path, hasher: Any, offset: int) -> str:
+        """Hash the file from offset onwards into hasher."""
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while True:
+                block = f.read(self.settings.upload_chunk_size)
+                if not block:
+                    break
+                hasher.update(block)
+        return hasher.hexdigest()
+    
+    def _finish(self, upload_id: str) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM upload_chunks WHERE upload_id = ?", (upload_id,))
+            conn.execute("DELETE FROM upload_sessions WHERE upload_id = ?", (upload_id,))
+    
+    async def abort(self, upload_id: str, user_id: str) -> bool:
+        """Cancel an upload session and delete what was received."""
+        session = await self._run(self._session, upload_id, user_id)
+        if session is None:
+            return False
+            
+        await self._run(self._abort, upload_id)
+        self._stats["aborted"] += 1
+        return True
+    
+    def _abort(self, upload_id: str) -> None:
+        with closing(self._connect()) as conn:
+            self._delete(conn, upload_id)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get upload session statistics."""
+        return {
+            **self._stats,
+            "hashing_in_progress": len(self._hashers)
+        }
+
+
+# Global service instance
+upload_session_service = UploadSessionService()
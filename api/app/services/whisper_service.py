@@ -7,11 +7,14 @@ import aiohttp
 from pathlib import Path
 from typing import Dict, Any, Optional
 import json
+import mimetypes
 
 from ..core.config import get_settings
 from ..core.logging import get_logger
 from ..core.exceptions import ExternalAPIError, ProcessingError
 from ..services.retry_service import with_api_retry
+from ..services.audio_service import audio_service
+from ..services.http_client_service import http_client_service
 
 logger = get_logger(__name__)
 
@@ -22,9 +25,9 @@ class WhisperService:
     def __init__(self):
         self.settings = get_settings()
         self.api_url = "https://api.openai.com/v1/audio/transcriptions"
+        self.model = "whisper-1"
         self.max_file_size = 25 * 1024 * 1024  # 25MB limit for Whisper API
     
-    @with_api_retry("whisper", max_attempts=3)
     async def transcribe(
         self,
         audio_path: Path,
@@ -34,6 +37,36 @@ class WhisperService:
         """
         Transcribe audio file using OpenAI Whisper API.
         
+        When upload transcoding is enabled the file is first converted to a
+        compact 16 kHz mono file if that makes the upload smaller.
+        
+        Args:
+            audio_path: Path to audio file
+            language: Language code (zh for Chinese)
+            response_format: Response format (verbose_json for timestamps)
+            
+        Returns:
+            Transcription result with segments and metadata
+        """
+        upload_path = audio_path
+        if self.settings.whisper_upload_transcode:
+            try:
+                upload_path = await audio_service.prepare_for_upload(audio_path)
+            except Exception as e:
+                logger.warning(f"Upload transcode failed for {audio_path.name}, sending original: {str(e)}")
+                
+        return await self._transcribe_file(upload_path, language, response_format)
+    
+    @with_api_retry("whisper", max_attempts=3)
+    async def _transcribe_file(
+        self,
+        audio_path: Path,
+        language: str = "zh",
+        response_format: str = "verbose_json"
+    ) -> Dict[str, Any]:
+        """
+        Upload an audio file to the Whisper API as-is.
+        
         Args:
             audio_path: Path to audio file
             language: Language code (zh for Chinese)
@@ -58,19 +91,22 @@ class WhisperService:
                 "Authorization": f"Bearer {self.settings.openai_api_key}"
             }
             
-            # Prepare form data
-            data = aiohttp.FormData()
-            data.add_field('file', 
-                          open(audio_path, 'rb'),
-                          filename=audio_path.name,
-                          content_type='audio/mpeg')
-            data.add_field('model', 'whisper-1')
-            data.add_field('language', language)
-            data.add_field('response_format', response_format)
-            data.add_field('timestamp_granularities[]', 'segment')
-            
-            # Make API request
-            async with aiohttp.ClientSession() as session:
+            content_type = mimetypes.guess_type(audio_path.name)[0] or 'application/octet-stream'
+            
+            with open(audio_path, 'rb') as audio_file:
+                # Prepare form data
+                data = aiohttp.FormData()
+                data.add_field('file', 
+                              audio_file,
+                              filename=audio_path.name,
+                              content_type=content_type)
+                data.add_field('model', self.model)
+                data.add_field('language', language)
+                data.add_field('response_format', response_format)
+                data.add_field('timestamp_granularities[]', 'segment')
+                
+                # Make API request
+                session = http_client_service.get_session("openai")
                 async with session.post(
                     self.api_url,
                     headers=headers,
@@ -130,7 +166,6 @@ class WhisperService:
         """
         try:
             # Get audio duration for cost calculation
-            from services.audio_service import audio_service
             metadata = await audio_service.get_audio_metadata(audio_path)
             duration_minutes = metadata.get("duration", 0) / 60
             
@@ -176,14 +211,14 @@ class WhisperService:
             }
             
             # Test with a minimal request to models endpoint
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    "https://api.openai.com/v1/models",
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    return response.status == 200
-                    
+            session = http_client_service.get_session("openai")
+            async with session.get(
+                "https://api.openai.com/v1/models",
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                return response.status == 200
+                
         except Exception as e:
             logger.error(f"API key validation failed: {str(e)}")
             return False
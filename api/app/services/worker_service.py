@@ -0,0 +1,196 @@
+"""
+Worker pool that processes transcription jobs from the durable job queue.
+
+The pool runs inside the API process when ``job_worker_mode`` is
+"embedded", or standalone so workers can be scaled separately:
+    
+    python -m app.services.worker_service --concurrency 4
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import uuid
+from typing import Dict, Any, List, Optional
+
+from ..schemas.transcription import JobStatus
+from ..core.config import get_settings
+from ..core.logging import get_logger
+from ..services.job_queue_service import job_queue_service
+from ..services.transcription_service import transcription_service
+
+logger = get_logger(__name__)
+
+
+class WorkerService:
+    """Pool of async workers that lease, process and acknowledge jobs."""
+    
+    def __init__(self):
+        self.settings = get_settings()
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._workers: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+        self._stats = {
+            "processed": 0,
+            "released": 0,
+            "lost_leases": 0,
+            "cancelled": 0
+        }
+    
+    @property
+    def running(self) -> bool:
+        """Whether the pool has live workers."""
+        return any(not task.done() for task in self._workers)
+    
+    def start(self, concurrency: Optional[int] = None) -> None:
+        """Start the worker pool on the running event loop."""
+        if self.running:
+            return
+            
+        concurrency = concurrency or self.settings.max_concurrent_jobs
+        self._stopping = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._worker_loop(index))
+            for index in range(max(1, concurrency))
+        ]
+        logger.info(f"Started {len(self._workers)} transcription workers ({self.worker_id})")
+    
+    async def stop(self) -> None:
+        """
+        Stop the worker pool.
+        
+        Jobs in progress are cancelled and released back to the queue so
+        another worker can pick them up.
+        """
+        self._stopping.set()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("Transcription workers stopped")
+    
+    async def _worker_loop(self, index: int) -> None:
+        """Lease and process jobs until the pool is stopped."""
+        worker_id = f"{self.worker_id}/{index}"
+        
+        while not self._stopping.is_set():
+            try:
+                lease = await job_queue_service.lease(worker_id)
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed to lease a job: {str(e)}")
+                lease = None
+                
+            if lease is None:
+                try:
+                    await asyncio.wait_for(
+                        self._stopping.wait(),
+                        timeout=self.settings.job_queue_poll_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
+                
+            await self._run_job(lease, worker_id)
+    
+    async def _run_job(self, lease: Dict[str, Any], worker_id: str) -> None:
+        """Process one leased job while keeping its lease alive."""
+        job_id = lease["job_id"]
+        
+        job = await job_queue_service.get(job_id)
+        if job is None or job.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED]:
+            # Cancelled before it started, or finished by a worker that died before acking
+            await job_queue_service.ack(job_id, worker_id)
+            return
+            
+        logger.info(f"Worker {worker_id} processing job {job_id} (attempt {lease['attempts']})")
+        
+        task = asyncio.create_task(transcription_service.process_job(job_id, lease["user_id"]))
+        transcription_service.track_job(job_id, task)
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, worker_id, task))
+        
+        try:
+            await task
+            self._stats["processed"] += 1
+            await job_queue_service.ack(job_id, worker_id)
+        except asyncio.CancelledError:
+            if self._stopping.is_set():
+                # Shutting down: hand the job to another worker
+                self._stats["released"] += 1
+                await asyncio.shield(job_queue_service.nack(job_id, worker_id))
+                raise
+            # Cancelled by the user or the lease was lost
+            self._stats["cancelled"] += 1
+            await job_queue_service.ack(job_id, worker_id)
+        except Exception as e:
+            logger.error(f"Worker {worker_id} crashed on job {job_id}: {str(e)}")
+            await job_queue_service.nack(job_id, worker_id, delay=self.settings.job_retry_delay)
+        finally:
+            heartbeat.cancel()
+            if not task.done():
+                task.cancel()
+            transcription_service.untrack_job(job_id)
+    
+    async def _heartbeat(self, job_id: str, worker_id: str, task: asyncio.Task) -> None:
+        """Extend the lease periodically; cancel the job if the lease is lost."""
+        interval = max(1.0, self.settings.job_visibility_timeout / 3)
+        
+        while not task.done():
+            await asyncio.sleep(interval)
+            try:
+                alive = await job_queue_service.heartbeat(job_id, worker_id)
+            except Exception as e:
+                logger.warning(f"Heartbeat failed for job {job_id}: {str(e)}")
+                continue
+                
+            if not alive:
+                # Cancelled by the user, or another worker took over an expired lease
+                self._stats["lost_leases"] += 1
+                logger.warning(f"Lease lost for job {job_id}, stopping processing")
+                task.cancel()
+                return
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get worker pool statistics."""
+        return {
+            "worker_id": self.worker_id,
+            "workers": sum(1 for task in self._workers if not task.done()),
+            "busy": len(transcription_service.active_jobs),
+            **self._stats
+        }
+
+
+# Global service instance
+worker_service = WorkerService()
+
+
+async def run_workers(concurrency: Optional[int] = None) -> None:
+    """Run a standalone worker pool until interrupted."""
+    from ..core.logging import setup_logging
+    from ..core.storage import ensure_directories
+    from ..services.http_client_service import http_client_service
+    from ..services.romanization_service import romanization_service
+    
+    setup_logging()
+    ensure_directories()
+    await http_client_service.startup()
+    await romanization_service.warm_up()
+    
+    worker_service.start(concurrency)
+    try:
+        await asyncio.gather(*worker_service._workers)
+    finally:
+        await worker_service.stop()
+        romanization_service.shutdown()
+        await http_client_service.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run transcription workers")
+    parser.add_argument("--concurrency", type=int, default=None, help="Number of concurrent jobs")
+    args = parser.parse_args()
+    
+    try:
+        asyncio.run(run_workers(args.concurrency))
+    except KeyboardInterrupt:
+        pass
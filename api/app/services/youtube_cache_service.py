@@ -0,0 +1,343 @@
+"""
+Shared YouTube audio cache.
+
+Downloads are stored once per video, keyed on the canonical video ID
+rather than the URL or the user, so every user transcribing a popular
+video shares one download. Jobs hold a reference to the file while they
+use it; once the cache exceeds its size budget the least recently used
+files without live references are evicted.
+
+Video metadata (duration, audio size) is probed without downloading and
+kept in memory for a short TTL, so usage checks and job planning can
+size a video before any media is fetched.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+from ..core.config import get_settings
+from ..core.logging import get_logger
+from ..core.single_flight import SingleFlight
+from ..services.audio_service import audio_service
+
+logger = get_logger(__name__)
+
+_VIDEO_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+
+class YouTubeCacheService:
+    """Reference-counted cache of downloaded YouTube audio, keyed by video ID."""
+    
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.settings = get_settings()
+        self.cache_dir = Path(cache_dir or self.settings.youtube_cache_dir)
+        self.db_path = self.cache_dir / "cache.db"
+        self._initialized = False
+        self._flight = SingleFlight("youtube_download")
+        self._metadata: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._metadata_flight = SingleFlight("youtube_metadata")
+        self._metadata_stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "downloads": 0,
+            "bytes_downloaded": 0,
+            "evictions": 0,
+            "stale_partials_removed": 0
+        }
+    
+    @staticmethod
+    def video_id(url: str) -> str:
+        """
+        Get the cache key of a video URL.
+        
+        Watch, short, embed, live and youtu.be links to the same video map
+        to its 11-character video ID. Other URLs yt-dlp accepts are keyed on
+        a hash of the URL.
+        """
+        parsed = urlparse(url.strip())
+        host = (parsed.hostname or "").lower()
+        candidate = None
+        
+        if host == "youtu.be" or host.endswith(".youtu.be"):
+            candidate = parsed.path.strip("/").split("/")[0]
+        elif host == "youtube.com" or host.endswith(".youtube.com"):
+            query = parse_qs(parsed.query)
+            if "v" in query:
+                candidate = query["v"][0]
+            else:
+                parts = parsed.path.strip("/").split("/")
+                if len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v"):
+                    candidate = parts[1]
+                    
+        if candidate and _VIDEO_ID.match(candidate):
+            return candidate
+        return "url-" + hashlib.sha256(url.strip().encode("utf-8")).hexdigest()[:24]
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; one per operation so it can run in any thread."""
+        if not self._initialized:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS videos (
+                    video_id TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS video_refs (
+                    video_id TEXT NOT NULL,
+                    holder TEXT NOT NULL,
+                    acquired_at REAL NOT NULL,
+                    PRIMARY KEY (video_id, holder)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_videos_last_used ON videos (last_used_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_video_refs_holder ON video_refs (holder)")
+            self._initialized = True
+            self._sweep_partials(time.time())
+            
+        return conn
+    
+    async def _run(self, func, *args):
+        """Run a blocking cache operation in the default executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+    
+    async def acquire(self, url: str, holder: str) -> Path:
+        """
+        Get the audio of a video, downloading it on a miss.
+        
+        The file stays referenced by holder, and is not evicted, until
+        release(holder) is called.
+        
+        Args:
+            url: YouTube URL
+            holder: Identifier of the user of the file, e.g. the job ID
+            
+        Returns:
+            Path to the cached audio file
+        """
+        video_id = self.video_id(url)
+        
+        path = await self._run(self._reference, video_id, holder)
+        if path is not None:
+            self._stats["hits"] += 1
+            logger.info(f"YouTube cache hit for {video_id}")
+            return path
+            
+        self._stats["misses"] += 1
+        path = await self._flight.do(video_id, lambda: self._download(url, video_id))
+        await self._run(self._register, video_id, path)
+        return path
+    
+    async def get_metadata(self, url: str) -> Dict[str, Any]:
+        """
+        Get a video's duration and audio size without downloading it.
+        
+        Results are cached per video ID for youtube_probe_cache_ttl seconds,
+        and concurrent callers for the same video share one yt-dlp run.
+        
+        Args:
+            url: YouTube URL
+            
+        Returns:
+            Metadata from audio_service.probe_youtube_metadata
+        """
+        video_id = self.video_id(url)
+        
+        entry = self._metadata.get(video_id)
+        if entry is not None and time.time() - entry[1] <= self.settings.youtube_probe_cache_ttl:
+            self._metadata.move_to_end(video_id)
+            self._metadata_stats["hits"] += 1
+            return dict(entry[0])
+            
+        self._metadata_stats["misses"] += 1
+        metadata = await self._metadata_flight.do(video_id, lambda: audio_service.probe_youtube_metadata(url))
+        
+        self._metadata[video_id] = (metadata, time.time())
+        self._metadata.move_to_end(video_id)
+        while len(self._metadata) > self.settings.youtube_probe_cache_size:
+            self._metadata.popitem(last=False)
+            self._metadata_stats["evictions"] += 1
+            
+        return dict(metadata)
+    
+    def _reference(self, video_id: str, holder: str) -> Optional[Path]:
+        """Reference the video for holder; return its file if it is cached."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            # Referenced before downloading so eviction never removes a file being fetched
+            conn.execute(
+                "INSERT OR REPLACE INTO video_refs (video_id, holder, acquired_at) VALUES (?, ?, ?)",
+                (video_id, holder, now)
+            )
+            row = conn.execute("SELECT path FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+            if row is None:
+                return None
+                
+            path = Path(row[0])
+            if not path.is_file():
+                conn.execute("DELETE FROM videos WHERE video_id = ?", (video_id,))
+                return None
+                
+            conn.execute(
+                "UPDATE videos SET hits = hits + 1, last_used_at = ? WHERE video_id = ?",
+                (now, video_id)
+            )
+            return path
+    
+    async def _download(self, url: str, video_id: str) -> Path:
+        """Download into a private directory, then move to the video's cache file."""
+        partial_dir = self.cache_dir / ".partial" / f"{video_id}.{uuid.uuid4().hex[:8]}"
+        try:
+            downloaded = await audio_service.download_youtube_audio(url, partial_dir, video_id)
+            cached_path = self.cache_dir / downloaded.name
+            os.replace(downloaded, cached_path)
+        finally:
+            shutil.rmtree(partial_dir, ignore_errors=True)
+            
+        self._stats["downloads"] += 1
+        self._stats["bytes_downloaded"] += cached_path.stat().st_size
+        return cached_path
+    
+    def _register(self, video_id: str, path: Path) -> None:
+        """Record a downloaded file and evict others beyond the size budget."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """
+                INSERT INTO videos (video_id, path, size, created_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (video_id)
+                DO UPDATE SET path = excluded.path, size = excluded.size, last_used_at = excluded.last_used_at
+                """,
+                (video_id, str(path), path.stat().st_size, now, now)
+            )
+            self._stats["evictions"] += self._evict(conn, now)
+        self._sweep_partials(now)
+    
+    def _sweep_partials(self, now: float) -> None:
+        """Delete download directories left behind by crashed workers."""
+        partial_root = self.cache_dir / ".partial"
+        if not partial_root.is_dir():
+            return
+            
+        # No download outlives a job, so older directories have no owner
+        stale_before = now - self.settings.job_timeout
+        for partial_dir in partial_root.iterdir():
+            try:
+                if partial_dir.stat().st_mtime >= stale_before:
+                    continue
+            except FileNotFoundError:
+                continue
+            shutil.rmtree(partial_dir, ignore_errors=True)
+            self._stats["stale_partials_removed"] += 1
+            logger.info(f"Removed stale YouTube download directory {partial_dir.name}")
+    
+    def _evict(self, conn: sqlite3.Connection, now: float) -> int:
+        """Delete least recently used unreferenced files until under the size budget."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM videos").fetchone()[0]
+        excess = total - self.settings.youtube_cache_max_bytes
+        if excess <= 0:
+            return 0
+            
+        # References older than a job can run belong to crashed workers
+        live_since = now - self.settings.job_timeout
+        candidates = conn.execute(
+            """
+            SELECT video_id, path, size FROM videos
+            WHERE NOT EXISTS (
+                SELECT 1 FROM video_refs
+                WHERE video_refs.video_id = videos.video_id AND acquired_at >= ?
+            )
+            ORDER BY last_used_at
+            """,
+            (live_since,)
+        ).fetchall()
+        
+        evicted = 0
+        for video_id, path, size in candidates:
+            if excess <= 0:
+                break
+            try:
+                Path(path).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not evict cached YouTube audio {path}: {str(e)}")
+                continue
+            conn.execute("DELETE FROM videos WHERE video_id = ?", (video_id,))
+            conn.execute("DELETE FROM video_refs WHERE video_id = ?", (video_id,))
+            excess -= size
+            evicted += 1
+            
+        if excess > 0:
+            logger.warning("YouTube cache over budget; every remaining file is in use")
+        return evicted
+    
+    async def release(self, holder: str) -> None:
+        """Drop every reference held by holder."""
+        try:
+            await self._run(self._release, holder)
+        except Exception as e:
+            logger.warning(f"Could not release YouTube cache references of {holder}: {str(e)}")
+    
+    def _release(self, holder: str) -> None:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """
+                UPDATE videos SET last_used_at = ?
+                WHERE video_id IN (SELECT video_id FROM video_refs WHERE holder = ?)
+                """,
+                (now, holder)
+            )
+            conn.execute("DELETE FROM video_refs WHERE holder = ?", (holder,))
+    
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get cache size, reference and hit-ratio statistics."""
+        entries, size, referenced = await self._run(self._size)
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.settings.youtube_cache_max_bytes,
+            "referenced": referenced,
+            "hit_ratio": self._stats["hits"] / lookups if lookups else 0.0,
+            "metadata": {
+                **self._metadata_stats,
+                "size": len(self._metadata)
+            }
+        }
+    
+    def _size(self) -> Tuple[int, int, int]:
+        with closing(self._connect()) as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM videos").fetchone()
+            referenced = conn.execute("SELECT COUNT(DISTINCT video_id) FROM video_refs").fetchone()[0]
+            return entries, size, referenced
+
+
+# Global service instance
+youtube_cache_service = YouTubeCacheService()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Measure cold-start import cost of the API, per module.
+
+Runs ``python -X importtime`` on a fresh interpreter and reports the
+modules with the highest cumulative import time, plus the provider SDKs
+that should stay deferred until first use. Imports made while the app's
+lifespan starts up (clients created at startup import their SDKs there)
+are timed and reported separately.
+
+Usage:
+    python scripts/benchmark_imports.py                     # import app.main, then start it
+    python scripts/benchmark_imports.py --no-startup        # import only
+    python scripts/benchmark_imports.py --target index      # Vercel entry point
+    python scripts/benchmark_imports.py --top 40 --runs 5
+    python scripts/benchmark_imports.py --lexicon /tmp/cantonese-scribe-state/jyutping_lexicon.snapshot
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+API_DIR = Path(__file__).resolve().parent.parent / "api"
+
+# Modules a cold start should not import; they load on first use
+DEFERRED = [
+    "google.cloud.speech",
+    "google.api_core",
+    "stripe",
+    "supabase",
+    "postgrest",
+    "pycantonese",
+]
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# Written to stderr between importing the target and starting it up
+STARTUP_MARKER = "--- lifespan startup ---"
+
+# Enters and leaves the app's lifespan, as uvicorn and Vercel do on a cold start
+STARTUP_CODE = """
+import sys
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+import asyncio
+
+async def _startup():
+    async with target.app.router.lifespan_context(target.app):
+        pass
+
+asyncio.run(_startup())
+"""
+
+Modules = Dict[str, Tuple[int, int, int]]
+
+
+def measure(target: str, startup: bool) -> Tuple[float, Modules, Modules]:
+    """
+    Import target in a fresh interpreter, then optionally run its app's lifespan.
+
+    Returns:
+        Wall-clock seconds, and {module: (self_us, cumulative_us, depth)}
+        for the import and for the startup
+    """
+    code = f"import {target} as target\n"
+    if startup:
+        code += STARTUP_CODE.format(marker=STARTUP_MARKER)
+
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=API_DIR,
+        capture_output=True,
+        text=True
+    )
+    elapsed = time.perf_counter() - start
+
+    if proc.returncode != 0:
+        sys.exit(f"starting {target} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+
+    phases: List[Modules] = [{}, {}]
+    phase = 0
+    for line in proc.stderr.splitlines():
+        if line == STARTUP_MARKER:
+            phase = 1
+            continue
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            phases[phase][name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return elapsed, phases[0], phases[1]
+
+
+def report_phase(title: str, phases: List[Modules], top: int) -> None:
+    """Print median per-module timings of one phase across runs."""
+    names = set().union(*phases)
+
+    def median(name: str, field: int) -> float:
+        values = [modules[name][field] for modules in phases if name in modules]
+        return statistics.median(values) / 1000 if values else 0.0
+
+    total = statistics.median(
+        sum(self_us for self_us, _, _ in modules.values()) / 1000 for modules in phases
+    )
+    print(f"\n{title}: {len(names)} modules, {total:.1f} ms")
+    if not names:
+        return
+    print(f"{'module':>40}  {'self ms':>9}  {'cumul ms':>9}")
+    ranked = sorted(names, key=lambda name: median(name, 1), reverse=True)
+    for name in ranked[:top]:
+        print(f"{name:>40}  {median(name, 0):9.1f}  {median(name, 1):9.1f}")
+
+
+def report(runs: List[Tuple[float, Modules, Modules]], top: int, startup: bool) -> None:
+    """Print median timings across runs."""
+    wall = statistics.median(elapsed for elapsed, _, _ in runs)
+    label = "interpreter + import + startup" if startup else "interpreter + import"
+    print(f"{label:>40}: {wall * 1000:8.1f} ms (median of {len(runs)})")
+
+    report_phase(f"Top {top} modules by cumulative import time", [imported for _, imported, _ in runs], top)
+    if startup:
+        report_phase("Imported during lifespan startup", [started for _, _, started in runs], top)
+
+    print("\nDeferred provider SDKs")
+    for name in DEFERRED:
+        status = "deferred"
+        for phase, index in (("import", 1), ("startup", 2)):
+            costs = [
+                cumulative_us
+                for run in runs
+                for module, (_, cumulative_us, _) in run[index].items()
+                if module == name or module.startswith(name + ".")
+            ]
+            if costs:
+                status = f"imported at {phase} ({max(costs) / 1000:.1f} ms)"
+                break
+        print(f"{name:>40}: {status}")
+
+def benchmark_lexicon(snapshot: Path) -> None:
+    """Compare compiling the Jyutping lexicon with loading a snapshot."""
+    sys.path.insert(0, str(API_DIR))
+    from app.core.jyutping_lexicon import JyutpingLexicon, build_snapshot, pycantonese_version
+
+    if not snapshot.exists():
+        start = time.perf_counter()
+        build_snapshot(snapshot)
+        print(f"{'snapshot build':>40}: {time.perf_counter() - start:8.2f} s")
+
+    start = time.perf_counter()
+    JyutpingLexicon.load(snapshot, source_version=pycantonese_version())
+    loaded = time.perf_counter() - start
+
+    start = time.perf_counter()
+    JyutpingLexicon.from_pycantonese()
+    compiled = time.perf_counter() - start
+
+    print(f"\n{'lexicon compile':>40}: {compiled:8.2f} s")
+    print(f"{'lexicon snapshot load':>40}: {loaded:8.2f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="app.main", help="Module to import, relative to api/")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to measure")
+    parser.add_argument("--top", type=int, default=25, help="Modules to list")
+    parser.add_argument("--lexicon", type=Path, help="Also time loading this lexicon snapshot (built if missing)")
+    parser.add_argument("--no-startup", dest="startup", action="store_false",
+                        help="Only import the target; do not run its app's lifespan")
+    args = parser.parse_args()
+
+    runs = [measure(args.target, args.startup) for _ in range(args.runs)]
+    report(runs, args.top, args.startup)
+
+    if args.lexicon:
+        benchmark_lexicon(args.lexicon)
+
+
+if __name__ == "__main__":
+    main()
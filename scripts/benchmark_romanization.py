@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark RomanizationService: compiled Jyutping lexicon vs per-segment PyCantonese calls.
+
+Usage:
+    python scripts/benchmark_romanization.py                  # synthetic 10k-segment corpus
+    python scripts/benchmark_romanization.py --input subs.txt # one segment per line
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "api"))
+
+from app.services.romanization_service import RomanizationService  # noqa: E402
+
+PHRASES = [
+    "係呀", "唔該", "咩呀", "冇問題", "我哋", "佢哋", "你好", "多謝晒", "點解", "而家",
+    "今日天氣好好", "我唔知道", "你食咗飯未", "聽日見", "唔好意思", "真係好正", "去邊度",
+    "幾多錢", "我想講", "其實呢", "香港人講廣東話", "搭地鐵返屋企", "呢個問題好複雜",
+    "大家好", "我覺得", "係咪呀", "好耐冇見", "慢慢嚟", "唔使客氣", "邊個話㗎",
+]
+
+
+def generate_corpus(segments: int, seed: int = 0) -> List[str]:
+    """Build subtitle-like segments from common Cantonese phrases."""
+    rng = random.Random(seed)
+    return [
+        "，".join(rng.choice(PHRASES) for _ in range(rng.randint(1, 4)))
+        for _ in range(segments)
+    ]
+
+
+def run_path(service: RomanizationService, corpus: List[str]) -> tuple:
+    """Romanize the corpus segment by segment and return (seconds, results)."""
+    start = time.perf_counter()
+    results = [service._romanize_text(text, True, True) for text in corpus]
+    return time.perf_counter() - start, results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", type=Path, help="Text file with one segment per line")
+    parser.add_argument("--segments", type=int, default=10000, help="Synthetic corpus size")
+    args = parser.parse_args()
+
+    if args.input:
+        corpus = [line.strip() for line in args.input.read_text(encoding="utf-8").splitlines() if line.strip()]
+    else:
+        corpus = generate_corpus(args.segments)
+
+    service = RomanizationService()
+
+    start = time.perf_counter()
+    service._load()
+    print(f"{'initialize':>12}: {time.perf_counter() - start:.2f}s")
+
+    if service._lexicon is None:
+        sys.exit("Lexicon could not be compiled; nothing to compare")
+
+    lexicon = service._lexicon
+    compiled, compiled_results = run_path(service, corpus)
+
+    # The lexicon path never loads PyCantonese itself
+    import pycantonese
+    service._pycantonese = pycantonese
+    service._lexicon = None
+    legacy, legacy_results = run_path(service, corpus)
+    service._lexicon = lexicon
+
+    matching = sum(
+        1 for new, old in zip(compiled_results, legacy_results)
+        if new["jyutping"] == old["jyutping"]
+    )
+
+    print(f"{'segments':>12}: {len(corpus)}")
+    print(f"{'pycantonese':>12}: {legacy:.2f}s")
+    print(f"{'lexicon':>12}: {compiled:.2f}s")
+    print(f"{'speedup':>12}: {legacy / compiled:.1f}x")
+    print(f"{'jyutping':>12}: {matching}/{len(corpus)} segments identical")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
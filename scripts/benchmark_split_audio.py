@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark AudioService.split_audio: single-pass vs per-segment ffmpeg splitting.
+
+Usage:
+    python scripts/benchmark_split_audio.py                 # synthetic 3-hour file
+    python scripts/benchmark_split_audio.py --input talk.mp3
+"""
+
+import argparse
+import asyncio
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "api"))
+
+from app.services.audio_service import AudioService  # noqa: E402
+
+
+def generate_test_file(path: Path, duration: int) -> None:
+    """Generate a synthetic 44.1 kHz stereo MP3 of the given duration."""
+    cmd = [
+        "ffmpeg", "-v", "error",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=44100:duration={duration}",
+        "-f", "lavfi", "-i", f"anoisesrc=color=pink:sample_rate=44100:amplitude=0.1:duration={duration}",
+        "-filter_complex", "[0:a][1:a]amerge=inputs=2",
+        "-ac", "2", "-b:a", "128k",
+        "-y", str(path)
+    ]
+    subprocess.run(cmd, check=True)
+
+
+async def run_mode(service: AudioService, source: Path, work_dir: Path, mode: str, segment_duration: float) -> float:
+    """Split a private copy of the source with one mode and return wall-clock seconds."""
+    mode_dir = work_dir / mode
+    mode_dir.mkdir()
+    audio_path = mode_dir / source.name
+    shutil.copy(source, audio_path)
+
+    start = time.perf_counter()
+    segments = await service.split_audio(audio_path, segment_duration=segment_duration, mode=mode)
+    elapsed = time.perf_counter() - start
+
+    print(f"{mode:>12}: {len(segments)} segments in {elapsed:.2f}s")
+    return elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", type=Path, help="Audio file to split (default: synthetic file)")
+    parser.add_argument("--duration", type=int, default=3 * 3600, help="Synthetic file duration in seconds")
+    parser.add_argument("--segment-duration", type=float, default=600, help="Segment length in seconds")
+    args = parser.parse_args()
+
+    service = AudioService()
+
+    with tempfile.TemporaryDirectory(prefix="split-bench-") as tmp:
+        work_dir = Path(tmp)
+
+        source = args.input
+        if source is None:
+            source = work_dir / "synthetic.mp3"
+            print(f"Generating {args.duration}s synthetic input...")
+            generate_test_file(source, args.duration)
+
+        single = await run_mode(service, source, work_dir, "single_pass", args.segment_duration)
+        per_segment = await run_mode(service, source, work_dir, "per_segment", args.segment_duration)
+
+        print(f"{'speedup':>12}: {per_segment / single:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())